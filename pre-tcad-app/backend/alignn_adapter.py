@@ -1,57 +1,315 @@
+import os
+import threading
+import time
 from pathlib import Path
-from io import StringIO
 
-import base64
-from io import StringIO, BytesIO
-import torch
-from ase.io import read
-from alignn.ff.ff import AlignnAtomwiseCalculator
+from cif_ingest import parse_cif, parse_cifs
+from telemetry import register_collector, span
+from prediction_cache import PredictionCache, cif_text_key, atoms_key, same_structure, structure_key
+from predictors import get_predictor
 
 BASE_DIR = Path(__file__).resolve().parent
-MODELS_ROOT = BASE_DIR / "models"
 
-MODEL_PATHS = {
-    "bandgap": MODELS_ROOT / "bandgap" / "temp(band gap)",
-    "formation_energy": MODELS_ROOT / "formation energy" / "temp(formation energy)",
-    "permittivity": MODELS_ROOT / "permittivity" / "temp(permittivity)",
-}
+# 실제 추론 백엔드 (PREDICTOR_BACKEND=alignn | surrogate, predictors.py 참고)
+PREDICTOR = get_predictor()
 
-_CALCS = {}
+# 추론 전 중복 구조 묶기 (원점 이동/셀 선택/초격자만 다른 구조는 한 배치 안에서 한 번만 추론). 0 이면 끔
+DEDUP = os.environ.get("ALIGNN_DEDUP", "1").lower() not in ("0", "false", "no")
 
-def _get_calc(name: str):
-    if name in _CALCS:
-        return _CALCS[name]
+# 백엔드/가중치가 바뀌면 namespace 가 달라져 예전 캐시 항목은 자동으로 무시된다
+_CACHE_NS = PREDICTOR.signature()
+_CACHE = PredictionCache.from_env()
 
-    model_dir = MODEL_PATHS[name]
-    calc = AlignnAtomwiseCalculator(path=str(model_dir))
-    _CALCS[name] = calc
-    return calc
+# 모델 로드/워밍업 상태 (/ready 에서 조회)
+_STATUS = {"loaded": False, "warm": False, "error": None, "load_s": None, "warmup_s": None}
+_LOAD_LOCK = threading.Lock()
 
-def _cif_to_atoms(cif_text: str):
-    from io import StringIO
+
+# ---------- 모델 미리 올리기 / 워밍업 ----------
+def load_models():
+    """
+    예측기 모델을 전부 메모리에 올린다 (추론은 안 함).
+    gunicorn preload_app 처럼 fork 전에 부르면 워커들이 가중치 페이지를 copy-on-write 로 공유한다.
+    """
+    t0 = time.perf_counter()
     try:
-        atoms = read(StringIO(cif_text), format="cif")
-        return atoms
+        with _LOAD_LOCK:
+            PREDICTOR.load()
     except Exception as e:
-        print("[ERROR] CIF parsing failed:", e)
-        raise ValueError("Invalid CIF text format")
+        _STATUS["error"] = f"model load failed: {e}"
+        raise
+    _STATUS["loaded"] = True
+    _STATUS["load_s"] = round(time.perf_counter() - t0, 3)
+
 
+def warmup():
+    """
+    모델 로드 + 더미 구조(Si 다이아몬드) 1회 추론.
+    (첫 forward 에서 생기는 torch 초기화/메모리 할당 비용을 사용자 요청 밖으로 뺀다)
+    - fork 뒤 각 워커에서 부르는 용도. forward 를 fork 전에 돌리면 OpenMP 스레드 풀이
+      자식 프로세스에서 멈출 수 있어서, fork 전에는 load_models 만 쓴다.
+    - 결과는 캐시에 넣지 않는다.
+    """
+    if _STATUS["warm"]:
+        return
+    load_models()
+    from ase.build import bulk
+    t0 = time.perf_counter()
+    try:
+        _predict_atoms(bulk("Si", "diamond", a=5.43))
+    except Exception as e:
+        _STATUS["error"] = f"warmup failed: {e}"
+        raise
+    _STATUS["warm"] = True
+    _STATUS["error"] = None
+    _STATUS["warmup_s"] = round(time.perf_counter() - t0, 3)
 
 
-def predict_props_from_cif(cif_text: str):
+def model_status():
+    """{ready, backend, loaded, warm, models, error, load_s, warmup_s}"""
+    return {
+        "ready": bool(_STATUS["loaded"] and _STATUS["warm"]),
+        "backend": PREDICTOR.name,
+        "models": PREDICTOR.models(),
+        **_STATUS,
+    }
+
+def _cif_to_atoms(cif_text: str):
+    """CIF → Atoms (cif_ingest: 파싱 캐시 + 크기/원자 수 예산, 넘으면 CifRejected)"""
+    with span("cif_parse"):
+        return parse_cif(cif_text)
+
+
+def _predict_atoms(atoms):
+    """구조 1개 → {bandgap, formation_energy, permittivity} (PREDICTOR 에 위임)"""
+    return PREDICTOR.predict(atoms)
+
+
+def _predict_atoms_batch(atoms_list):
+    """_predict_atoms 의 배치 버전"""
+    return PREDICTOR.predict_batch(atoms_list)
+
+
+# ---------- 중복 구조 묶기 ----------
+def _canonical_key(atoms):
+    """structure_key (DEDUP 꺼져 있으면 None). 후보를 묶는 용도일 뿐, 캐시 키로는 쓰지 않는다"""
+    return structure_key(atoms, _CACHE_NS) if DEDUP else None
+
+
+def _scale_props(props, factor: float):
+    """
+    원자 수가 다른 같은 구조(초격자)로 예측값 환산.
+    값이 원자 수에 비례하는 물성(PREDICTOR.extensive)만 비율을 곱하고 나머지는 그대로.
+    """
+    if factor == 1:
+        return dict(props)
+    return {
+        k: v * factor if PREDICTOR.extensive(k) else v
+        for k, v in props.items()
+    }
+
+
+def _dedup_groups(entries):
+    """
+    entries: [(struct_key, atoms, payload)] → [(대표 atoms, [(atoms, payload), ...]), ...]
+    - struct_key(atoms_key) 가 같은 항목은 그대로 한 그룹
+    - DEDUP 이면 structure_key 가 같은 그룹끼리만 비교해서, same_structure 로 확인된 것만 합친다
+      (structure_key 만 같은 다른 폴리타입은 따로 추론)
+    - 그룹 대표는 원자 수가 가장 적은 구조
+    """
+    exact = {}
+    for struct_key, atoms, payload in entries:
+        exact.setdefault(struct_key, []).append((atoms, payload))
+
+    buckets = {}
+    for struct_key, members in exact.items():
+        canon_key = _canonical_key(members[0][0])
+        buckets.setdefault(canon_key or struct_key, []).append(members)
+
+    groups = []
+    for bucket in buckets.values():
+        clusters = []   # [(대표 atoms, [(atoms, payload), ...])]
+        for members in sorted(bucket, key=lambda ms: len(ms[0][0])):
+            atoms = members[0][0]
+            for rep, cluster in clusters:
+                if same_structure(rep, atoms):
+                    cluster.extend(members)
+                    break
+            else:
+                clusters.append((atoms, list(members)))
+        groups.extend(clusters)
+    return groups
+
+
+def predict_material(cif_text: str):
+    """
+    CIF → (material_id, {bandgap, formation_energy, permittivity})
+    - 같은 CIF 텍스트(또는 같은 구조)는 캐시에서 바로 돌려준다 (GNN 추론 생략).
+    - material_id 는 정리된 CIF 텍스트의 해시라서, 같은 파일을 다시 올리면 같은 ID가 나온다.
+    """
+    text_key = cif_text_key(cif_text, _CACHE_NS)
+    cached = _CACHE.get(text_key)
+    if cached is not None:
+        return text_key, cached
+
     atoms = _cif_to_atoms(cif_text)
+    struct_key = atoms_key(atoms, _CACHE_NS)
+    results = _CACHE.get(struct_key)
+    if results is None:
+        results = _predict_atoms(atoms)
+        _CACHE.put(struct_key, results)
+    _CACHE.put(text_key, results)
+
+    return text_key, results
+
+
+def predict_props_from_cif(cif_text: str):
+    return predict_material(cif_text)[1]
+
+
+def predict_materials_batch(cif_texts, gate=None):
+    """
+    여러 CIF를 한 번에 예측.
+    반환: 입력 순서대로 (material_id, props) 또는 파싱 실패 시 ValueError 인스턴스
+    - 캐시 적중분은 건너뛰고, 같은 구조가 여러 번 나오면 한 번만 추론
+    - DEDUP 이면 이 배치 안에서 원점 이동/셀 선택/초격자만 다른 구조(same_structure 로 확인)를 묶어
+      그룹마다 원자 수가 가장 적은 구조 하나만 추론하고, 나머지에는 원자 수 비율로 환산한 값을 나눠준다
+      (묶음 정보는 캐시에 남기지 않는다. 캐시는 CIF 텍스트 / atoms_key 기준으로만)
+    - gate(atoms_list) → 구조별 None 또는 예외 (prefilter.ScoreGate): 캐시에 없는 구조만 물어보고,
+      예외가 나온 구조는 추론하지 않고 그 예외를 그대로 돌려준다
+    """
+    out = [None] * len(cif_texts)
+    misses = []   # 텍스트 캐시 미스 (idx, text_key) → 한꺼번에 파싱 (많으면 병렬)
+    pending = []  # 캐시에 없는 구조 (idx, text_key, struct_key, atoms)
+    for i, cif_text in enumerate(cif_texts):
+        text_key = cif_text_key(cif_text, _CACHE_NS)
+        cached = _CACHE.get(text_key)
+        if cached is not None:
+            out[i] = (text_key, cached)
+        else:
+            misses.append((i, text_key))
+
+    with span("cif_parse"):
+        parsed = parse_cifs([cif_texts[i] for i, _ in misses])
+    for (i, text_key), atoms in zip(misses, parsed):
+        if isinstance(atoms, Exception):
+            out[i] = atoms
+            continue
+        struct_key = atoms_key(atoms, _CACHE_NS)
+        cached = _CACHE.get(struct_key)
+        if cached is not None:
+            _CACHE.put(text_key, cached)
+            out[i] = (text_key, cached)
+            continue
+        pending.append((i, text_key, struct_key, atoms))
+
+    verdicts = gate([m[3] for m in pending]) if gate is not None else [None] * len(pending)
+    entries = []
+    for (i, text_key, struct_key, atoms), verdict in zip(pending, verdicts):
+        if verdict is not None:
+            out[i] = verdict
+            continue
+        entries.append((struct_key, atoms, (i, text_key, struct_key)))
+
+    groups = _dedup_groups(entries)
+    preds = _predict_atoms_batch([rep for rep, _ in groups])
+    for (rep, members), props in zip(groups, preds):
+        for atoms, (i, text_key, struct_key) in members:
+            member = _scale_props(props, len(atoms) / len(rep))
+            _CACHE.put(struct_key, member)
+            _CACHE.put(text_key, member)
+            out[i] = (text_key, member)
+    return out
+
+
+# ---------- 앙상블 멤버 (불확실성) ----------
+def _member_key(material_id: str, member: int) -> str:
+    return f"{material_id}|m{member}"
+
+
+def predict_members_batch(items, members, infer: bool = True):
+    """
+    items: [(material_id, cif_text 또는 None)] → 구조별 [멤버별 props] (members 순서) 또는 None
+    - 멤버 예측값은 material_id 와 atoms_key 양쪽에 멤버 번호를 붙여 캐시
+      (같은 구조를 다시 요청하거나, 서식만 다른 CIF 로 올려도 추론 생략)
+    - predict_materials_batch 와 같이 배치 안의 중복 구조(_dedup_groups)는 대표 하나만 멤버 추론하고
+      나머지에는 원자 수 비율로 환산한 값을 나눠준다
+    - 캐시에 없는데 cif_text 가 없거나 infer=False 면 None
+    """
+    members = list(members)
+    out = [None] * len(items)
+    todo = []
+    for i, (material_id, cif_text) in enumerate(items):
+        got = [_CACHE.get(_member_key(material_id, m)) for m in members]
+        if all(g is not None for g in got):
+            out[i] = got
+        elif infer and cif_text is not None:
+            todo.append(i)
+    if not todo:
+        return out
+
+    with span("cif_parse"):
+        parsed = parse_cifs([items[i][1] for i in todo])
+    entries = []
+    for i, atoms in zip(todo, parsed):
+        if isinstance(atoms, Exception):
+            continue
+        struct_key = atoms_key(atoms, _CACHE_NS)
+        got = [_CACHE.get(_member_key(struct_key, m)) for m in members]
+        if all(g is not None for g in got):
+            for m, props in zip(members, got):
+                _CACHE.put(_member_key(items[i][0], m), props)
+            out[i] = got
+            continue
+        entries.append((struct_key, atoms, (i, struct_key)))
+    if not entries:
+        return out
+
+    groups = _dedup_groups(entries)
+    preds = PREDICTOR.predict_members([rep for rep, _ in groups], members)
+    for (rep, group), per_member in zip(groups, preds):
+        for atoms, (i, struct_key) in group:
+            scaled = [_scale_props(props, len(atoms) / len(rep)) for props in per_member]
+            for m, props in zip(members, scaled):
+                _CACHE.put(_member_key(struct_key, m), props)
+                _CACHE.put(_member_key(items[i][0], m), props)
+            out[i] = scaled
+    return out
+
+
+def lookup_material(material_id: str):
+    """predict_material 이 발급한 ID의 예측값. 캐시에서 축출됐으면 None."""
+    return _CACHE.get(material_id)
+
+
+def cached_material(cif_text: str):
+    """파싱/추론 없이 CIF 텍스트 키로만 캐시 조회 → (material_id, props) 또는 None"""
+    text_key = cif_text_key(cif_text, _CACHE_NS)
+    props = _CACHE.get(text_key)
+    return (text_key, props) if props is not None else None
+
+
+def remember_material(material_id: str, props) -> None:
+    """다른 프로세스(작업 큐 워커)에서 예측한 값을 이 프로세스 캐시에도 등록"""
+    _CACHE.put(material_id, props)
+
 
-    results = {}
+def _cache_metrics():
+    st = _CACHE.stats()
+    yield ("pretcad_prediction_cache_lookups_total", "counter", "ALIGNN 예측 캐시 조회 수",
+           [({"result": "hit"}, st["hits"]), ({"result": "disk_hit"}, st["disk_hits"]),
+            ({"result": "miss"}, st["misses"])])
+    yield ("pretcad_prediction_cache_entries", "gauge", "ALIGNN 예측 캐시 메모리 항목 수",
+           [({}, st["entries"])])
+    yield ("pretcad_prediction_cache_bytes", "gauge", "ALIGNN 예측 캐시 메모리 사용량 (추정) [bytes]",
+           [({}, st["bytes"])])
 
-    # 각 모델별 계산 처리
-    for prop_name, model_dir in MODEL_PATHS.items():
-        calc = _get_calc(prop_name)
-        atoms.set_calculator(calc)
-        value = atoms.get_potential_energy()
-        results[prop_name] = value
+register_collector(_cache_metrics)
 
-    return results
 
+# ALIGNN_PRELOAD=1 이면 import 시점(= gunicorn preload_app 의 fork 전)에 가중치를 올린다
+if os.environ.get("ALIGNN_PRELOAD", "").lower() in ("1", "true", "yes"):
+    load_models()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,33 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from matplotlib.lines import Line2D
-from alignn_adapter import predict_props_from_cif
-from screener_adapter import screen_mosfet, make_ranking_chart
-import io, base64
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Literal
+from alignn_adapter import (
+    predict_material, predict_materials_batch, lookup_material,
+    cached_material, remember_material, model_status, warmup as alignn_warmup,
+)
+from screener_adapter import (
+    screen_mosfet, screen_mosfet_batch, sweep_mosfet, alignn_inputs,
+    condition_key, decision_for, normalize_weights, normalize_thresholds, SAMPLE_KEYS,
+)
+from results_store import ResultsStore
+from cif_ingest import CIF_MAX_BYTES, INGEST, CifRejected
+from prefilter import Prefiltered, ScoreGate
+from uncertainty import ensemble_samples
+from optimize import optimize_process
+from jobs import JobManager, QueueFull, TERMINAL
+import telemetry
+from telemetry import CACHE_LOOKUPS, span
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+import asyncio, io, base64, json, logging, math, os, threading, time, zipfile
+import numpy as np
 import matplotlib
 matplotlib.use("Agg")  
 import matplotlib.pyplot as plt
-from matplotlib import ticker
 
 
 try:
@@ -47,6 +66,9 @@ except Exception:
         }
 
 # ---------- FastAPI ----------
+telemetry.configure_logging()
+log = logging.getLogger("pretcad.app")
+
 app = FastAPI()
 app.add_middleware(
     CORSMiddleware,
@@ -56,204 +78,160 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def _request_timing(request: Request, call_next):
+    """요청 전체 시간 + 요청 안에서 열린 span 들을 모아 기록 (telemetry)"""
+    token = telemetry.begin_request()
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        telemetry.end_request(token, route, request.method, status, time.perf_counter() - t0)
+
+def _json_response(content) -> Response:
+    """FastAPI 기본 직렬화와 같은 JSON 을 직접 만들어 인코딩 시간을 json_encode 단계로 잰다"""
+    with span("json_encode"):
+        body = json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":"))
+    return Response(body, media_type="application/json")
+
 class ScreenReq(BaseModel):
     props: dict
     device: str
     conditions: dict
+    render_chart: bool = True   # False 면 차트 생략 (chart = "")
+    chart_format: Literal["png", "data"] = "png"   # "data": PNG 대신 chart_data(JSON)
+    weights: dict[str, float] | None = None      # 종합 점수 가중치 (없으면 Ion/gm/fT/Vth 각 0.25)
+    thresholds: dict[str, float] | None = None   # 판정 기준 {"suitable": 70, "unsure": 50}
+    # 물성 표본 {"Eg_eV": [...], "eps_r": [...], "Ef_eV_atom": [...]} (앙상블 예측 등). 있으면 uncertainty 계산
+    samples: dict[str, list[float]] | None = None
 
 # ---------- 차트 렌더 ----------
-LABELS = {
+CHART_ORDER = [
+    "SS_percent", "DIBL_percent", "Vth_score_percent",
+    "Ion_percent", "Ioff_percent", "gm_percent",
+    "fT_percent", "r0_percent", "Stab_percent"
+]
+CHART_LABELS = {
     "SS_percent": "SS",
-    "Vth_score_percent": "Vth score",
+    "DIBL_percent": "DIBL",
+    "Vth_score_percent": "Vth",
     "Ion_percent": "Ion",
     "Ioff_percent": "Ioff",
     "gm_percent": "gm",
     "fT_percent": "fT",
     "r0_percent": "r0",
-    "DIBL_percent": "DIBL",
     "Stab_percent": "Stability",
 }
-PRIORITY = [
-    "Ion_percent", "gm_percent", "fT_percent",
-    "Vth_score_percent", "SS_percent", "DIBL_percent",
-    "r0_percent", "Ioff_percent", "Stab_percent",
+# baseline 색상 팔레트
+CHART_COLORS = [
+    "#ffffff", "#ffcc00", "#ff7f0e", "#2ca02c",
+    "#d62728", "#9467bd", "#8c564b",
+    "#e377c2", "#7f7f7f", "#17becf"
 ]
+CHART_BAR_COLOR = "#5aa5ff"
+
+CHART_CACHE_SIZE = int(os.environ.get("CHART_CACHE_SIZE", 64))
+CHART_CACHE_DECIMALS = 1   # 퍼센트를 이 자릿수로 반올림해 키/렌더에 사용 (0.1%p ≈ 1px 미만)
+_CHART_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_CHART_LOCK = threading.Lock()
 
-def make_ranking_chart(percentiles: dict, baseline_pcts: dict | None = None) -> str:
+def _round_pcts(d: dict) -> dict:
+    out = {}
+    for k, v in d.items():
+        try:
+            out[k] = round(float(v), CHART_CACHE_DECIMALS)
+        except (TypeError, ValueError):
+            out[k] = v
+    return out
+
+def make_ranking_chart(percentiles: dict, baseline_percentiles: dict):
     """
-    percentiles(0~100)을 다크테마 가로막대로 렌더 → base64 PNG 반환
-    baseline_pcts 가 주어지면, 각 지표별로 베이스라인 재료들의 점과 범례도 함께 그림.
-    baseline_pcts 예시:
-      {
-        "Si":  {"Ion_percent": ..., "gm_percent": ..., ...},
-        "GaN": {"Ion_percent": ..., ...},
-        ...
-      }
+    _render_ranking_chart 에 LRU 캐시를 씌운 버전.
+    - 키: 반올림한 후보 퍼센트 + 베이스라인 퍼센트 벡터
+    - 렌더도 반올림한 값으로 해서, 같은 키면 항상 같은 PNG
     """
-    if not percentiles:
+    if not isinstance(percentiles, dict) or not percentiles:
         return ""
 
-    baseline_pcts = baseline_pcts or {}
-
-    # 순서 정리
-    keys_all = list(percentiles.keys())
-    ordered = [k for k in PRIORITY if k in percentiles] + [
-        k for k in keys_all if k not in PRIORITY
-    ]
-
-    vals = [float(percentiles[k]) for k in ordered]
-    labels = [LABELS.get(k, k) for k in ordered]
-
-    # 내림차순 정렬
-    order_idx = sorted(range(len(vals)), key=lambda i: vals[i], reverse=True)
-    vals = [vals[i] for i in order_idx]
-    labels = [labels[i] for i in order_idx]
-    ordered = [ordered[i] for i in order_idx]
-
-    # 크기 설정
-    fig_h = 0.48 * len(vals) + 1.6
-    fig, ax = plt.subplots(figsize=(9, fig_h), facecolor="#111111")
-    ax.set_facecolor("#111111")
-
-    base = (0.36, 0.62, 0.94)
-    colors = [
-        (
-            base[0] * (0.8 + 0.2 * i / len(vals)),
-            base[1] * (0.8 + 0.2 * i / len(vals)),
-            base[2] * (0.8 + 0.2 * i / len(vals)),
-        )
-        for i in range(len(vals))
-    ]
-
-    y = range(len(vals))
-    bars = ax.barh(list(y), vals, color=colors, edgecolor="#333333", linewidth=0.8)
-
-    # 후보 재료 퍼센트 레이블
-    for b, v in zip(bars, vals):
-        ax.text(
-            b.get_width() + 1.2,
-            b.get_y() + b.get_height() / 2,
-            f"{v:.1f}%",
-            va="center",
-            ha="left",
-            color="#eaeaea",
-            fontsize=11,
-        )
-
-    ax.set_yticks(list(y), labels=labels, color="#e0e0e0", fontsize=12)
-    ax.set_xlim(0, max(100, max(vals) + 6))
-    ax.xaxis.set_major_formatter(ticker.PercentFormatter(xmax=100))
-    ax.tick_params(axis="x", colors="#cfcfcf", labelsize=11)
-    ax.grid(axis="x", color="#2a2a2a", linestyle="--", linewidth=0.7, alpha=0.8)
-    ax.set_xlabel("Percentile", color="#dddddd", labelpad=8)
-    ax.set_title(
-        "Relative Ranking vs Baselines", color="#ffffff", pad=10, fontsize=16, weight="bold"
+    perc = _round_pcts(percentiles)
+    base = {}
+    if isinstance(baseline_percentiles, dict):
+        base = {
+            name: (_round_pcts(vals) if isinstance(vals, dict) else vals)
+            for name, vals in baseline_percentiles.items()
+        }
+    key = (
+        tuple(sorted(perc.items())),
+        tuple((name, tuple(sorted(v.items())) if isinstance(v, dict) else repr(v))
+              for name, v in base.items()),
     )
 
-    # ---------- 여기부터 baseline 점 + 범례 ----------
-    if baseline_pcts:
-        cmap = plt.get_cmap("tab20")
-        base_names = list(baseline_pcts.keys())
-
-        # 각 지표(ordered[i])의 y 위치에 베이스라인 점 찍기
-        for j, name in enumerate(base_names):
-            color = cmap(j % 20)
-            bp = baseline_pcts[name]
-            for i, pkey in enumerate(ordered):
-                if pkey in bp:
-                    try:
-                        x = float(bp[pkey])
-                    except Exception:
-                        continue
-                    ax.plot(x, i, "o", color=color, markersize=4, alpha=0.95)
-
-        # 범례: Ion_percent 기준으로 퍼센트 표시 (없으면 첫 키 사용)
-        ref_key = "Ion_percent"
-        if not any(ref_key in baseline_pcts[n] for n in base_names):
-            # Ion_percent가 없으면 ordered 첫 번째를 사용
-            if ordered:
-                ref_key = ordered[0]
-
-        legend_handles: list[Line2D] = []
-        legend_labels: list[str] = []
-        for j, name in enumerate(base_names):
-            color = cmap(j % 20)
-            h = Line2D([0], [0], marker="o", linestyle="", color=color, markersize=6)
-            legend_handles.append(h)
-            val = baseline_pcts[name].get(ref_key)
-            if isinstance(val, (int, float)):
-                legend_labels.append(f"{name} {val:.1f}%")
-            else:
-                legend_labels.append(str(name))
-
-        if legend_handles:
-            ax.legend(
-                legend_handles,
-                legend_labels,
-                title=f"Baseline ({ref_key})",
-                bbox_to_anchor=(1.02, 1.0),
-                loc="upper left",
-                frameon=False,
-                fontsize=8,
-                title_fontsize=9,
-            )
+    with _CHART_LOCK:
+        png = _CHART_CACHE.get(key)
+        if png is not None:
+            _CHART_CACHE.move_to_end(key)
+    CACHE_LOOKUPS.inc(cache="chart", result="miss" if png is None else "hit")
+    if png is not None:
+        return png
 
-    plt.tight_layout(pad=1.0)
+    png = _render_ranking_chart(perc, base)
+    with _CHART_LOCK:
+        _CHART_CACHE[key] = png
+        while len(_CHART_CACHE) > CHART_CACHE_SIZE:
+            _CHART_CACHE.popitem(last=False)
+    return png
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=140, facecolor=fig.get_facecolor())
-    plt.close(fig)
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode("utf-8")
-
-# ---------- 엔드포인트 ----------
-@app.post("/screen")
-def screen(req: ScreenReq):
-    temp = float((req.conditions or {}).get("temp", 300.0))
-    vdd  = float((req.conditions or {}).get("vdd", 0.9))
-
-    result = screen_mosfet(req.props, temp=temp, vdd=vdd)
-
-    result["inputs"] = dict(req.props)
+def make_ranking_chart_data(percentiles: dict, baseline_percentiles: dict) -> dict:
+    """
+    PNG 대신 프론트에서 직접 그릴 수 있는 차트 데이터 (막대 9개 + 베이스라인 점).
+    순서/색/클리핑 규칙은 _render_ranking_chart 와 같다. 값이 없는 점은 null.
+    """
+    if not isinstance(percentiles, dict) or not percentiles:
+        return {}
 
-    result["chart"] = make_ranking_chart(
-        result.get("percentiles", {}),
-        result.get("baseline_percentiles", {})
-    )
-    return result
+    def to_pct(x):
+        try:
+            v = float(x)
+        except (TypeError, ValueError):
+            return None
+        if math.isnan(v):
+            return None
+        return round(min(max(v, 0.0), 100.0), CHART_CACHE_DECIMALS)
 
-class AlignnReq(BaseModel):
-    cif: str
-    device: str = "nmos"
-    conditions: dict | None = None
+    keys = [k for k in CHART_ORDER if k in percentiles]
+    baselines = []
+    if isinstance(baseline_percentiles, dict):
+        for i, (mat, vals) in enumerate(baseline_percentiles.items()):
+            if not isinstance(vals, dict):
+                continue
+            baselines.append({
+                "name": mat,
+                "color": CHART_COLORS[i % len(CHART_COLORS)],
+                "values": [to_pct(vals.get(k)) for k in keys],
+            })
 
-def make_ranking_chart(percentiles: dict, baseline_percentiles: dict):
-    import io, base64
-    import numpy as np
-    import matplotlib.pyplot as plt
+    return {
+        "keys": keys,
+        "labels": [CHART_LABELS[k] for k in keys],
+        "values": [to_pct(percentiles.get(k)) or 0.0 for k in keys],
+        "bar_color": CHART_BAR_COLOR,
+        "baselines": baselines,
+        "xlim": [0, 100],
+        "title": "Relative Ranking vs Baselines",
+    }
 
+def _render_ranking_chart(percentiles: dict, baseline_percentiles: dict):
     if not isinstance(percentiles, dict) or not percentiles:
         return ""
 
-    ORDER = [
-        "SS_percent", "DIBL_percent", "Vth_score_percent",
-        "Ion_percent", "Ioff_percent", "gm_percent",
-        "fT_percent", "r0_percent", "Stab_percent"
-    ]
+    ORDER, NAME_MAP, COLORS = CHART_ORDER, CHART_LABELS, CHART_COLORS
     keys = [k for k in ORDER if k in percentiles]
 
-    NAME_MAP = {
-        "SS_percent": "SS",
-        "DIBL_percent": "DIBL",
-        "Vth_score_percent": "Vth",
-        "Ion_percent": "Ion",
-        "Ioff_percent": "Ioff",
-        "gm_percent": "gm",
-        "fT_percent": "fT",
-        "r0_percent": "r0",
-        "Stab_percent": "Stability",
-    }
-
     def to_float(x):
         try:
             return float(x)
@@ -264,13 +242,6 @@ def make_ranking_chart(percentiles: dict, baseline_percentiles: dict):
     cur = np.array([to_float(percentiles.get(k)) for k in keys])
     cur = np.clip(np.nan_to_num(cur, nan=0.0), 0, 100)
 
-    # ===== baseline 색상 팔레트 =====
-    COLORS = [
-        "#ffffff", "#ffcc00", "#ff7f0e", "#2ca02c",
-        "#d62728", "#9467bd", "#8c564b",
-        "#e377c2", "#7f7f7f", "#17becf"
-    ]
-
     fig, ax = plt.subplots(figsize=(10, 5), dpi=200)
     fig.patch.set_facecolor("#111111")
     ax.set_facecolor("#1e1e1e")
@@ -287,7 +258,7 @@ def make_ranking_chart(percentiles: dict, baseline_percentiles: dict):
     y = np.arange(len(keys))
 
     # ✅ 막대 = 현재 material
-    ax.barh(y, cur, height=0.70, color="#5aa5ff", alpha=0.9)
+    ax.barh(y, cur, height=0.70, color=CHART_BAR_COLOR, alpha=0.9)
 
     # ✅ baseline = 여러 material 점들
     if isinstance(baseline_percentiles, dict):
@@ -334,65 +305,730 @@ def make_ranking_chart(percentiles: dict, baseline_percentiles: dict):
     return base64.b64encode(buf.getvalue()).decode("utf-8")
 
 
+def _attach_chart(result: dict, render_chart: bool, chart_format: str) -> None:
+    """
+    render_chart/chart_format 에 따라 result["chart"] (base64 PNG) 또는
+    result["chart_data"] (JSON) 를 채운다. baseline 은 평탄화하지 않고 재료별 그대로 사용.
+    """
+    percentiles = result.get("percentiles", {})
+    baseline = result.get("baseline_percentiles", {})
+    result["chart"] = ""
+    if not render_chart:
+        return
+    with span("chart_render"):
+        if chart_format == "data":
+            result["chart_data"] = make_ranking_chart_data(percentiles, baseline)
+        else:
+            result["chart"] = make_ranking_chart(percentiles, baseline)
+
+
+# ---------- 엔드포인트 ----------
+@app.post("/screen")
+def screen(req: ScreenReq):
+    temp = float((req.conditions or {}).get("temp", 300.0))
+    vdd  = float((req.conditions or {}).get("vdd", 0.9))
+
+    samples = None
+    if req.samples is not None:
+        missing = [k for k in SAMPLE_KEYS if k not in req.samples]
+        lengths = {len(req.samples.get(k, ())) for k in SAMPLE_KEYS}
+        if missing or len(lengths) != 1 or 0 in lengths:
+            raise HTTPException(status_code=400,
+                                detail=f"samples needs equal-length, non-empty lists for {', '.join(SAMPLE_KEYS)}")
+        samples = {k: np.asarray(req.samples[k], dtype=float) for k in SAMPLE_KEYS}
+
+    try:
+        result = screen_mosfet(req.props, temp=temp, vdd=vdd,
+                               weights=req.weights, thresholds=req.thresholds, samples=samples)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result["inputs"] = dict(req.props)
+
+    _attach_chart(result, req.render_chart, req.chart_format)
+    return _json_response(result)
+
+class AlignnReq(BaseModel):
+    cif: str
+    device: str = "nmos"
+    conditions: dict | None = None
+    render_chart: bool = True
+    chart_format: Literal["png", "data"] = "png"
+    uncertainty: bool = False   # True 면 앙상블 멤버로 uncertainty / score_interval 계산 (추론 비용 증가)
+    store: bool = False         # True 면 결과를 저장소에도 기록 (/rank 로 조회)
+
+def _screen_alignn_props(raw_props: dict, conditions: dict | None,
+                         render_chart: bool = True, chart_format: str = "png", samples=None):
+    """ALIGNN 예측값 + 슬라이더 공정값 → screen_mosfet 결과 (차트 포함). samples: 앙상블 물성 표본"""
+    props, temp, vdd = alignn_inputs(raw_props, conditions)
+
+    # 5) 스크리너 실행 (앙상블 표본이 있으면 uncertainty / score_interval 포함)
+    result = screen_mosfet(props, vdd=vdd, samples=samples)
+
+    log.debug("percentiles=%s", result.get("percentiles"))
+
+    # 6) 프론트 표시용 inputs (+ /rank 조회용 공정조건 키)
+    result["inputs"] = props
+    result["cond_key"] = condition_key(props, vdd=vdd)
+
+    # 7) 차트 생성 (A안)
+    _attach_chart(result, render_chart, chart_format)
+
+    return result
+
+
+# ---------- 결과 저장 ----------
+# ALIGNN 으로 스크리닝한 결과는 (material_id, 공정조건) 단위로 저장 → /rank 로 조회
+# 배치/작업/CLI 결과는 항상, 단건(/screen_alignn, 재스크리닝)은 요청에 store=true 일 때만 저장한다
+# (기본 저장소는 프로세스 메모리 SQLite 라 슬라이더를 움직일 때마다 쌓이면 끝없이 커진다)
+RESULTS = ResultsStore.from_env()
+
+def _result_record(name: str | None, material_id: str, result: dict) -> dict:
+    return {
+        "material_id": material_id,
+        "name": name,
+        "cond_key": result["cond_key"],
+        "inputs": result.get("inputs"),
+        "metrics": result.get("metrics"),
+        "percentiles": result["percentiles"],
+        "score": result["score"],
+        "decision": result["decision"],
+        "model_version": result.get("model_version"),
+    }
+
+def _store_results(records: list[dict]) -> None:
+    # 저장 실패가 스크리닝 응답을 막지 않도록
+    try:
+        RESULTS.add_many(records)
+    except Exception as e:
+        log.warning("storing results failed: %s", e)
+
+
 @app.post("/screen_alignn")
 def screen_alignn(req: AlignnReq):
-    print("### screen_alignn HIT ###")
-
     # 1) CIF → ALIGNN 예측
-    raw_props = predict_props_from_cif(req.cif)
-    print("ALIGNN OUTPUT:", raw_props)
-
-    # 2) MOSFET 스크리너 입력용 키로 변환
-    props = {
-        "Eg_eV":      float(raw_props.get("bandgap")),
-        "eps_r":      float(raw_props.get("permittivity")),
-        "Ef_eV_atom": float(raw_props.get("formation_energy")),
-    }
+    try:
+        material_id, raw_props = predict_material(req.cif)
+    except CifRejected as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    log.debug("alignn material_id=%s props=%s", material_id, raw_props)
+
+    samples = ensemble_samples([(material_id, req.cif, raw_props)], req.conditions)[0] if req.uncertainty else None
+    result = _screen_alignn_props(raw_props, req.conditions, req.render_chart, req.chart_format, samples)
+    result["material_id"] = material_id
+    if req.store:
+        _store_results([_result_record(None, material_id, result)])
+    return _json_response(result)
 
-    # 3) 기본 공정값
-    defaults = {
-        "mu_cm2_Vs": 450.0,
-        "tox_nm": 2.0,
-        "eps_ox": 3.9,
-        "NA_cm3": 1e17,
-        "L_nm": 45.0,
-        "W_um": 1.0,
+
+# ---------- 예측 1회 + 공정 조건만 바꿔 재스크리닝 ----------
+class MaterialReq(BaseModel):
+    cif: str
+
+class RescreenReq(BaseModel):
+    device: str = "nmos"
+    conditions: dict | None = None
+    render_chart: bool = True
+    chart_format: Literal["png", "data"] = "png"
+    uncertainty: bool = False   # True 면 캐시에 있는 앙상블 멤버로 uncertainty 계산
+    store: bool = False         # True 면 결과를 저장소에도 기록 (슬라이더 재스크리닝마다 쌓이지 않도록 기본 끔)
+
+@app.post("/materials")
+def register_material(req: MaterialReq):
+    """CIF를 한 번 올려 ALIGNN 예측을 돌리고, 이후 재스크리닝에 쓸 material_id를 발급"""
+    try:
+        material_id, raw_props = predict_material(req.cif)
+    except CifRejected as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"material_id": material_id, "props": raw_props}
+
+# ---------- 후보 라이브러리 배치 스크리닝 ----------
+MAX_BATCH_ITEMS = int(os.environ.get("MAX_BATCH_ITEMS", 5000))
+# zip 업로드의 압축 해제 총량 상한 (파일 하나는 cif_ingest.CIF_MAX_BYTES 까지)
+ZIP_MAX_TOTAL_BYTES = int(os.environ.get("ZIP_MAX_TOTAL_BYTES", 256 * 1024 * 1024))
+
+# 순위표 열 순서 (rows 는 이 순서의 리스트)
+BATCH_COLUMNS = [
+    "rank", "name", "material_id", "score", "decision", "uncertainty",
+    "Eg_eV", "eps_r", "Ef_eV_atom",
+    "SS_percent", "Vth_score_percent", "Ion_percent", "Ioff_percent",
+    "gm_percent", "fT_percent", "r0_percent", "DIBL_percent", "Stab_percent",
+]
+
+class BatchItem(BaseModel):
+    name: str | None = None
+    cif: str
+
+class BatchReq(BaseModel):
+    items: list[BatchItem] = []
+    cifs: list[str] = []
+    device: str = "nmos"
+    conditions: dict | None = None
+    render_chart: bool = False
+    # 이 점수에 못 미치는 구조는 순위표에서 뺀다. 조성만으로 구한 점수 상한이 이보다 낮으면 ALIGNN 추론도 생략
+    min_score: float | None = None
+    uncertainty: bool = False   # True 면 앙상블 불확실성 계산 (/screen_alignn 과 같음)
+
+def _zip_to_items(data: bytes) -> list[BatchItem]:
+    """zip 안의 *.cif 파일들 → BatchItem (이름 = 파일명)"""
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Uploaded file is not a zip archive")
+
+    # 압축 폭탄 방지: 헤더의 크기로 먼저 거르고, 헤더가 거짓이어도 한도+1 바이트까지만 풀어서 확인
+    items, total = [], 0
+    for info in zf.infolist():
+        name = info.filename
+        if info.is_dir() or not name.lower().endswith(".cif") or name.startswith("__MACOSX/"):
+            continue
+        if len(items) >= MAX_BATCH_ITEMS:
+            break
+        if info.file_size > CIF_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"{name}: CIF is too large "
+                                                        f"({info.file_size} bytes > {CIF_MAX_BYTES})")
+        try:
+            with zf.open(info) as f:
+                data = f.read(CIF_MAX_BYTES + 1)
+        except (zipfile.BadZipFile, NotImplementedError, RuntimeError) as e:
+            raise HTTPException(status_code=400, detail=f"{name}: cannot read zip member ({e})")
+        if len(data) > CIF_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"{name}: CIF is too large (> {CIF_MAX_BYTES} bytes)")
+        total += len(data)
+        if total > ZIP_MAX_TOTAL_BYTES:
+            raise HTTPException(status_code=413, detail=f"Zip contents exceed {ZIP_MAX_TOTAL_BYTES} bytes")
+        items.append(BatchItem(name=name.rsplit("/", 1)[-1], cif=data.decode("utf-8", errors="replace")))
+    return items
+
+async def _read_batch_request(request: Request) -> BatchReq:
+    """JSON 본문(BatchReq 또는 CIF 문자열 배열) / multipart(zip + conditions JSON) 모두 허용"""
+    ctype = request.headers.get("content-type", "")
+    if ctype.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="multipart body needs a 'file' zip field")
+        try:
+            conditions = json.loads(form.get("conditions") or "null")
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="'conditions' must be a JSON object")
+        if conditions is not None and not isinstance(conditions, dict):
+            raise HTTPException(status_code=400, detail="'conditions' must be a JSON object")
+        render = str(form.get("render_chart", "false")).lower() in ("1", "true", "yes")
+        uncertainty = str(form.get("uncertainty", "false")).lower() in ("1", "true", "yes")
+        try:
+            min_score = float(form["min_score"]) if form.get("min_score") not in (None, "") else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="'min_score' must be a number")
+        items = _zip_to_items(await upload.read())
+        try:
+            return BatchReq(items=items, conditions=conditions, render_chart=render, min_score=min_score,
+                            uncertainty=uncertainty)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors())
+
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if isinstance(body, list):
+        body = {"cifs": body}
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object or an array of CIF strings")
+    try:
+        return BatchReq(**body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
+def _batch_items(req: BatchReq) -> tuple[list[str], list[str]]:
+    """요청 → (이름 목록, CIF 목록). 비었거나 너무 크면 HTTPException"""
+    items = list(req.items) + [
+        BatchItem(name=f"cif_{i}", cif=c) for i, c in enumerate(req.cifs)
+    ]
+    if not items:
+        raise HTTPException(status_code=400, detail="No CIF structures in request")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ITEMS} structures per batch")
+    names = [it.name or f"cif_{i}" for i, it in enumerate(items)]
+    return names, [it.cif for it in items]
+
+def _batch_gate(req: BatchReq) -> ScoreGate | None:
+    """min_score 가 있으면 조성 사전 필터 (prefilter.py)"""
+    return ScoreGate(req.min_score, req.conditions) if req.min_score is not None else None
+
+def _screen_batch(req: BatchReq):
+    names, cifs = _batch_items(req)
+
+    # 1) ALIGNN 미니배치 예측 (캐시/중복/사전 필터 제외)
+    preds = predict_materials_batch(cifs, gate=_batch_gate(req))
+    return _rank_predictions(names, preds, req, cifs)
+
+def _rank_predictions(names: list[str], preds: list, req: BatchReq, cifs: list[str] | None = None):
+    """
+    예측 목록((material_id, props) 또는 예외) → 점수순 순위표
+    cifs 가 없으면(작업 큐 결과) 앙상블 멤버는 캐시에 있는 것만 쓴다 (메인 프로세스에서 추론하지 않음)
+    """
+    ok, errors, prefiltered = [], [], []
+    for i, (name, p) in enumerate(zip(names, preds)):
+        if isinstance(p, Prefiltered):
+            prefiltered.append({"name": name, "score_upper": round(p.upper, 3)})
+        elif isinstance(p, Exception):
+            errors.append({"name": name, "error": str(p)})
+        else:
+            ok.append((name, p[0], p[1], cifs[i] if cifs is not None else None))
+
+    # 2) 스크리닝 (공정조건이 모두 같으므로 베이스라인은 1회)
+    #    (/screen_alignn 과 같은 결과가 나오도록 vdd 만 넘긴다)
+    #    앙상블 불확실성은 판정이 애매한 구조만 멤버를 끝까지 돌린다 (uncertainty.py)
+    inputs = [alignn_inputs(raw, req.conditions) for _, _, raw, _ in ok]
+    vdd = inputs[0][2] if inputs else 0.9
+    samples = ensemble_samples([(material_id, cif, raw) for _, material_id, raw, cif in ok],
+                               req.conditions, infer=cifs is not None) if req.uncertainty else [None] * len(ok)
+    results = screen_mosfet_batch(
+        [props for props, _, _ in inputs], vdd=vdd,
+        include_baseline=req.render_chart, samples_list=samples,
+    )
+
+    # 3) 결과 저장 (/rank 용)
+    cond_key = condition_key(inputs[0][0], vdd=vdd) if inputs else None
+    _store_results([
+        _result_record(name, material_id, dict(res, inputs=inp[0], cond_key=cond_key))
+        for (name, material_id, _, _), inp, res in zip(ok, inputs, results)
+    ])
+
+    # 4) 점수 내림차순 순위표 (min_score 미만은 저장만 하고 표에서는 뺀다)
+    order = sorted(range(len(results)), key=lambda i: results[i]["score"], reverse=True)
+    if req.min_score is not None:
+        order = [i for i in order if results[i]["score"] >= req.min_score]
+    rows, charts = [], {}
+    for rank, i in enumerate(order, start=1):
+        name, material_id, _, _ = ok[i]
+        props, res = inputs[i][0], results[i]
+        perc = res["percentiles"]
+        rows.append(
+            [rank, name, material_id, round(res["score"], 3), res["decision"],
+             round(res["uncertainty"], 3),
+             props["Eg_eV"], props["eps_r"], props["Ef_eV_atom"]]
+            + [round(float(perc[k]), 2) for k in BATCH_COLUMNS[9:]]
+        )
+        if req.render_chart:
+            charts[name] = make_ranking_chart(perc, res["baseline_percentiles"])
+
+    out = {"columns": BATCH_COLUMNS, "rows": rows, "errors": errors, "count": len(rows),
+           "cond_key": cond_key}
+    if req.min_score is not None:
+        out["min_score"] = req.min_score
+        out["prefiltered"] = prefiltered
+        out["below_min_score"] = len(results) - len(rows)
+    if req.render_chart:
+        out["charts"] = charts
+    return out
+
+@app.post("/screen_alignn/batch")
+async def screen_alignn_batch(request: Request):
+    """CIF 여러 개(JSON 배열 또는 zip 업로드)를 한 번에 예측·스크리닝 → 점수순 순위표"""
+    req = await _read_batch_request(request)
+    return await run_in_threadpool(_screen_batch, req)
+
+# 스트리밍 배치: 구조를 이만큼씩 묶어 예측하고, 결과는 구조 하나당 한 줄씩 바로 내보낸다
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 8))
+
+def _stream_samples(cifs: list[str], preds: list, req: BatchReq) -> list:
+    """스트림 묶음의 앙상블 표본 (예측 성공한 구조만, 나머지는 None)"""
+    if not req.uncertainty:
+        return [None] * len(preds)
+    idx = [i for i, p in enumerate(preds) if not isinstance(p, Exception)]
+    got = ensemble_samples([(preds[i][0], cifs[i], preds[i][1]) for i in idx], req.conditions)
+    out = [None] * len(preds)
+    for i, smp in zip(idx, got):
+        out[i] = smp
+    return out
+
+def _screen_stream_item(index: int, name: str, pred, req: BatchReq, samples=None) -> dict:
+    """예측 하나 → 스트림 한 줄 (/screen_alignn 과 같은 결과 + index/name/material_id)"""
+    if isinstance(pred, Prefiltered):
+        return {"index": index, "name": name, "prefiltered": True, "score_upper": round(pred.upper, 3)}
+    if isinstance(pred, Exception):
+        return {"index": index, "name": name, "error": str(pred)}
+    material_id, raw_props = pred
+    result = _screen_alignn_props(raw_props, req.conditions, req.render_chart, "data", samples)
+    _store_results([_result_record(name, material_id, result)])
+    return {"index": index, "name": name, "material_id": material_id, **result}
+
+@app.post("/screen_alignn/batch/stream")
+async def screen_alignn_batch_stream(request: Request, format: Literal["ndjson", "sse"] | None = None):
+    """
+    /screen_alignn/batch 의 스트리밍 버전. 구조마다 결과 한 줄씩:
+      - NDJSON (기본) : 한 줄에 JSON 하나, 마지막 줄은 {"done": true, ...}
+      - SSE (?format=sse 또는 Accept: text/event-stream) : event: result / event: done
+    - 결과는 끝나는 대로 내보내고 서버에는 모아두지 않는다
+    - 클라이언트가 느리면 전송이 끝날 때까지 다음 묶음을 계산하지 않는다 (backpressure)
+    - 연결이 끊기면 남은 구조는 계산하지 않고 멈춘다
+    - min_score 가 있으면 사전 필터에 걸린 구조는 {"prefiltered": true, "score_upper"} 한 줄로 끝낸다
+      (ALIGNN 으로 예측한 구조는 점수와 상관없이 모두 내보낸다)
+    """
+    req = await _read_batch_request(request)
+    names, cifs = _batch_items(req)
+    gate = _batch_gate(req)
+    if format is None:
+        format = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+
+    def encode(event: str, payload: dict) -> str:
+        data = json.dumps(payload, separators=(",", ":"))
+        return f"event: {event}\ndata: {data}\n\n" if format == "sse" else data + "\n"
+
+    async def lines():
+        count = errors = skipped = 0
+        for start in range(0, len(cifs), STREAM_CHUNK_SIZE):
+            if await request.is_disconnected():
+                return
+            chunk = cifs[start:start + STREAM_CHUNK_SIZE]
+            preds = await run_in_threadpool(predict_materials_batch, chunk, gate)
+            samples = await run_in_threadpool(_stream_samples, chunk, preds, req)
+            for offset, pred in enumerate(preds):
+                i = start + offset
+                item = await run_in_threadpool(_screen_stream_item, i, names[i], pred, req, samples[offset])
+                if "error" in item:
+                    errors += 1
+                elif item.get("prefiltered"):
+                    skipped += 1
+                else:
+                    count += 1
+                yield encode("result", item)
+        yield encode("done", {"done": True, "count": count, "errors": errors, "prefiltered": skipped,
+                              "total": len(cifs)})
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(lines(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+# ---------- 저장된 결과 순위 (/rank) ----------
+class RankReq(BaseModel):
+    conditions: dict | None = None    # /screen_alignn 과 같은 형식 (또는 cond_key 직접 지정)
+    cond_key: str | None = None
+    k: int = 20
+    weights: dict[str, float] | None = None   # {퍼센트 키: 가중치}, 없으면 저장된 score
+    thresholds: dict[str, float] | None = None   # {"suitable": 70, "unsure": 50}
+
+def _alignn_cond_key(conditions: dict | None) -> str:
+    """conditions → cond_key (재료 물성은 공정조건 키에 안 들어가므로 자리값으로 채움)"""
+    placeholder = {"bandgap": 0.0, "permittivity": 1.0, "formation_energy": 0.0}
+    props, _, vdd = alignn_inputs(placeholder, conditions)
+    return condition_key(props, vdd=vdd)
+
+@app.post("/rank")
+def rank(req: RankReq):
+    """공정조건 하나에서 저장된 후보 상위 k개 (가중치를 주면 그 가중합 기준)"""
+    if not 1 <= req.k <= 1000:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 1000")
+    cond_key = req.cond_key or _alignn_cond_key(req.conditions)
+    try:
+        thresholds = normalize_thresholds(req.thresholds)
+        rows = RESULTS.top_k(cond_key, req.k, req.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if req.weights or req.thresholds:
+        for r in rows:
+            r["decision"] = decision_for(r["score"], thresholds)
+    for i, r in enumerate(rows, start=1):
+        r["rank"] = i
+    return {"cond_key": cond_key, "total": RESULTS.count(cond_key), "rows": rows}
+
+@app.post("/rescore")
+def rescore_stored(req: RankReq):
+    """
+    저장된 후보 전체에 새 가중치/판정 기준을 적용 (퍼센트만 다시 조합, 물리 계산·ALIGNN 없음)
+    → 판정별 개수 + 새 점수 기준 상위 k개
+    """
+    if not 1 <= req.k <= 1000:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 1000")
+    cond_key = req.cond_key or _alignn_cond_key(req.conditions)
+    try:
+        weights = normalize_weights(req.weights)
+        thresholds = normalize_thresholds(req.thresholds)
+        out = RESULTS.rescore(cond_key, weights, thresholds, req.k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for i, r in enumerate(out["rows"], start=1):
+        r["rank"] = i
+    return {"cond_key": cond_key, "weights": weights, "thresholds": thresholds, **out}
+
+@app.get("/rank/conditions")
+def rank_conditions():
+    """저장된 공정조건 키 목록과 건수"""
+    return RESULTS.conditions()
+
+# ---------- 공정 파라미터 스윕 (/sweep) ----------
+class SweepReq(BaseModel):
+    props: dict | None = None         # Eg_eV, eps_r, Ef_eV_atom (+ 고정할 공정값) — /screen 과 같은 형식
+    material_id: str | None = None    # 또는 /materials 로 등록한 재료 (ALIGNN 예측값 사용)
+    axes: dict[str, list[float] | dict]   # {필드: [값...] 또는 {"start","stop","num","log"}}
+    conditions: dict | None = None
+    format: Literal["json", "npz", "arrow"] = "json"
+    percentiles: bool = True          # False 면 metrics/score 만 돌려줌
+    weights: dict[str, float] | None = None   # score 가중치 (없으면 기본)
+
+def _json_array(a):
+    """ndarray → 중첩 리스트 (JSON 에 못 넣는 NaN/inf 는 null)"""
+    if np.isfinite(a).all():
+        return a.tolist()
+    return np.where(np.isfinite(a), a, None).tolist()
+
+def _sweep_npz(res: dict, with_pct: bool) -> bytes:
+    arrays = {f"axis_{n}": g for n, g in res["axes"].items()}
+    arrays.update({f"metric_{k}": np.ascontiguousarray(v) for k, v in res["metrics"].items()})
+    if with_pct:
+        arrays.update({f"pct_{k}": np.ascontiguousarray(v) for k, v in res["percentiles"].items()})
+    arrays["score"] = np.ascontiguousarray(res["score"])
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+def _sweep_arrow(res: dict, with_pct: bool) -> bytes:
+    """격자를 펼친 long 형식 테이블 (축 열 + 지표 열) → Arrow IPC stream"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=400, detail="format='arrow' needs pyarrow on the server; use 'npz'")
+    grids = np.meshgrid(*res["axes"].values(), indexing="ij")
+    cols = {n: g.ravel() for n, g in zip(res["fields"], grids)}
+    cols.update({k: np.ravel(v) for k, v in res["metrics"].items()})
+    if with_pct:
+        cols.update({k: np.ravel(v) for k, v in res["percentiles"].items()})
+    cols["score"] = np.ravel(res["score"])
+    table = pa.table(cols)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+@app.post("/sweep")
+def sweep(req: SweepReq):
+    """
+    재료 1개 × 공정 파라미터 격자 → 지표/퍼센트/점수 배열.
+    (슬라이더를 한 칸씩 옮기며 /screen 을 반복 호출하는 대신 격자 전체를 한 번에)
+    """
+    if req.material_id:
+        raw_props = lookup_material(req.material_id)
+        if raw_props is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired material_id")
+        props, temp, vdd = alignn_inputs(raw_props, req.conditions)
+        temp = 300.0   # /screen_alignn 과 같은 결과가 나오도록 vdd 만 반영
+    elif req.props is not None:
+        props = req.props
+        temp = float((req.conditions or {}).get("temp", 300.0))
+        vdd  = float((req.conditions or {}).get("vdd", 0.9))
+    else:
+        raise HTTPException(status_code=400, detail="Either props or material_id is required")
+
+    try:
+        res = sweep_mosfet(props, req.axes, temp=temp, vdd=vdd, weights=req.weights)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e).strip("'\""))
+
+    if req.format == "npz":
+        return Response(_sweep_npz(res, req.percentiles), media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="sweep.npz"'})
+    if req.format == "arrow":
+        return Response(_sweep_arrow(res, req.percentiles),
+                        media_type="application/vnd.apache.arrow.stream")
+
+    out = {
+        "fields": res["fields"],
+        "shape": res["shape"],
+        "axes": {n: g.tolist() for n, g in res["axes"].items()},
+        "metrics": {k: _json_array(v) for k, v in res["metrics"].items()},
+        "score": _json_array(res["score"]),
     }
-    for k, v in defaults.items():
-        props.setdefault(k, v)
-
-    # 4) 슬라이더 공정값 병합
-    cond = req.conditions or {}
-    process = cond.get("process", {}) if isinstance(cond, dict) else {}
-    if isinstance(process, dict):
-        for k in defaults.keys():
-            if k in process and process[k] is not None:
-                props[k] = float(process[k])
-
-    temp = float(cond.get("temp", 300.0))
-    vdd  = float(cond.get("vdd", 0.9))
-
-    # 5) 스크리너 실행
-    result = screen_mosfet(props, vdd=vdd)
-
-    print("PERCENTILES:", result.get("percentiles"))
-    print("BASELINE_PERCENTILES:", result.get("baseline_percentiles"))
-
-    # 6) baseline 평탄화 (Si 기준)
-    bp = result.get("baseline_percentiles") or {}
-    if isinstance(bp, dict) and bp and all(isinstance(v, dict) for v in bp.values()):
-        bp_flat = bp.get("Si") or next(iter(bp.values()))
+    if req.percentiles:
+        out["percentiles"] = {k: _json_array(v) for k, v in res["percentiles"].items()}
+    # 큰 배열은 FastAPI 의 jsonable_encoder 를 거치지 않고 바로 직렬화
+    return Response(json.dumps(out, separators=(",", ":")), media_type="application/json")
+
+# ---------- 공정 파라미터 역설계 ----------
+class OptimizeReq(BaseModel):
+    props: dict | None = None         # Eg_eV, eps_r, Ef_eV_atom (+ 고정할 공정값) — /screen 과 같은 형식
+    material_id: str | None = None    # 또는 /materials 로 등록한 재료 (ALIGNN 예측값 사용)
+    bounds: dict[str, list[float] | dict]   # {필드: [lo, hi] 또는 {"lo","hi","log"}}
+    targets: list[dict] | None = None       # [{"metric", "target"|"min"|"max", "tol"}] (없으면 점수 최대화)
+    conditions: dict | None = None
+    weights: dict[str, float] | None = None
+    thresholds: dict[str, float] | None = None
+    budget_ms: float = 200.0          # 시간 예산 (OPTIMIZE_MAX_BUDGET_MS 이하)
+    population: int = 256             # 세대당 후보 수
+    seed: int = 0                     # 같은 seed/입력이면 같은 결과
+    max_front: int = 50               # 돌려줄 Pareto 해 개수 상한
+
+def _finite(d: dict) -> dict:
+    """JSON 에 못 넣는 NaN/inf 값은 null"""
+    return {k: v if math.isfinite(v) else None for k, v in d.items()}
+
+@app.post("/optimize")
+def optimize(req: OptimizeReq):
+    """
+    재료 1개 + 공정 파라미터 범위 → 점수 최대화 / 목표 지표(예: Vth_V ≈ 0.45, SS_mVdec ≤ 70)를
+    맞추는 공정값과 [점수, 목표별 이탈량] Pareto front. (/sweep 격자 대신 시간 예산 안의 탐색)
+    """
+    if req.material_id:
+        raw_props = lookup_material(req.material_id)
+        if raw_props is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired material_id")
+        props, temp, vdd = alignn_inputs(raw_props, req.conditions)
+        temp = 300.0   # /screen_alignn 과 같은 결과가 나오도록 vdd 만 반영
+    elif req.props is not None:
+        props = req.props
+        temp = float((req.conditions or {}).get("temp", 300.0))
+        vdd  = float((req.conditions or {}).get("vdd", 0.9))
     else:
-        bp_flat = bp
+        raise HTTPException(status_code=400, detail="Either props or material_id is required")
 
-    # 7) 프론트 표시용 inputs
-    result["inputs"] = props
+    try:
+        with span("optimize"):
+            res = optimize_process(props, req.bounds, targets=req.targets, temp=temp, vdd=vdd,
+                                   weights=req.weights, thresholds=req.thresholds,
+                                   budget_ms=req.budget_ms, population=req.population,
+                                   seed=req.seed, max_front=max(0, req.max_front))
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e).strip("'\""))
 
-    # 8) 차트 생성 (A안)
-    result["chart"] = make_ranking_chart(
-    result.get("percentiles", {}),
-    result.get("baseline_percentiles", {})  # ← 평탄화 ❌
-)
+    for p in [res["best"], *res["front"]]:
+        p["metrics"] = _finite(p["metrics"])
+        p["percentiles"] = _finite(p["percentiles"])
+    return res
 
-    return result
+# ---------- 모델 워밍업 / 준비 상태 ----------
+# 서버가 뜨자마자 백그라운드에서 모델 로드 + 더미 추론을 돌리고,
+# 로드밸런서/오케스트레이터는 /ready 가 200 이 될 때까지 트래픽을 보내지 않는다.
+ALIGNN_WARMUP = os.environ.get("ALIGNN_WARMUP", "1").lower() in ("1", "true", "yes")
+
+def _warmup_models():
+    try:
+        alignn_warmup()
+    except Exception as e:
+        log.warning("ALIGNN warmup failed: %s", e)
+
+@app.on_event("startup")
+def _start_warmup():
+    if ALIGNN_WARMUP:
+        threading.Thread(target=_warmup_models, name="alignn-warmup", daemon=True).start()
+
+@app.get("/ready")
+def ready():
+    """모델 3종이 올라가고 워밍업 추론까지 끝났으면 200, 아니면 503"""
+    status = model_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+# ---------- 작업 큐 (/jobs) ----------
+# 무거운 ALIGNN 추론을 워커 프로세스 풀로 넘기고 바로 202 + job_id 를 돌려준다.
+# (요청 형식은 /screen_alignn/batch 와 같다: JSON 또는 zip 업로드)
+JOBS = JobManager()
+JOB_POLL_S = float(os.environ.get("JOB_POLL_S", 0.5))
+
+@app.on_event("shutdown")
+def _shutdown_jobs():
+    JOBS.shutdown()
+    INGEST.shutdown()
+    RESULTS.flush()
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request):
+    """CIF 스크리닝 작업 등록 → {job_id, status}. 결과는 GET /jobs/{job_id}"""
+    req = await _read_batch_request(request)
+    names, cifs = _batch_items(req)
+    try:
+        # 캐시 조회(CIF 파싱)가 이벤트 루프를 막지 않도록 스레드 풀에서
+        job_id = await run_in_threadpool(
+            JOBS.submit,
+            cifs,
+            finalize=lambda preds: _rank_predictions(names, preds, req),
+            lookup=cached_material,
+            on_result=remember_material,
+            gate=_batch_gate(req),
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except BrokenProcessPool as e:
+        raise HTTPException(status_code=503, detail=f"job workers unavailable: {e}", headers={"Retry-After": "5"})
+    return {"job_id": job_id, "status": JOBS.get(job_id)["status"], "total": len(cifs)}
+
+@app.get("/jobs")
+def jobs_stats():
+    """워커 수, 대기 중인 조각 수 등 큐 상태"""
+    return JOBS.stats()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """작업 상태 조회 (status: queued | running | done | error, 끝나면 result 포함)"""
+    info = JOBS.get(job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return info
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """작업 상태를 Server-Sent Events 로 흘려보낸다 (진행률이 바뀔 때마다, 끝나면 result 포함 후 종료)"""
+    if JOBS.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+
+    async def events():
+        last = None
+        while not await request.is_disconnected():
+            info = JOBS.get(job_id)
+            if info is None:
+                return
+            state = (info["status"], info["completed"])
+            if state != last:
+                last = state
+                yield f"event: status\ndata: {json.dumps(info)}\n\n"
+            if info["status"] in TERMINAL:
+                return
+            await asyncio.sleep(JOB_POLL_S)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                              headers={"Cache-Control": "no-cache"})
+
+# ---------- 관측 (/metrics) ----------
+# 단계별 히스토그램(telemetry.span)과 요청 시간은 telemetry 에서, 캐시/큐 상태는 여기서 모아 내보낸다
+def _service_metrics():
+    q = JOBS.stats()
+    yield ("pretcad_job_queue_depth", "gauge", "워커 풀에서 대기/실행 중인 작업 조각 수",
+           [({}, q["queued_chunks"])])
+    yield ("pretcad_job_queue_capacity", "gauge", "작업 조각 대기 상한 (JOB_MAX_QUEUE)",
+           [({}, q["max_queue"])])
+    yield ("pretcad_jobs_active", "gauge", "끝나지 않은 작업 수", [({}, q["active_jobs"])])
+    c = INGEST.stats()
+    yield ("pretcad_cif_parse_cache_lookups_total", "counter", "CIF 파싱 캐시 조회 수",
+           [({"result": "hit"}, c["hits"]), ({"result": "miss"}, c["misses"])])
+    yield ("pretcad_cif_rejected_total", "counter", "크기/원자 수 예산으로 거부한 CIF 수",
+           [({}, c["rejected"])])
+    yield ("pretcad_chart_cache_entries", "gauge", "차트 PNG 캐시 항목 수", [({}, len(_CHART_CACHE))])
+
+telemetry.register_collector(_service_metrics)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus 텍스트 포맷 (단계별 지연 히스토그램, 요청 시간, 캐시 적중, 큐 깊이)"""
+    return Response(telemetry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/screen_alignn/{material_id}")
+def rescreen_material(material_id: str, req: RescreenReq):
+    """등록된 재료의 예측값으로 screen_mosfet만 다시 실행 (ALIGNN 추론 없음, 앙상블 멤버도 캐시에 있는 것만)"""
+    raw_props = lookup_material(material_id)
+    if raw_props is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Unknown or expired material_id; register the CIF again via /materials",
+        )
 
+    samples = (ensemble_samples([(material_id, None, raw_props)], req.conditions, infer=False)[0]
+               if req.uncertainty else None)
+    result = _screen_alignn_props(raw_props, req.conditions, req.render_chart, req.chart_format, samples)
+    result["material_id"] = material_id
+    if req.store:
+        _store_results([_result_record(None, material_id, result)])
+    return _json_response(result)
@@ -0,0 +1,116 @@
+"""
+벤치마크 공통: 경로 설정, 분위수, 결과 표/JSON, 기준값(baseline) 비교
+
+기준값 파일은 {벤치마크 이름: {지표: 값}} JSON.
+- 이름이 _ms / _us 로 끝나는 지표는 작을수록 좋고, _per_s 로 끝나면 클수록 좋다
+- CHECKED 에 있는 지표만 회귀 판정에 쓴다 (p99 는 잡음이 커서 보고만 한다)
+- 기준값은 측정하는 머신마다 따로 저장한다 (--save-baseline)
+- ALIGNN 대신 조성 기반 대역(predictors.SurrogatePredictor)으로 서버 경로 전체를 돌린다 (use_surrogate)
+"""
+import json
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+CHECKED = ("median_us", "p50_ms", "p95_ms", "ops_per_s", "req_per_s")
+
+
+def use_surrogate(latency_ms: float = 0.0) -> None:
+    """
+    PREDICTOR_BACKEND=surrogate 로 고정 (alignn_adapter / app 을 import 하기 전에 부를 것).
+    latency_ms: 구조 하나당 추론 시간 흉내 (sleep → GIL 을 놓는 점은 실제 torch 추론과 비슷)
+    CIF 파싱, 캐시, 중복 묶기, 스크리닝, 차트, 직렬화는 실제 코드 그대로 돈다.
+    """
+    if "alignn_adapter" in sys.modules:
+        raise RuntimeError("use_surrogate() must be called before importing alignn_adapter/app")
+    os.environ["PREDICTOR_BACKEND"] = "surrogate"
+    os.environ["SURROGATE_LATENCY_MS"] = str(float(latency_ms))
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """지연시간 목록 [s] → p50/p95/p99/max [ms]"""
+    a = np.asarray(seconds, dtype=float) * 1e3
+    if a.size == 0:
+        return {"p50_ms": float("nan"), "p95_ms": float("nan"), "p99_ms": float("nan"), "max_ms": float("nan")}
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(a.max())}
+
+
+def print_table(results: Dict[str, Dict[str, float]], columns: List[str]) -> None:
+    width = max([len(n) for n in results] + [10])
+    print(f"{'benchmark':{width}s}  " + "  ".join(f"{c:>12s}" for c in columns))
+    for name, r in results.items():
+        cells = []
+        for c in columns:
+            v = r.get(c)
+            cells.append(f"{v:12.3f}" if isinstance(v, (int, float)) else f"{'-':>12s}")
+        print(f"{name:{width}s}  " + "  ".join(cells))
+
+
+def default_baseline(suite: str) -> str:
+    return os.path.join(BENCH_DIR, f"baseline_{suite}.json")
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"[baseline] saved {path}")
+
+
+def check_regression(results: Dict[str, Dict[str, float]], path: str, tolerance: float) -> List[str]:
+    """
+    기준값 대비 tolerance(비율) 이상 나빠진 지표 목록.
+    기준값 파일이 없으면 비교를 건너뛴다 (빈 목록).
+    """
+    if not os.path.exists(path):
+        print(f"[baseline] {path} 없음 → 비교 생략 (--save-baseline 으로 저장)")
+        return []
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in CHECKED:
+            if key not in r or key not in base or not base[key]:
+                continue
+            new, old = float(r[key]), float(base[key])
+            if key.endswith("_per_s"):
+                worse = new < old * (1.0 - tolerance)
+            else:
+                worse = new > old * (1.0 + tolerance)
+            if worse:
+                failures.append(f"{name}.{key}: {new:.3f} (baseline {old:.3f}, tolerance {tolerance:.0%})")
+    return failures
+
+
+def finish(results: Dict[str, Dict[str, float]], args, suite: str) -> int:
+    """--json / --save-baseline / 회귀 판정 처리 → 종료코드"""
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    path = args.baseline or default_baseline(suite)
+    if args.save_baseline:
+        save_baseline(path, results)
+        return 0
+    failures = check_regression(results, path, args.tolerance)
+    for msg in failures:
+        print("  REGRESSION", msg)
+    return 1 if failures else 0
+
+
+def add_common_args(ap) -> None:
+    ap.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    ap.add_argument("--baseline", default=None, help="기준값 파일 (기본: benchmarks/baseline_<suite>.json)")
+    ap.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    ap.add_argument("--tolerance", type=float, default=0.3, help="허용 악화 비율 (기본 0.3 = 30%%)")
@@ -0,0 +1,71 @@
+"""
+import 시간/메모리 벤치마크 (헤드리스 코어가 무거운 의존성을 끌고 오지 않는지 감시)
+
+    python benchmarks/bench_import.py                # 기본: screener_core, screener_adapter
+    python benchmarks/bench_import.py -m m_screener -n 10 --max-ms 300
+
+- 모듈마다 새 파이썬 프로세스를 띄워 cold import 시간과 RSS 증가량을 잰다 (중앙값)
+- FORBIDDEN 모듈이 sys.modules 에 올라오거나 --max-ms 를 넘으면 종료코드 1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 서버 경로에서 import 되면 안 되는 모듈들 (노트북 UI 전용)
+FORBIDDEN = ["pandas", "ipywidgets", "IPython", "matplotlib"]
+
+_PROBE = r"""
+import json, resource, sys, time
+rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "ms": dt * 1000.0,
+    "rss_kb": rss1 - rss0,
+    "loaded": [m for m in {forbidden!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(module: str) -> dict:
+    code = _PROBE.format(module=module, forbidden=FORBIDDEN)
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-m", "--module", action="append",
+                    help="측정할 모듈 (여러 번 지정 가능, 기본: screener_core, screener_adapter)")
+    ap.add_argument("-n", "--repeat", type=int, default=5, help="모듈당 반복 횟수 (기본 5)")
+    ap.add_argument("--max-ms", type=float, default=None, help="중앙값 import 시간 상한 [ms]")
+    args = ap.parse_args(argv)
+
+    modules = args.module or ["screener_core", "screener_adapter"]
+    failed = False
+    for module in modules:
+        runs = [probe(module) for _ in range(max(1, args.repeat))]
+        ms = statistics.median(r["ms"] for r in runs)
+        rss = statistics.median(r["rss_kb"] for r in runs)
+        loaded = runs[-1]["loaded"]
+        print(f"{module:20s} import {ms:8.1f} ms   rss +{rss / 1024:6.1f} MiB   heavy: {loaded or '-'}")
+        if loaded:
+            failed = True
+        if args.max_ms is not None and ms > args.max_ms:
+            print(f"  -> {module}: {ms:.1f} ms > {args.max_ms:.1f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
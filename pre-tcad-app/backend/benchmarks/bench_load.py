@@ -0,0 +1,126 @@
+"""
+부하 테스트: 프로세스 안에서 FastAPI 앱을 httpx ASGITransport 로 직접 두드린다 (네트워크/서버 없음)
+
+    python benchmarks/bench_load.py                              # 기본 시나리오 전체
+    python benchmarks/bench_load.py -s screen_alignn -c 32 -n 2000
+    python benchmarks/bench_load.py --alignn-latency-ms 30       # 구조당 가짜 추론 시간
+    python benchmarks/bench_load.py --save-baseline              # 이 머신 기준값 저장
+
+시나리오:
+  screen            POST /screen        (물성 직접 입력, PNG 차트 포함)
+  screen_nochart    POST /screen        (render_chart=false)
+  screen_alignn     POST /screen_alignn (CIF → surrogate 예측기 → 스크리닝 → 차트)
+
+- 동시 요청 수(-c)만큼 코루틴이 요청을 계속 보낸다. 동기 엔드포인트는 실제 서버처럼 스레드풀에서 돈다.
+- 요청 입력은 --distinct 개를 돌려 쓴다 (캐시 적중률 조절: 작을수록 적중이 많다)
+- 결과: 처리량(req/s), p50/p95/p99/max 지연 [ms], 실패 수
+- 기준값 대비 p50/p95 가 느려지거나 처리량이 떨어지면 종료코드 1 (_common.CHECKED)
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+
+import _common
+
+SCENARIOS = ("screen", "screen_nochart", "screen_alignn")
+
+
+def make_payloads(scenario: str, distinct: int) -> list:
+    import numpy as np
+    rng = np.random.default_rng(0)
+    if scenario in ("screen", "screen_nochart"):
+        return [
+            ("/screen", {
+                "props": {"Eg_eV": float(eg), "eps_r": float(eps), "Ef_eV_atom": float(ef)},
+                "device": "nmos",
+                "conditions": {"temp": 300, "vdd": 0.9},
+                "render_chart": scenario == "screen",
+            })
+            for eg, eps, ef in zip(rng.uniform(0.5, 4.0, distinct), rng.uniform(4, 25, distinct),
+                                   rng.uniform(-2.5, -0.1, distinct))
+        ]
+
+    import ase.io
+    from ase.build import bulk
+    protos = [("Si", "diamond", 5.43), ("Ge", "diamond", 5.66), ("GaAs", "zincblende", 5.65),
+              ("InP", "zincblende", 5.87), ("NaCl", "rocksalt", 5.64), ("MgO", "rocksalt", 4.21)]
+    out = []
+    for i in range(distinct):
+        name, kind, a = protos[i % len(protos)]
+        buf = io.BytesIO()
+        ase.io.write(buf, bulk(name, kind, a * (1.0 + 0.002 * (i // len(protos)))), format="cif")
+        out.append(("/screen_alignn", {"cif": buf.getvalue().decode(), "conditions": {"vdd": 0.9}}))
+    return out
+
+
+async def run_scenario(app, scenario: str, concurrency: int, total: int, distinct: int,
+                       warmup: int) -> dict:
+    import httpx
+
+    payloads = make_payloads(scenario, distinct)
+    transport = httpx.ASGITransport(app=app)
+    latencies, errors = [], 0
+    counter = iter(range(total + warmup))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                path, body = payloads[i % len(payloads)]
+                t0 = time.perf_counter()
+                r = await client.post(path, json=body)
+                dt = time.perf_counter() - t0
+                if i < warmup:
+                    continue
+                if r.status_code != 200:
+                    errors += 1
+                latencies.append(dt)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+
+    done = len(latencies)
+    return {
+        "req_per_s": done / wall if wall > 0 else 0.0,
+        **_common.latency_summary(latencies),
+        "requests": done,
+        "errors": errors,
+        "concurrency": concurrency,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-s", "--scenario", action="append", choices=SCENARIOS,
+                    help="시나리오 (여러 번 가능, 기본: 전체)")
+    ap.add_argument("-c", "--concurrency", type=int, default=16, help="동시 요청 수 (기본 16)")
+    ap.add_argument("-n", "--requests", type=int, default=500, help="시나리오당 측정 요청 수 (기본 500)")
+    ap.add_argument("--warmup", type=int, default=None, help="측정 전 워밍업 요청 수 (기본: 동시 요청 수 × 2)")
+    ap.add_argument("--distinct", type=int, default=64, help="서로 다른 입력 수 (기본 64)")
+    ap.add_argument("--alignn-latency-ms", type=float, default=0.0, help="surrogate 예측기의 추론 시간 [ms/구조]")
+    _common.add_common_args(ap)
+    args = ap.parse_args(argv)
+
+    _common.use_surrogate(latency_ms=args.alignn_latency_ms)
+    import app as server
+
+    warmup = args.concurrency * 2 if args.warmup is None else args.warmup
+    results = {}
+    for scenario in args.scenario or SCENARIOS:
+        name = f"{scenario}@c{args.concurrency}"
+        results[name] = asyncio.run(run_scenario(
+            server.app, scenario, args.concurrency, args.requests, args.distinct, warmup,
+        ))
+    _common.print_table(results, ["req_per_s", "p50_ms", "p95_ms", "p99_ms", "max_ms", "errors"])
+    code = _common.finish(results, args, "load")
+    if any(r["errors"] for r in results.values()):
+        print("  ERRORS: 200 이 아닌 응답이 있습니다")
+        code = 1
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+마이크로 벤치마크: 스크리닝 경로의 단계별 함수
+
+    python benchmarks/bench_micro.py                  # 전체
+    python benchmarks/bench_micro.py -k chart -k cif  # 이름에 포함된 것만
+    python benchmarks/bench_micro.py --save-baseline  # 이 머신 기준값 저장
+    python benchmarks/bench_micro.py --tolerance 0.2  # 기준값보다 20% 넘게 느려지면 종료코드 1
+
+측정 대상:
+  compute_metrics / compute_percentiles     (후보 1개, screener_core)
+  compute_metrics_arrays_1k                 (후보 1000개 배열 연산)
+  baseline_uncached / baseline_cached       (베이스라인 12종 퍼센트)
+  screen_mosfet                             (screener_adapter 1회, 베이스라인 캐시 적중)
+  chart_render_uncached / chart_cached      (app._render_ranking_chart / make_ranking_chart)
+  chart_data                                (make_ranking_chart_data)
+  cif_parse_small / cif_parse_large         (ase CIF 파싱, 캐시 없이)
+  cif_parse_cached                          (cif_ingest 캐시 적중)
+
+- 각 벤치마크는 목표 시간(--min-time)을 채울 때까지 반복하고, 반복 묶음별 1회 평균의 중앙값을 쓴다
+- 차트/CIF 항목은 app 을 import 하므로 surrogate 예측기로 ALIGNN 을 대신한다 (_common.use_surrogate)
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+
+import _common
+
+
+def measure(fn, min_time: float, rounds: int = 7) -> dict:
+    """fn() 을 반복 → {median_us, ops_per_s, runs}"""
+    fn()   # 워밍업 (lazy import, 캐시 채우기)
+    # 한 묶음이 min_time / rounds 정도 걸리도록 반복 수 결정
+    n, t = 1, 0.0
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        t = time.perf_counter() - t0
+        if t >= min_time / rounds or n >= 1_000_000:
+            break
+        n = max(n * 2, int(n * (min_time / rounds) / max(t, 1e-9)))
+    per = [t / n]
+    for _ in range(rounds - 1):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        per.append((time.perf_counter() - t0) / n)
+    med = statistics.median(per)
+    return {"median_us": med * 1e6, "ops_per_s": 1.0 / med, "runs": n * rounds}
+
+
+def _cif(atoms) -> str:
+    import ase.io
+    buf = io.BytesIO()
+    ase.io.write(buf, atoms, format="cif")
+    return buf.getvalue().decode()
+
+
+def build_cases():
+    _common.use_surrogate()
+    import numpy as np
+    import screener_core as M
+    import screener_adapter as SA
+    import cif_ingest
+    import app
+    from ase.build import bulk
+
+    m = M.MaterialInputs(Eg_eV=1.12, eps_r=11.7, Ef_eV_atom=-0.3)
+    s = M.SliderParams()
+    metrics = M.compute_metrics(m, s)
+    props = {"Eg_eV": 1.12, "eps_r": 11.7, "Ef_eV_atom": -0.3}
+    key = SA._params_key(SA._slider_params(props, 300.0, 0.9))
+
+    rng = np.random.default_rng(0)
+    n = 1000
+    arrays = (rng.uniform(0.3, 6.0, n), rng.uniform(3.0, 30.0, n), rng.uniform(-3.0, 0.0, n))
+
+    res = SA.screen_mosfet(props)
+    perc, bp = res["percentiles"], res["baseline_percentiles"]
+    perc_r = app._round_pcts(perc)
+    bp_r = {k: app._round_pcts(v) for k, v in bp.items()}
+
+    small = _cif(bulk("Si", "diamond", 5.43))
+    large = _cif(bulk("GaAs", "zincblende", 5.65, cubic=True) * (3, 3, 3))   # 216 원자
+    cif_ingest.parse_cif(small)
+
+    return {
+        "compute_metrics": lambda: M.compute_metrics(m, s),
+        "compute_percentiles": lambda: M.compute_percentiles(metrics),
+        "compute_metrics_arrays_1k": lambda: M.compute_percentiles_arrays(
+            M.compute_metrics_arrays(*arrays, **s.__dict__)),
+        "baseline_uncached": lambda: SA._compute_baseline(key),
+        "baseline_cached": lambda: SA._baseline_percentiles(SA._slider_params(props, 300.0, 0.9)),
+        "screen_mosfet": lambda: SA.screen_mosfet(props),
+        "chart_render_uncached": lambda: app._render_ranking_chart(perc_r, bp_r),
+        "chart_cached": lambda: app.make_ranking_chart(perc, bp),
+        "chart_data": lambda: app.make_ranking_chart_data(perc, bp),
+        "cif_parse_small": lambda: cif_ingest._parse(small),
+        "cif_parse_large": lambda: cif_ingest._parse(large),
+        "cif_parse_cached": lambda: cif_ingest.parse_cif(small),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-k", "--filter", action="append", help="이름에 이 문자열이 들어간 것만 (여러 번 가능)")
+    ap.add_argument("--min-time", type=float, default=1.0, help="벤치마크당 측정 시간 [s] (기본 1)")
+    _common.add_common_args(ap)
+    args = ap.parse_args(argv)
+
+    cases = build_cases()
+    if args.filter:
+        cases = {k: v for k, v in cases.items() if any(f in k for f in args.filter)}
+
+    results = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, args.min_time)
+    _common.print_table(results, ["median_us", "ops_per_s", "runs"])
+    return _common.finish(results, args, "micro")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
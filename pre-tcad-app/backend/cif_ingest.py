@@ -0,0 +1,241 @@
+"""
+CIF → ASE Atoms 변환 계층 (파싱 캐시 + 크기 예산 + 병렬 파싱)
+
+- ase.io.read(cif) 는 큰 셀에서 느리다 → 같은 CIF 는 한 번만 파싱
+    · 키: prediction_cache.cif_text_key (공백/주석 정리 후 sha256) → 서식만 다른 같은 파일도 적중
+    · 캐시에는 Atoms 원본을 두고, 호출자에게는 copy() 를 준다 (호출자가 바꿔도 캐시는 그대로)
+    · 파싱 실패도 기억해서 같은 잘못된 파일을 다시 파싱하지 않는다
+- 파싱 전에 예산 검사 → 넘으면 CifRejected (ValueError 하위 클래스, API 에서 413)
+    · 바이트 수 (CIF_MAX_BYTES)
+    · 비대칭 단위 원자 수 (_atom_site 루프 행 수, 파싱 전에 셀 수 있는 하한)
+    · 대칭 전개 후 원자 수 (CIF_MAX_ATOMS, 파싱 직후)
+- parse_many: 캐시 미스가 CIF_PARALLEL_MIN 개 이상이면 별도 프로세스 풀에서 나눠 파싱
+    · 작업 큐 워커처럼 이미 프로세스 단위로 병렬인 곳에서는 PARALLEL = False 로 끈다
+
+환경변수:
+  CIF_MAX_BYTES             CIF 텍스트 최대 크기 (기본 2 MiB)
+  CIF_MAX_ATOMS             셀 안 원자 수 상한 (기본 1000)
+  CIF_PARSE_CACHE_ENTRIES   파싱 결과 LRU 크기 (기본 512)
+  CIF_PARSE_WORKERS         병렬 파싱 프로세스 수 (기본 min(4, 코어 수), 0/1 이면 끔)
+  CIF_PARALLEL_MIN          병렬 파싱을 쓰는 최소 미스 개수 (기본 8)
+"""
+import logging
+import multiprocessing as mp
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from typing import Dict, List, Optional, Union
+
+from prediction_cache import cif_text_key
+
+log = logging.getLogger("pretcad.cif")
+
+CIF_MAX_BYTES       = int(os.environ.get("CIF_MAX_BYTES", 2 * 1024 * 1024))
+CIF_MAX_ATOMS       = int(os.environ.get("CIF_MAX_ATOMS", 1000))
+CIF_CACHE_ENTRIES   = int(os.environ.get("CIF_PARSE_CACHE_ENTRIES", 512))
+CIF_PARSE_WORKERS   = int(os.environ.get("CIF_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+CIF_PARALLEL_MIN    = int(os.environ.get("CIF_PARALLEL_MIN", 8))
+
+# 작업 큐 워커 등 이미 병렬로 도는 프로세스에서는 False 로 두고 직렬 파싱
+PARALLEL = True
+
+
+class CifRejected(ValueError):
+    """예산(크기/원자 수)을 넘어서 파싱하지 않은 CIF"""
+
+
+# ---------- 예산 검사 ----------
+def _count_atom_sites(cif_text: str) -> int:
+    """
+    _atom_site_* 루프의 데이터 행 수 (= 비대칭 단위 원자 수).
+    대칭 전개 전 값이라 실제 원자 수의 하한 → 이것만으로 넘으면 파싱할 필요가 없다.
+    """
+    count, in_loop, in_atom_loop, seen_data = 0, False, False, False
+    for line in cif_text.splitlines():
+        s = line.strip()
+        if not s or s.startswith("#"):
+            continue
+        low = s.lower()
+        if low == "loop_":
+            in_loop, in_atom_loop, seen_data = True, False, False
+        elif low.startswith("_"):
+            if in_loop and seen_data:
+                in_loop = in_atom_loop = False
+            if in_loop and low.startswith("_atom_site_") and not low.startswith("_atom_site_aniso"):
+                in_atom_loop = True
+        elif low.startswith("data_"):
+            in_loop = in_atom_loop = False
+        elif in_loop:
+            seen_data = True
+            if in_atom_loop:
+                count += 1
+    return count
+
+
+def check_budget(cif_text: str) -> None:
+    """파싱 전 예산 검사. 넘으면 CifRejected."""
+    size = len(cif_text.encode("utf-8"))
+    if size > CIF_MAX_BYTES:
+        raise CifRejected(f"CIF is too large ({size} bytes > {CIF_MAX_BYTES})")
+    sites = _count_atom_sites(cif_text)
+    if sites > CIF_MAX_ATOMS:
+        raise CifRejected(f"CIF has too many atom sites ({sites} > {CIF_MAX_ATOMS})")
+
+
+def _check_atoms(atoms) -> None:
+    if len(atoms) > CIF_MAX_ATOMS:
+        raise CifRejected(f"structure has too many atoms ({len(atoms)} > {CIF_MAX_ATOMS})")
+    if len(atoms) == 0:
+        raise ValueError("Invalid CIF text format")
+
+
+# ---------- 파싱 (워커에서도 실행) ----------
+def _parse(cif_text: str):
+    """예산 검사 + ase.io.read. 실패는 예외 대신 문자열로 (프로세스 경계를 넘기 쉽게)"""
+    from ase.io import read
+    try:
+        check_budget(cif_text)
+        atoms = read(StringIO(cif_text), format="cif")
+        _check_atoms(atoms)
+        return atoms
+    except CifRejected as e:
+        return ("rejected", str(e))
+    except Exception as e:
+        log.warning("CIF parsing failed: %s", e)
+        return ("error", "Invalid CIF text format")
+
+
+def _parse_chunk(cif_texts: List[str]) -> list:
+    return [_parse(t) for t in cif_texts]
+
+
+def _as_result(parsed) -> Union[object, ValueError]:
+    """_parse 결과 → Atoms 사본 또는 예외 인스턴스"""
+    if isinstance(parsed, tuple):
+        kind, msg = parsed
+        return CifRejected(msg) if kind == "rejected" else ValueError(msg)
+    return parsed.copy()
+
+
+# ---------- 캐시 + 병렬 ----------
+class CifIngest:
+    """스레드 안전한 파싱 캐시 + (필요할 때 띄우는) 파싱 프로세스 풀"""
+
+    def __init__(self, max_entries: int = CIF_CACHE_ENTRIES, workers: int = CIF_PARSE_WORKERS,
+                 parallel_min: int = CIF_PARALLEL_MIN):
+        self.max_entries = max(1, max_entries)
+        self.workers = workers
+        self.parallel_min = max(1, parallel_min)
+        self._cache: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def _get(self, key: str):
+        with self._lock:
+            item = self._cache.get(key)
+            if item is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return item
+
+    def _put(self, key: str, parsed) -> None:
+        with self._lock:
+            if isinstance(parsed, tuple) and parsed[0] == "rejected":
+                self.rejected += 1
+            self._cache[key] = parsed
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def parse(self, cif_text: str):
+        """CIF 하나 → Atoms (실패 시 ValueError, 예산 초과 시 CifRejected)"""
+        key = cif_text_key(cif_text)
+        parsed = self._get(key)
+        if parsed is None:
+            parsed = _parse(cif_text)
+            self._put(key, parsed)
+        result = _as_result(parsed)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def parse_many(self, cif_texts: List[str]) -> list:
+        """
+        여러 CIF → 입력 순서대로 Atoms 또는 예외 인스턴스.
+        캐시 미스가 parallel_min 개 이상이면 프로세스 풀에 나눠서 파싱한다.
+        """
+        keys = [cif_text_key(t) for t in cif_texts]
+        parsed: Dict[str, object] = {}
+        todo: Dict[str, str] = {}
+        for key, text in zip(keys, cif_texts):
+            if key in parsed or key in todo:
+                continue
+            item = self._get(key)
+            if item is None:
+                todo[key] = text
+            else:
+                parsed[key] = item
+
+        if todo:
+            texts = list(todo.values())
+            if PARALLEL and self.workers > 1 and len(texts) >= self.parallel_min:
+                try:
+                    results = self._parse_parallel(texts)
+                except BrokenProcessPool:
+                    # 파싱 워커가 죽었으면 풀은 버리고 이번 묶음은 직렬로
+                    self.shutdown()
+                    results = _parse_chunk(texts)
+            else:
+                results = _parse_chunk(texts)
+            for key, res in zip(todo, results):
+                self._put(key, res)
+                parsed[key] = res
+        return [_as_result(parsed[k]) for k in keys]
+
+    def _parse_parallel(self, texts: List[str]) -> list:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=mp.get_context("spawn")
+                    )
+        n = max(1, -(-len(texts) // (self.workers * 2)))
+        chunks = [texts[k:k + n] for k in range(0, len(texts), n)]
+        out = []
+        for part in self._pool.map(_parse_chunk, chunks):
+            out.extend(part)
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "workers": self.workers if PARALLEL else 0,
+        }
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+INGEST = CifIngest()
+
+
+def parse_cif(cif_text: str):
+    return INGEST.parse(cif_text)
+
+
+def parse_cifs(cif_texts: List[str]) -> list:
+    return INGEST.parse_many(cif_texts)
@@ -0,0 +1,229 @@
+"""
+스크리닝 결과 열(column) 저장소 — 열마다 raw 바이너리 파일 1개 + meta.json
+
+    <root>/meta.json          스키마, 행 수, 문자열 사전(cond_key, model_version)
+    <root>/score.f8           float64 배열 (리틀엔디언)
+    <root>/Ion_percent.f8     …
+    <root>/material_id.S64    고정 길이 바이트열 (sha256 hex)
+
+- append 전용. 각 열 파일 끝에 이어 쓰고, 마지막에 meta.json 의 행 수를 원자적으로 바꾼다
+  → meta 의 행 수가 커밋 지점. 도중에 죽으면 다음 append 때 남은 꼬리 바이트를 잘라낸다.
+- 읽기는 np.memmap (복사/파싱 없음). 분석/순위/재가중치는 필요한 열만 mmap 해서 쓴다.
+- 여러 프로세스(gunicorn 워커, CLI)가 같은 폴더에 쓸 수 있도록 append 는 파일 잠금(flock) 안에서 한다.
+- cond_key / model_version 같은 반복 문자열은 사전 인코딩(정수 코드 열 + meta 의 문자열 목록)
+
+    store = ColumnarStore("results_cols")
+    store.append(records)                 # ResultsStore.add_many 와 같은 레코드 형식 (+ id, metrics)
+    ion = store.column("Ion_percent")     # 읽기 전용 memmap
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import screener_core as M
+from screener_adapter import MODEL_VERSION, PERCENT_KEYS
+
+try:
+    import fcntl
+except ImportError:   # Windows: 프로세스 간 잠금 없이 동작 (단일 writer 전제)
+    fcntl = None
+
+SCHEMA_VERSION = 1
+INPUT_KEYS = ["Eg_eV", "eps_r", "Ef_eV_atom"]
+# 사전 인코딩하는 문자열 열 → 코드 dtype
+DICT_COLUMNS = {"cond_key": "<u4", "model_version": "<u2"}
+SCHEMA: List[tuple] = (
+    [("id", "<i8"), ("material_id", "S64"), ("cond_key", "<u4"), ("model_version", "<u2"),
+     ("created", "<f8")]
+    + [(k, "<f8") for k in INPUT_KEYS]
+    + [(k, "<f8") for k in M.METRIC_KEYS]
+    + [(k, "<f8") for k in PERCENT_KEYS]
+    + [("score", "<f8")]
+)
+_DTYPES = dict(SCHEMA)
+
+
+def _suffix(dtype: str) -> str:
+    return np.dtype(dtype).str.lstrip("<>|=").lower()
+
+
+class ColumnarStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        self._meta: Dict[str, Any] = {}
+        self._maps: Dict[str, np.ndarray] = {}
+        self._reload_meta(force=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["ColumnarStore"]:
+        """RESULTS_COLUMNS (폴더 경로) 가 있으면 생성, 없으면 None"""
+        root = os.environ.get("RESULTS_COLUMNS")
+        return cls(root) if root else None
+
+    # ----- 메타 -----
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name}.{_suffix(_DTYPES[name])}"
+
+    def _reload_meta(self, force: bool = False) -> None:
+        meta_path = self.root / "meta.json"
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if not force and mtime == self._meta_mtime:
+            return
+        if mtime is None:
+            meta = {
+                "schema_version": SCHEMA_VERSION,
+                "columns": [[n, d] for n, d in SCHEMA],
+                "rows": 0,
+                "dictionaries": {k: [] for k in DICT_COLUMNS},
+            }
+        else:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("columns") != [[n, d] for n, d in SCHEMA]:
+                raise ValueError(f"{self.root}: 열 스키마가 현재 코드와 다릅니다 (schema_version={meta.get('schema_version')})")
+        self._meta, self._meta_mtime = meta, mtime
+        self._maps.clear()
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.root / "meta.json")
+        self._meta = meta
+        self._meta_mtime = (self.root / "meta.json").stat().st_mtime_ns
+        self._maps.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._reload_meta()
+            return int(self._meta["rows"])
+
+    # ----- 쓰기 -----
+    def append(self, records: List[Dict[str, Any]]) -> int:
+        """
+        records: {id, material_id, cond_key, model_version, inputs{}, metrics{}, percentiles{}, score}
+        (빠진 숫자 값은 NaN)
+        """
+        if not records:
+            return 0
+        n_new = len(records)
+        now = time.time()
+        with self._lock, self._file_lock():
+            self._reload_meta(force=True)
+            meta = json.loads(json.dumps(self._meta))   # 사본에 반영 후 마지막에 커밋
+            rows = int(meta["rows"])
+
+            cols: Dict[str, np.ndarray] = {}
+            for name, dtype in SCHEMA:
+                if name in DICT_COLUMNS:
+                    cols[name] = self._encode(meta, name, [
+                        r.get(name) or (MODEL_VERSION if name == "model_version" else "")
+                        for r in records
+                    ])
+                elif name == "material_id":
+                    cols[name] = np.array([r["material_id"].encode("ascii") for r in records], dtype="S64")
+                elif name == "id":
+                    cols[name] = np.array([int(r.get("id", -1)) for r in records], dtype=dtype)
+                elif name == "created":
+                    cols[name] = np.full(n_new, now, dtype=dtype)
+                else:
+                    group = ("inputs" if name in INPUT_KEYS else
+                             "percentiles" if name in PERCENT_KEYS else
+                             "metrics" if name in M.METRIC_KEYS else None)
+                    cols[name] = np.array([
+                        _num(r.get(name) if group is None else (r.get(group) or {}).get(name))
+                        for r in records
+                    ], dtype=dtype)
+
+            for name, dtype in SCHEMA:
+                path = self._path(name)
+                size = rows * np.dtype(dtype).itemsize
+                with open(path, "ab") as f:
+                    if f.tell() != size:   # 지난번에 커밋 못 한 꼬리 바이트 정리
+                        f.truncate(size)
+                        f.seek(size)
+                    f.write(np.ascontiguousarray(cols[name]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            meta["rows"] = rows + n_new
+            self._write_meta(meta)
+        return n_new
+
+    def _encode(self, meta: Dict[str, Any], name: str, values: List[str]) -> np.ndarray:
+        words = meta["dictionaries"][name]
+        index = {w: i for i, w in enumerate(words)}
+        codes = []
+        for v in values:
+            code = index.get(v)
+            if code is None:
+                code = index[v] = len(words)
+                words.append(v)
+            codes.append(code)
+        return np.array(codes, dtype=DICT_COLUMNS[name])
+
+    def _file_lock(self):
+        return _FileLock(self.root / ".lock")
+
+    # ----- 읽기 -----
+    def column(self, name: str) -> np.ndarray:
+        """열 하나를 읽기 전용 memmap 으로 (행 수는 마지막 커밋 기준)"""
+        if name not in _DTYPES:
+            raise KeyError(f"없는 열: {name}")
+        with self._lock:
+            self._reload_meta()
+            arr = self._maps.get(name)
+            if arr is None:
+                rows = int(self._meta["rows"])
+                if rows == 0:
+                    arr = np.empty(0, dtype=_DTYPES[name])
+                else:
+                    arr = np.memmap(self._path(name), dtype=_DTYPES[name], mode="r", shape=(rows,))
+                self._maps[name] = arr
+            return arr
+
+    def columns(self, names: List[str]) -> Dict[str, np.ndarray]:
+        return {n: self.column(n) for n in names}
+
+    def dictionary(self, name: str) -> List[str]:
+        with self._lock:
+            self._reload_meta()
+            return list(self._meta["dictionaries"][name])
+
+    def code_of(self, name: str, value: str) -> Optional[int]:
+        """사전 인코딩 열에서 문자열의 코드 (없으면 None)"""
+        words = self.dictionary(name)
+        return words.index(value) if value in words else None
+
+
+class _FileLock:
+    """flock 기반 프로세스 간 배타 잠금 (fcntl 이 없으면 아무것도 안 함)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._f = open(self.path, "a")
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._f is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            self._f.close()
+            self._f = None
+
+
+def _num(v) -> float:
+    return float("nan") if v is None else float(v)
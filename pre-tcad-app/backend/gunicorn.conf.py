@@ -0,0 +1,38 @@
+"""
+gunicorn 설정 (uvicorn 워커)
+
+    gunicorn -c gunicorn.conf.py app:app
+
+- preload_app=True : 마스터 프로세스에서 app 을 한 번 import 하고 fork
+  → ALIGNN_PRELOAD=1 로 모델 가중치를 fork 전에 올려서 워커들이 copy-on-write 로 공유
+- 더미 추론(워밍업)은 fork 뒤 각 워커의 startup 훅에서 돈다 (/ready 로 확인)
+- SQLite 연결(RESULTS_DB, ALIGNN_CACHE_DB)은 import 시점에 열어두지 않고 워커(PID)마다 처음 쓸 때 연다
+  (fork 로 물려받은 연결을 여러 프로세스가 같이 쓰면 DB 가 깨질 수 있음)
+- 워커가 2개 이상이면 RESULTS_DB 가 필요하다. 기본 ":memory:" 결과 저장소는 워커마다 따로라
+  /rank, /rescore 결과가 어느 워커가 받았는지에 따라 달라지므로, 설정이 없으면 시작하지 않는다.
+
+환경변수: WEB_CONCURRENCY (워커 수, 기본 2), PORT (기본 8000), WEB_TIMEOUT (기본 120),
+          RESULTS_DB (결과 저장소 SQLite 경로, 워커 2개 이상이면 필수)
+"""
+import gc
+import os
+
+os.environ.setdefault("ALIGNN_PRELOAD", "1")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+
+if workers > 1 and not os.environ.get("RESULTS_DB"):
+    raise RuntimeError(
+        f"WEB_CONCURRENCY={workers} needs RESULTS_DB (a SQLite path shared by all workers); "
+        "the default in-memory results store is per worker, so /rank and /rescore would disagree"
+    )
+
+
+def when_ready(server):
+    # preload 로 만들어진 객체들을 GC 추적에서 빼서,
+    # 워커의 GC 가 refcount/헤더를 건드려 공유 페이지를 복사하는 일을 줄인다
+    gc.freeze()
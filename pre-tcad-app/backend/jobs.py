@@ -0,0 +1,320 @@
+"""
+ALIGNN 추론 작업 큐 (POST /jobs → GET /jobs/{id})
+
+- 무거운 GNN 추론은 별도 워커 프로세스 풀에서 돌린다.
+  · 워커마다 initializer 에서 예측기 모델(ALIGNN 3종)을 한 번 올려두고 계속 재사용
+  · 워커별 torch 스레드 수를 고정해서 워커끼리 코어를 뺏지 않게 한다
+- 큰 작업은 JOB_CHUNK_SIZE 개씩 쪼개 여러 워커에 나눠 맡기고, 조각이 끝날 때마다 진행률 갱신
+- 큐 깊이(대기 중인 조각 수)가 JOB_MAX_QUEUE 를 넘으면 QueueFull → API 에서 503
+  · 큐가 비어 있으면 조각 수와 관계없이 받는다 (큰 작업이 빈 서버에서 영원히 503 이 나지 않도록)
+- 예측값(props)만 워커에서 받아오고, 캐시 등록/스크리닝/순위표는 메인 프로세스에서 처리
+  · 마지막 조각이 끝나면 finalize(스크리닝/저장/차트)는 전용 스레드 하나에서 순서대로 돈다
+    (future 콜백 스레드를 붙잡지 않도록, matplotlib 도 한 스레드에서만 쓰도록)
+
+환경변수:
+  JOB_WORKERS        워커 프로세스 수 (기본 2)
+  JOB_MAX_QUEUE      대기 가능한 조각 수 상한 (기본 64)
+  JOB_TORCH_THREADS  워커별 torch.set_num_threads (기본 1)
+  JOB_CHUNK_SIZE     조각 하나에 담는 CIF 수 (기본 ALIGNN_BATCH_SIZE 와 같게 32)
+  JOB_TTL_S          끝난 작업 결과 보관 시간 [s] (기본 3600)
+  JOB_START_METHOD   multiprocessing 시작 방식 (기본 spawn)
+"""
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+JOB_WORKERS       = int(os.environ.get("JOB_WORKERS", 2))
+JOB_MAX_QUEUE     = int(os.environ.get("JOB_MAX_QUEUE", 64))
+JOB_TORCH_THREADS = int(os.environ.get("JOB_TORCH_THREADS", 1))
+JOB_CHUNK_SIZE    = int(os.environ.get("JOB_CHUNK_SIZE", os.environ.get("ALIGNN_BATCH_SIZE", 32)))
+JOB_TTL_S         = float(os.environ.get("JOB_TTL_S", 3600))
+JOB_START_METHOD  = os.environ.get("JOB_START_METHOD", "spawn")
+
+TERMINAL = ("done", "error")
+
+log = logging.getLogger("pretcad.jobs")
+
+
+class QueueFull(Exception):
+    pass
+
+
+# ---------- 워커 프로세스 ----------
+def _worker_init(torch_threads: int) -> None:
+    """워커 시작 시 1회: torch 스레드 수 고정 + 모델 로드/워밍업"""
+    # 워커 자체가 이미 병렬이므로 CIF 파싱은 워커 안에서 직렬로
+    import cif_ingest
+    cif_ingest.PARALLEL = False
+
+    import alignn_adapter
+    alignn_adapter.PREDICTOR.set_num_threads(torch_threads)
+    alignn_adapter.warmup()
+
+
+def _worker_predict(cif_texts: List[str], gate=None) -> List[Any]:
+    """
+    워커에서 실행: CIF 조각 → [(material_id, props) / ("error", 메시지) / ("prefiltered", 상한, 기준)]
+    (예외 객체 대신 문자열/숫자로 돌려줘서 피클 문제를 피한다)
+    gate: prefilter.ScoreGate (조성 사전 필터, 없으면 전부 추론)
+    """
+    import alignn_adapter
+    from prefilter import Prefiltered
+    out = []
+    for p in alignn_adapter.predict_materials_batch(cif_texts, gate=gate):
+        if isinstance(p, Prefiltered):
+            out.append(("prefiltered", p.upper, p.min_score))
+        else:
+            out.append(("error", str(p)) if isinstance(p, Exception) else p)
+    return out
+
+
+# ---------- 작업 관리 ----------
+class _Job:
+    __slots__ = ("id", "status", "total", "completed", "created", "started",
+                 "finished", "preds", "pending", "finalize", "result", "error")
+
+    def __init__(self, total: int, finalize: Callable[[List[Any]], Dict[str, Any]]):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.total = total
+        self.completed = 0
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.preds: List[Any] = [None] * total
+        self.pending: List[Any] = []      # 아직 안 끝난 future 목록
+        self.finalize = finalize
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+
+class JobManager:
+    """
+    프로세스 풀 + 작업 상태표.
+    - 풀은 첫 submit 때 띄운다 (서버 기동/헬스체크를 느리게 하지 않도록)
+    - lookup(cif) 으로 메인 프로세스 캐시에 이미 있는 CIF 는 워커로 보내지 않는다
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queue: int = JOB_MAX_QUEUE,
+                 torch_threads: int = JOB_TORCH_THREADS, chunk_size: int = JOB_CHUNK_SIZE,
+                 ttl_s: float = JOB_TTL_S, start_method: str = JOB_START_METHOD):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.torch_threads = torch_threads
+        self.chunk_size = max(1, chunk_size)
+        self.ttl_s = ttl_s
+        self.start_method = start_method
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._finalizer: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, _Job] = {}
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    # ----- 풀 -----
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context(self.start_method),
+                initializer=_worker_init,
+                initargs=(self.torch_threads,),
+            )
+        return self._pool
+
+    def _get_finalizer(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._finalizer is None:
+                self._finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-finalize")
+            return self._finalizer
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            finalizer, self._finalizer = self._finalizer, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if finalizer is not None:
+            finalizer.shutdown(wait=False, cancel_futures=True)
+
+    # ----- 제출 -----
+    def submit(self, cif_texts: List[str], finalize: Callable[[List[Any]], Dict[str, Any]],
+               lookup: Optional[Callable[[str], Any]] = None,
+               on_result: Optional[Callable[[str, Dict[str, float]], None]] = None,
+               gate=None) -> str:
+        """
+        cif_texts 를 조각내어 워커에 넘기고 job_id 를 바로 돌려준다.
+        - lookup(cif) → (material_id, props) | None : 캐시 적중분은 바로 채움
+        - on_result(material_id, props) : 워커 예측값을 메인 프로세스 캐시에 등록
+        - gate : 워커에서 추론 전에 적용할 사전 필터 (prefilter.ScoreGate, 걸러진 구조는 Prefiltered)
+        - finalize(preds) : 모든 조각이 끝나면 (입력 순서 그대로의) 예측 목록으로 최종 결과 생성
+        """
+        job = _Job(len(cif_texts), finalize)
+        todo = []
+        for i, cif in enumerate(cif_texts):
+            hit = lookup(cif) if lookup is not None else None
+            if hit is not None:
+                job.preds[i] = hit
+                job.completed += 1
+            else:
+                todo.append(i)
+        chunks = [todo[k:k + self.chunk_size] for k in range(0, len(todo), self.chunk_size)]
+
+        with self._lock:
+            self._prune()
+            if chunks and self._queued and self._queued + len(chunks) > self.max_queue:
+                raise QueueFull(f"job queue is full ({self._queued}/{self.max_queue})")
+            self._jobs[job.id] = job
+            self._queued += len(chunks)
+
+        if not chunks:
+            # 전부 캐시 적중이어도 finalize 는 전용 스레드에서 (호출한 쪽을 붙잡지 않도록)
+            self._schedule_finish(job)
+            return job.id
+
+        try:
+            try:
+                futs = self._submit_chunks(cif_texts, chunks, gate)
+            except BrokenProcessPool:
+                # 워커가 죽어서 풀이 망가졌으면 닫고 새로 띄워서 한 번 더
+                self._reset_pool()
+                futs = self._submit_chunks(cif_texts, chunks, gate)
+        except Exception:
+            # 제출 실패: 잡아둔 큐 자리와 작업 항목을 되돌린다 (안 그러면 영원히 queued + 자리 누수)
+            with self._lock:
+                self._queued -= len(chunks)
+                self._jobs.pop(job.id, None)
+            raise
+        # 콜백은 pending 을 다 채운 뒤에 건다 (먼저 끝난 조각이 '마지막'으로 오인되지 않게)
+        job.pending = list(futs)
+        for idx, fut in zip(chunks, futs):
+            fut.add_done_callback(
+                lambda f, idx=idx: self._on_chunk(job, idx, f, on_result)
+            )
+        return job.id
+
+    def _submit_chunks(self, cif_texts: List[str], chunks: List[List[int]], gate=None) -> list:
+        """조각 전부 제출. 중간에 실패하면 이미 넣은 조각은 취소하고 예외를 그대로 올린다"""
+        pool = self._get_pool()
+        futs = []
+        try:
+            for idx in chunks:
+                futs.append(pool.submit(_worker_predict, [cif_texts[i] for i in idx], gate))
+        except Exception:
+            for f in futs:
+                f.cancel()
+            raise
+        return futs
+
+    def _reset_pool(self) -> None:
+        """망가진 풀을 닫고 버린다 (다음 _get_pool 에서 새로 띄움)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_chunk(self, job: _Job, idx: List[int], fut, on_result) -> None:
+        # future 콜백 스레드에서 실행: 예외가 나도 큐 자리/진행률 정리는 반드시 한다
+        try:
+            try:
+                preds = fut.result()
+            except Exception as e:   # 워커 사망, 취소 등
+                preds = [("error", f"worker failed: {e}")] * len(idx)
+
+            for i, p in zip(idx, preds):
+                if p[0] == "error":
+                    p = ValueError(p[1])
+                elif p[0] == "prefiltered":
+                    from prefilter import Prefiltered
+                    p = Prefiltered(p[1], p[2])
+                elif on_result is not None:
+                    try:
+                        on_result(p[0], p[1])
+                    except Exception as e:   # 캐시 등록 실패는 이 결과를 버릴 이유가 아님
+                        log.warning("job %s: on_result failed for %s: %s", job.id, p[0], e)
+                job.preds[i] = p
+        except Exception as e:
+            log.exception("job %s: chunk handling failed", job.id)
+            for i in idx:
+                if job.preds[i] is None:
+                    job.preds[i] = ValueError(f"chunk handling failed: {e}")
+        finally:
+            with self._lock:
+                self._queued -= 1
+                job.completed += len(idx)
+                if fut in job.pending:
+                    job.pending.remove(fut)
+                last = not job.pending
+                if job.status == "queued":   # 조각이 하나라도 끝났으면 (finalize 대기 중이어도) running
+                    job.status = "running"
+                    job.started = job.started or time.time()
+            if last:
+                self._schedule_finish(job)
+
+    def _schedule_finish(self, job: _Job) -> None:
+        """finalize 를 전용 스레드로 넘긴다 (넘기지 못하면 이 스레드에서 바로)"""
+        try:
+            self._get_finalizer().submit(self._finish, job)
+        except RuntimeError:   # 종료 중
+            self._finish(job)
+
+    def _finish(self, job: _Job) -> None:
+        if job.started is None:
+            job.started = time.time()
+        try:
+            job.result = job.finalize(job.preds)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(getattr(e, "detail", e))
+            job.status = "error"
+        job.preds = []
+        job.finished = time.time()
+
+    def _prune(self) -> None:
+        # lock 안에서 호출: 보관 시간이 지난 완료 작업 제거
+        now = time.time()
+        for jid in [j.id for j in self._jobs.values()
+                    if j.finished is not None and now - j.finished > self.ttl_s]:
+            del self._jobs[jid]
+
+    # ----- 조회 -----
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == "queued" and any(f.running() or f.done() for f in job.pending):
+                job.status = "running"
+                job.started = time.time()
+            info = {
+                "job_id": job.id,
+                "status": job.status,
+                "total": job.total,
+                "completed": job.completed,
+                "created": job.created,
+                "started": job.started,
+                "finished": job.finished,
+            }
+        if job.status == "done":
+            info["result"] = job.result
+        elif job.status == "error":
+            info["error"] = job.error
+        return info
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j.status not in TERMINAL)
+            return {
+                "workers": self.workers,
+                "torch_threads": self.torch_threads,
+                "queued_chunks": self._queued,
+                "max_queue": self.max_queue,
+                "active_jobs": active,
+                "jobs": len(self._jobs),
+            }
@@ -0,0 +1,259 @@
+"""
+공정 파라미터 역설계 (POST /optimize)
+
+재료 물성(Eg/eps_r/Ef)은 고정하고 SliderParams 필드 일부를 범위 안에서 움직여
+  - screen_mosfet 점수를 최대화하거나
+  - 목표 지표 프로파일을 맞추는 (예: Vth_V ≈ 0.45 V, SS_mVdec ≤ 70) 공정값을 찾는다.
+
+방법: 시간 예산 안에서 도는 교차 엔트로피법(CEM)
+  1) 0번째 세대: 범위 전체 균일 무작위 (랜덤 서치)
+  2) 이후 세대: 상위 ELITE_FRAC 후보의 평균/표준편차로 정규분포를 다시 맞춰 그 주변을 샘플링
+  - 한 세대(population 개)를 screener_core.compute_metrics_arrays 배열 연산 1회로 평가 (점마다 루프 없음)
+  - 좌표는 [0, 1] 로 정규화 (NA_cm3 처럼 로그 범위인 필드는 log10 공간에서)
+  - budget_ms 가 다 되거나, 분포가 수렴하거나(표준편차 < 1e-4), max_iters 에 닿으면 멈춘다
+
+목표(targets) 형식: [{"metric": 키, "target": 값 | "min": 값 | "max": 값, "tol": 허용폭}]
+  - metric: 지표 키(Vth_V, SS_mVdec, …), 퍼센트 키(Ion_percent, …) 또는 "score"
+  - 이탈량 = 벗어난 정도 / tol  (tol 이 없으면 물리 범위 폭, 로그 지표는 log10 에서)
+환경변수:
+  OPTIMIZE_MAX_BUDGET_MS   요청 1건의 시간 예산 상한 [ms] (기본 5000)
+  OPTIMIZE_MAX_POPULATION  세대당 후보 수 상한 (기본 4096)
+
+목적함수:
+  - 다목적: [점수 ↑, 목표별 이탈량 ↓] → 평가한 모든 점 중 비지배(Pareto) 해를 front 로 돌려준다
+  - 단일 적합도(CEM 정렬/best): 점수 − target_weight × Σ 이탈량
+"""
+import math
+import os
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+import screener_core as M
+import screener_adapter as SA
+
+OPTIMIZE_MAX_BUDGET_MS  = float(os.environ.get("OPTIMIZE_MAX_BUDGET_MS", 5000))
+OPTIMIZE_MAX_POPULATION = int(os.environ.get("OPTIMIZE_MAX_POPULATION", 4096))
+
+# 기본으로 로그 간격으로 다루는 필드
+LOG_FIELDS = {"NA_cm3"}
+ELITE_FRAC = 0.1
+MAX_FRONT = 50
+
+
+def _bounds(bounds: Dict[str, Any]) -> List[tuple]:
+    """{필드: [lo, hi] 또는 {"lo","hi","log"}} → [(필드, lo, hi, log)]"""
+    if not bounds:
+        raise ValueError("bounds 가 비어 있습니다")
+    out = []
+    for name, spec in bounds.items():
+        if name not in SA.SLIDER_FIELDS:
+            raise ValueError(f"최적화할 수 없는 필드: {name}. 가능한 필드: {', '.join(SA.SLIDER_FIELDS)}")
+        try:
+            if isinstance(spec, dict):
+                lo, hi = float(spec["lo"]), float(spec["hi"])
+                log = bool(spec.get("log", name in LOG_FIELDS))
+            else:
+                lo, hi = (float(v) for v in spec)
+                log = name in LOG_FIELDS
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{name}: 범위는 [lo, hi] 또는 {{\"lo\", \"hi\", \"log\"}} 로 지정")
+        if not (math.isfinite(lo) and math.isfinite(hi)) or lo >= hi:
+            raise ValueError(f"{name}: lo < hi 인 유한한 범위여야 합니다")
+        if log and lo <= 0:
+            raise ValueError(f"{name}: 로그 범위는 양수만 가능")
+        out.append((name, lo, hi, log))
+    return out
+
+
+def _targets(targets: List[Dict[str, Any]] | None) -> List[Dict[str, Any]]:
+    """목표 검증 + 이탈량 계산용 정규화 (로그 지표 여부, 기준값, 허용폭)"""
+    out = []
+    for t in targets or []:
+        key = t.get("metric")
+        if key in M.PHYS_RANGES:
+            lo, hi = M.PHYS_RANGES[key]
+            log = key in M.LOG_KEYS
+            span = math.log10(hi) - math.log10(lo) if log else hi - lo
+        elif key in SA.PERCENT_KEYS or key == "score":
+            log, span = False, 100.0
+        else:
+            raise ValueError(f"알 수 없는 목표 지표: {key}. 가능한 키: 지표({', '.join(M.METRIC_KEYS)}), "
+                             f"퍼센트 키, score")
+        kinds = [k for k in ("target", "min", "max") if t.get(k) is not None]
+        if not kinds:
+            raise ValueError(f"{key}: target, min, max 중 하나 이상 필요")
+        spec = {"metric": key, "log": log}
+        for k in kinds:
+            v = float(t[k])
+            if log and v <= 0:
+                raise ValueError(f"{key}: 로그 지표의 {k} 는 양수여야 합니다")
+            spec[k] = math.log10(v) if log else v
+        tol = t.get("tol")
+        if tol is not None and float(tol) <= 0:
+            raise ValueError(f"{key}: tol 은 양수")
+        # tol 은 지표 단위 (로그 지표는 decade 단위)
+        spec["tol"] = float(tol) if tol is not None else span
+        out.append(spec)
+    return out
+
+
+def _evaluate(m: "M.MaterialInputs", fixed: Dict[str, float], names: List[str], values: np.ndarray,
+              targets: List[Dict[str, Any]], weights: Dict[str, float] | None):
+    """values (N, d) 공정값 → (지표, 퍼센트, 점수 (N,), 목표별 이탈량 (N, k))"""
+    params = dict(fixed)
+    for j, n in enumerate(names):
+        params[n] = values[:, j]
+    n_pts = values.shape[0]
+    arr = M.compute_metrics_arrays(m.Eg_eV, m.eps_r, m.Ef_eV_atom, **params)
+    arr = {k: np.broadcast_to(v, (n_pts,)) for k, v in arr.items()}
+    parr = M.compute_percentiles_arrays(arr)
+    score = np.broadcast_to(np.asarray(SA._score(parr, weights), dtype=float), (n_pts,))
+
+    dev = np.zeros((n_pts, len(targets)))
+    for j, t in enumerate(targets):
+        key = t["metric"]
+        v = score if key == "score" else (parr[key] if key in parr else arr[key])
+        v = np.asarray(v, dtype=float)
+        if t["log"]:
+            v = np.log10(np.maximum(v, 1e-300))
+        d = np.zeros(n_pts)
+        if "target" in t:
+            d = d + np.abs(v - t["target"])
+        if "min" in t:
+            d = d + np.maximum(t["min"] - v, 0.0)
+        if "max" in t:
+            d = d + np.maximum(v - t["max"], 0.0)
+        dev[:, j] = np.where(np.isfinite(d), d / t["tol"], np.inf)
+    return arr, parr, score, dev
+
+
+def pareto_mask(objectives: np.ndarray) -> np.ndarray:
+    """objectives (N, m) (모두 작을수록 좋음) → 비지배 점 표시 (N,) bool"""
+    n = objectives.shape[0]
+    keep = np.ones(n, dtype=bool)
+    for i in range(n):
+        if not keep[i]:
+            continue
+        o = objectives[i]
+        dominated = np.all(objectives <= o, axis=1) & np.any(objectives < o, axis=1)
+        if dominated.any():
+            keep[i] = False
+            continue
+        # i 가 지배하는 점 제거 (같은 점은 하나만 남김)
+        worse = np.all(objectives >= o, axis=1)
+        worse[i] = False
+        keep &= ~worse
+    return keep
+
+
+def optimize_process(props: Dict[str, float], bounds: Dict[str, Any], *,
+                     targets: List[Dict[str, Any]] | None = None, temp: float = 300.0, vdd: float = 0.9,
+                     weights: Dict[str, float] | None = None,
+                     thresholds: Dict[str, float] | None = None,
+                     budget_ms: float = 200.0, population: int = 256, max_iters: int = 200,
+                     target_weight: float = 100.0, seed: int = 0, max_front: int = MAX_FRONT) -> Dict[str, Any]:
+    """
+    재료 1개의 공정값 최적화.
+    - props: screen_mosfet 과 같은 형식 (Eg_eV, eps_r, Ef_eV_atom + bounds 에 없는 공정값은 고정)
+    - bounds: 움직일 SliderParams 필드의 범위
+    반환: {"fields", "objectives", "best", "front", "evaluations", "iterations", "elapsed_ms", "converged", "fixed"}
+    """
+    t0 = time.perf_counter()
+    spec = _bounds(bounds)
+    tgts = _targets(targets)
+    w = SA.normalize_weights(weights) if weights else None
+    t = SA.normalize_thresholds(thresholds) if thresholds else None
+    if not 8 <= population <= OPTIMIZE_MAX_POPULATION:
+        raise ValueError(f"population 은 8 ~ {OPTIMIZE_MAX_POPULATION}")
+    if not 0 < budget_ms <= OPTIMIZE_MAX_BUDGET_MS:
+        raise ValueError(f"budget_ms 는 0 초과 {OPTIMIZE_MAX_BUDGET_MS:g} 이하")
+
+    m = SA._material_inputs(props)
+    s = SA._slider_params(props, temp, vdd)
+    names = [n for n, *_ in spec]
+    fixed = {f: getattr(s, f) for f in SA.SLIDER_FIELDS if f not in names}
+    lo = np.array([math.log10(a) if lg else a for _, a, _, lg in spec])
+    hi = np.array([math.log10(b) if lg else b for _, _, b, lg in spec])
+    is_log = np.array([lg for *_, lg in spec])
+
+    def decode(u):
+        x = lo + u * (hi - lo)
+        return np.where(is_log, 10.0 ** x, x)
+
+    rng = np.random.default_rng(seed)
+    d = len(names)
+    n_elite = max(2, int(population * ELITE_FRAC))
+    mean, std = np.full(d, 0.5), np.full(d, 0.5)
+    deadline = t0 + budget_ms / 1e3
+
+    front_u = np.empty((0, d))
+    front_obj = np.empty((0, 1 + len(tgts)))
+    best_u, best_fit = None, -np.inf
+    evaluations = iterations = 0
+    converged = False
+    while iterations < max_iters:
+        if iterations == 0:
+            u = rng.random((population, d))
+        else:
+            u = np.clip(mean + std * rng.standard_normal((population, d)), 0.0, 1.0)
+        _, _, score, dev = _evaluate(m, fixed, names, decode(u), tgts, w)
+        fit = score - target_weight * dev.sum(axis=1)
+        fit = np.where(np.isfinite(fit), fit, -np.inf)
+        evaluations += population
+        iterations += 1
+
+        i = int(np.argmax(fit))
+        if fit[i] > best_fit:
+            best_fit, best_u = float(fit[i]), u[i].copy()
+
+        # 이번 세대까지의 Pareto front (점수는 최대화 → 부호 반전)
+        obj = np.column_stack([-score, dev])
+        ok = np.all(np.isfinite(obj), axis=1)
+        cand_u = np.vstack([front_u, u[ok]])
+        cand_obj = np.vstack([front_obj, obj[ok]])
+        keep = pareto_mask(cand_obj)
+        front_u, front_obj = cand_u[keep], cand_obj[keep]
+
+        # CEM 갱신 (급격히 줄지 않도록 이전 분포와 섞는다)
+        elite = u[np.argsort(-fit)[:n_elite]]
+        mean = 0.3 * mean + 0.7 * elite.mean(axis=0)
+        std = 0.3 * std + 0.7 * elite.std(axis=0)
+        if std.max() < 1e-4:
+            converged = True
+            break
+        if time.perf_counter() >= deadline:
+            break
+
+    # front 는 적합도 순으로 max_front 개까지
+    front_fit = -front_obj[:, 0] - target_weight * front_obj[:, 1:].sum(axis=1)
+    order = np.argsort(-front_fit)[:max_front]
+    front_u = front_u[order]
+
+    pts_u = np.vstack([best_u[None, :], front_u])
+    pts = decode(pts_u)
+    arr, parr, score, dev = _evaluate(m, fixed, names, pts, tgts, w)
+
+    def point(i: int) -> Dict[str, Any]:
+        sc = float(score[i])
+        return {
+            "params": {n: float(pts[i, j]) for j, n in enumerate(names)},
+            "metrics": {k: float(v[i]) for k, v in arr.items()},
+            "percentiles": {k: float(v[i]) for k, v in parr.items()},
+            "score": sc,
+            "decision": SA.decision_for(sc, t),
+            "deviations": {tg["metric"]: float(dev[i, j]) for j, tg in enumerate(tgts)},
+        }
+
+    return {
+        "fields": names,
+        "objectives": ["score"] + [f"{tg['metric']}_deviation" for tg in tgts],
+        "best": point(0),
+        "front": [point(i) for i in range(1, pts.shape[0])],
+        "evaluations": evaluations,
+        "iterations": iterations,
+        "elapsed_ms": (time.perf_counter() - t0) * 1e3,
+        "converged": converged,
+        "fixed": {k: float(v) for k, v in fixed.items()},
+    }
@@ -0,0 +1,356 @@
+"""
+ALIGNN 예측값 캐시 (구조 해시 → bandgap / formation_energy / permittivity)
+
+- 1차: 프로세스 메모리 LRU (엔트리 수 + 바이트 예산으로 축출)
+- 2차: (선택) SQLite 파일 — 서버 재시작 후에도 유지
+- 키는 내용 기반(content-addressed):
+    · cif_text_key : 공백/주석을 정리한 CIF 텍스트의 sha256 (파싱 전에 바로 조회 가능)
+    · atoms_key    : ASE Atoms 의 원자번호/셀/분율좌표 지문 (포맷만 다른 같은 구조도 적중)
+    · structure_key: 원자별 이웃 환경의 다중집합 지문 (원점 이동/셀 선택/초격자가 달라도 같은 값)
+      → 대칭을 보지 않아서 다른 구조끼리도 같을 수 있다 (fcc/hcp, 섬아연석/우르차이트 등).
+        그래서 캐시 키로 쓰지 않고 후보 묶기에만 쓰며, 실제로 같은 구조인지는 same_structure 로 확인한다.
+- namespace 에 모델 식별자를 섞어서, 가중치가 바뀌면 예전 디스크 캐시를 자동으로 무시한다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import reduce
+from math import gcd
+from typing import Dict, Optional
+
+# 엔트리 하나당 dict/키 문자열 외의 대략적인 고정 오버헤드 [bytes]
+_ENTRY_OVERHEAD = 200
+
+
+# ---------- 키 ----------
+def _digest(namespace: str, kind: str, payload: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(f"{namespace}|{kind}|".encode("utf-8"))
+    h.update(payload)
+    return h.hexdigest()
+
+
+def cif_text_key(cif_text: str, namespace: str = "") -> str:
+    """줄 끝 공백, 빈 줄, '#' 주석 줄을 제거한 CIF 텍스트 기준 해시."""
+    lines = []
+    for line in cif_text.splitlines():
+        s = line.strip()
+        if not s or s.startswith("#"):
+            continue
+        lines.append(s)
+    return _digest(namespace, "cif", "\n".join(lines).encode("utf-8"))
+
+
+def atoms_key(atoms, namespace: str = "", decimals: int = 5) -> str:
+    """
+    Atoms 지문: 원자번호 + 셀 + (0~1로 감은) 분율좌표를 반올림해 정렬한 뒤 해시.
+    - 원자 나열 순서나 CIF 서식 차이에는 영향을 받지 않는다.
+    """
+    import numpy as np
+
+    cell = np.round(np.asarray(atoms.get_cell(), dtype=float), decimals)
+    numbers = np.asarray(atoms.get_atomic_numbers(), dtype=np.int64)
+    frac = np.asarray(atoms.get_scaled_positions(wrap=True), dtype=float)
+    frac = np.round(frac, decimals) % 1.0   # 반올림 후 1.0 → 0.0 으로 접기
+    frac = np.where(np.abs(frac) < 10.0 ** -decimals, 0.0, frac)  # -0.0 정리
+
+    order = np.lexsort((frac[:, 2], frac[:, 1], frac[:, 0], numbers))
+    payload = b"".join([
+        cell.tobytes(),
+        numbers[order].tobytes(),
+        frac[order].tobytes(),
+    ])
+    return _digest(namespace, "atoms", payload)
+
+
+def structure_key(atoms, namespace: str = "", decimals: int = 2, n_neighbors: int = 12) -> str:
+    """
+    셀 선택에 무관한 구조 지문 (중복 구조 후보 묶기용, 같은 키 ≠ 같은 구조).
+    - 원자마다 가까운 이웃 n_neighbors 개(경계에 걸린 같은 거리 껍질은 통째로)의
+      (거리, 원자번호) 목록 = 그 원자의 '환경'
+    - 환경별 개수를 최대공약수로 나눈 다중집합 + 원자당 부피를 해시
+      → 원점 이동, 원자 순서, 다른 (비)환원 셀, n×m×k 초격자는 같은 키
+    - 거리는 decimals 자리(Å)로 반올림. 반올림 경계에 걸려 같은 구조가 다른 키가 되는 건
+      추론 한 번을 더 할 뿐이라 허용한다.
+    - 가까운 이웃 껍질만 보므로 적층만 다른 폴리타입(fcc/이상적 hcp, 섬아연석/우르차이트)은
+      같은 키가 된다. 예측값을 나눠 주기 전에 반드시 same_structure 로 확인할 것.
+    """
+    import numpy as np
+    from ase.neighborlist import neighbor_list
+
+    n = len(atoms)
+    numbers = np.asarray(atoms.get_atomic_numbers(), dtype=np.int64)
+    vol_per_atom = abs(float(atoms.get_volume())) / max(n, 1)
+
+    # 모든 원자가 이웃을 n_neighbors 개 이상 갖도록 cutoff 를 늘려간다
+    cutoff = 1.5 * vol_per_atom ** (1.0 / 3.0)
+    while True:
+        i, j, d = neighbor_list("ijd", atoms, cutoff)
+        counts = np.bincount(i, minlength=n)
+        if n == 0 or counts.min() >= n_neighbors:
+            break
+        cutoff *= 1.5
+
+    scale = 10.0 ** decimals
+    dq = np.rint(d * scale).astype(np.int64)
+    order = np.lexsort((numbers[j], dq, i))
+    i, j, dq = i[order], j[order], dq[order]
+    starts = np.concatenate([[0], np.cumsum(counts)])
+
+    envs = Counter()
+    for a in range(n):
+        di = dq[starts[a]:starts[a + 1]]
+        zi = numbers[j[starts[a]:starts[a + 1]]]
+        m = np.searchsorted(di, di[n_neighbors - 1], side="right")
+        envs[(int(numbers[a]), di[:m].tobytes(), zi[:m].tobytes())] += 1
+
+    g = reduce(gcd, envs.values(), 0) or 1
+    h = hashlib.sha256()
+    h.update(f"{round(vol_per_atom, decimals)}|".encode("utf-8"))
+    for (z, di, zi), c in sorted(envs.items()):
+        h.update(f"{z}:{c // g}:".encode("utf-8") + di + b":" + zi + b";")
+    return _digest(namespace, "structure", h.digest())
+
+
+def same_structure(a, b, tol: float = 0.05, max_trials: int = 2000) -> bool:
+    """
+    a 와 b 가 (원점 이동 / 셀 선택 / 회전·반전 / 초격자 차이를 빼면) 같은 결정인지 직접 확인.
+    - 인자 순서는 상관없다 (원자 수가 적은 쪽을 a 로 바꿔서 본다, b 는 a 의 k 배). a 의 Niggli 환원 셀과 길이/각도(계량 텐서)가 같은
+      병진 벡터 3개 (u, v, w) 를 b 안에서 찾고,
+        · b 의 셀 벡터가 (u, v, w) 의 정수 조합이고
+        · b 의 원자를 (u, v, w) 로 접으면 a 의 원자 자리와 종류별로 정확히 k 개씩 겹치면 (원점 이동 허용)
+      같은 구조. 이러면 b = a 의 자리 + (u, v, w) 격자 전체라서 대칭 정보 없이도 동치가 보장된다.
+    - tol: 원자 자리/셀 길이 허용 오차 [Å]
+    - 후보 조합이 max_trials 를 넘으면 False (같은 구조를 놓쳐도 추론을 한 번 더 할 뿐이다)
+    """
+    import numpy as np
+    from itertools import product
+
+    if len(a) > len(b):
+        a, b = b, a
+    na, nb = len(a), len(b)
+    if na == 0 or nb % na:
+        return False
+    k = nb // na
+    za = np.asarray(a.get_atomic_numbers(), dtype=np.int64)
+    zb = np.asarray(b.get_atomic_numbers(), dtype=np.int64)
+    ua, ca = np.unique(za, return_counts=True)
+    ub, cb = np.unique(zb, return_counts=True)
+    if not (np.array_equal(ua, ub) and np.array_equal(ca * k, cb)):
+        return False
+    if abs(abs(b.get_volume()) - k * abs(a.get_volume())) > 0.02 * abs(b.get_volume()):
+        return False
+
+    # niggli_reduce 가 돌려주는 셀은 표준 방향으로 회전돼 있으므로 변환 행렬만 써서 원래 방향 유지
+    A = a.cell.niggli_reduce()[1] @ np.asarray(a.cell, dtype=float)
+    fa = np.linalg.solve(A.T, a.get_positions().T).T % 1.0
+    lens = np.linalg.norm(A, axis=1)
+    gram = A @ A.T
+    gtol = tol * (lens[:, None] + lens[None, :]) + tol * tol
+
+    # b 의 병진 후보: 가장 적은 원소의 원자 하나를 기준으로 같은 원소까지의 벡터 (+ 가까운 셀 이미지)
+    B = b.cell.niggli_reduce()[1] @ np.asarray(b.cell, dtype=float)
+    pb = b.get_positions()
+    fb = np.linalg.solve(B.T, pb.T).T
+    anchor_z = ub[np.argmin(cb)]
+    same = np.flatnonzero(zb == anchor_z)
+    shifts = np.array(list(product((-2, -1, 0, 1, 2), repeat=3)), dtype=float)
+    d = (fb[same] - fb[same[0]])[:, None, :] + shifts[None, :, :]
+    vecs = (d.reshape(-1, 3)) @ B
+    vlen = np.linalg.norm(vecs, axis=1)
+    cands = [vecs[np.abs(vlen - L) <= tol] for L in lens]
+    if any(len(c) == 0 for c in cands):
+        return False
+
+    anchors_a = np.flatnonzero(za == anchor_z)
+    trials = 0
+    for u in cands[0]:
+        for v in cands[1]:
+            if abs(u @ v - gram[0, 1]) > gtol[0, 1]:
+                continue
+            for w in cands[2]:
+                if abs(u @ w - gram[0, 2]) > gtol[0, 2] or abs(v @ w - gram[1, 2]) > gtol[1, 2]:
+                    continue
+                trials += 1
+                if trials > max_trials:
+                    return False
+                T = np.array([u, v, w])
+                if abs(np.linalg.det(T)) < 1e-6:
+                    continue
+                # b 의 셀이 (u, v, w) 격자에 들어가야 함
+                coef = np.linalg.solve(T.T, B.T).T
+                if np.abs(coef - np.rint(coef)).max() * lens.max() > tol:
+                    continue
+                g = (np.linalg.solve(T.T, (pb - pb[same[0]]).T).T) % 1.0
+                for i0 in anchors_a:
+                    if _sites_match(fa - fa[i0], za, g, zb, A, k, tol):
+                        return True
+    return False
+
+
+def _sites_match(fa, za, g, zb, A, k: int, tol: float) -> bool:
+    """분율좌표 g(b, 접은 것)의 원자마다 a 의 같은 원소 자리가 tol 안에 있고, 자리마다 정확히 k 개인지"""
+    import numpy as np
+
+    diff = g[:, None, :] - fa[None, :, :]
+    diff -= np.rint(diff)
+    dist = np.linalg.norm(diff @ A, axis=2)
+    dist[zb[:, None] != za[None, :]] = np.inf
+    nearest = dist.argmin(axis=1)
+    if dist[np.arange(len(g)), nearest].max() > tol:
+        return False
+    return bool(np.all(np.bincount(nearest, minlength=len(fa)) == k))
+
+
+# ---------- 캐시 ----------
+class PredictionCache:
+    """
+    스레드 안전한 2단 캐시.
+    - max_entries / max_bytes 중 하나라도 넘으면 가장 오래 안 쓴 항목부터 메모리에서 축출
+    - db_path 가 주어지면 put 시 SQLite 에도 기록하고, 메모리 미스일 때 디스크에서 읽어 승격
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_bytes: int = 8 * 1024 * 1024,
+        db_path: Optional[str] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.db_path = db_path
+
+        self._mem: "OrderedDict[str, tuple[Dict[str, float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # SQLite 연결은 fork 를 넘겨 쓰면 안 되므로 프로세스(PID)마다 처음 쓸 때 연다 (_db)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._inherited: list = []
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            # 경로/스키마는 지금 확인만 하고 닫는다 (gunicorn preload 의 마스터가 연결을 들고 fork 하지 않게)
+            self._connect().close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key TEXT PRIMARY KEY,"
+            " props TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    @property
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """이 프로세스의 연결 (디스크 캐시 꺼져 있으면 None). _lock 안에서 호출"""
+        if not self.db_path:
+            return None
+        if self._conn_pid != os.getpid():
+            if self._conn is not None:
+                # 부모에게서 물려받은 연결은 닫지도 쓰지도 않는다 (닫으면 부모 쪽 상태를 건드릴 수 있음)
+                self._inherited.append(self._conn)
+            self._conn = self._connect()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @classmethod
+    def from_env(cls) -> "PredictionCache":
+        """
+        환경변수로 구성:
+          ALIGNN_CACHE_MAX_ENTRIES (기본 4096)
+          ALIGNN_CACHE_MAX_BYTES   (기본 8 MiB)
+          ALIGNN_CACHE_DB          (SQLite 경로, 비우면 디스크 캐시 끔)
+        """
+        return cls(
+            max_entries=int(os.environ.get("ALIGNN_CACHE_MAX_ENTRIES", 4096)),
+            max_bytes=int(os.environ.get("ALIGNN_CACHE_MAX_BYTES", 8 * 1024 * 1024)),
+            db_path=os.environ.get("ALIGNN_CACHE_DB") or None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return dict(item[0])
+
+            props = self._db_get(key)
+            if props is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._mem_put(key, props)
+            return dict(props)
+
+    def put(self, key: str, props: Dict[str, float]) -> None:
+        props = {k: float(v) for k, v in props.items()}
+        with self._lock:
+            self._mem_put(key, props)
+            self._db_put(key, props)
+
+    def clear(self) -> None:
+        """메모리 계층만 비운다 (디스크는 유지)."""
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._mem),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    # ----- 내부 -----
+    def _mem_put(self, key: str, props: Dict[str, float]) -> None:
+        size = _ENTRY_OVERHEAD + len(key) + len(json.dumps(props))
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._mem[key] = (props, size)
+        self._bytes += size
+
+        while self._mem and (
+            len(self._mem) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, sz) = self._mem.popitem(last=False)
+            self._bytes -= sz
+
+    def _db_get(self, key: str) -> Optional[Dict[str, float]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT props FROM predictions WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _db_put(self, key: str, props: Dict[str, float]) -> None:
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO predictions (key, props, created) VALUES (?, ?, ?)",
+            (key, json.dumps(props), time.time()),
+        )
+        self._db.commit()
@@ -0,0 +1,553 @@
+"""
+물성 예측기 (Atoms → {bandgap, formation_energy, permittivity})
+
+alignn_adapter 의 파이프라인(CIF 파싱, 캐시, 중복 묶기)은 그대로 두고,
+실제 추론만 이 인터페이스 뒤로 분리한다.
+
+  alignn     : ALIGNN 모델 3종 (models/ 아래 가중치 + torch + DGL 필요). 기본값
+  surrogate  : 조성 특징 기반의 결정적인 회귀식 (가중치/torch 불필요)
+               → 벤치마크, CI, 프론트 개발용. 값은 경향만 맞는 근사이므로 연구 결과로 쓰지 말 것
+
+Predictor 인터페이스:
+  name                       백엔드 이름
+  signature()                캐시 namespace (모델/설정이 바뀌면 달라져서 예전 캐시를 무시)
+  load()                     모델 메모리에 올리기 (fork 전에 불러도 되는 것만)
+  predict(atoms)             구조 1개 → props dict
+  predict_batch(atoms_list)  여러 구조 → props dict 리스트
+  predict_members(atoms_list, members)
+                             앙상블 멤버 예측 → 구조별 [멤버별 props] (불확실성용, uncertainty.py)
+                             멤버 번호가 같으면 항상 같은 값이라 캐시해도 된다
+  supports_members()         멤버끼리 값이 달라질 수 있는지 (False 면 앙상블 생략)
+  extensive(prop)            값이 원자 수에 비례하는지 (초격자 중복 묶기 환산용)
+  set_num_threads(n)         워커 프로세스별 스레드 수 고정
+  models()                   올라간 모델 이름 목록
+
+환경변수:
+  PREDICTOR_BACKEND              alignn | surrogate (기본 alignn)
+  ALIGNN_BATCH_SIZE              배치 추론 시 한 번에 dgl.batch 로 묶는 구조 수 (기본 32)
+  ALIGNN_ENSEMBLE_ROOT           앙상블 가중치 폴더 (<root>/<물성>/<멤버>/best_model.pt, 기본 models/ensemble)
+                                 물성별로 있으면 deep ensemble, 없으면 기본 모델의 MC-dropout 으로 멤버를 뽑는다
+                                 (둘 다 없는 물성은 멤버 없이 기본 예측값 고정. 기본 ALIGNN 체크포인트는 Dropout 없음)
+  SURROGATE_LATENCY_MS           구조 하나당 고정 지연 [ms] (기본 0)
+  SURROGATE_LATENCY_PER_ATOM_MS  원자 하나당 추가 지연 [ms] (기본 0)
+  SURROGATE_BATCH_OVERHEAD_MS    predict_batch 호출 하나당 지연 [ms] (기본 0)
+  SURROGATE_JITTER               지연에 곱하는 무작위 변동 폭 (0.2 → ±20%, 시드 고정, 기본 0)
+  SURROGATE_LATENCY_MODE         sleep (GIL 해제, 기본) | spin (CPU 점유, 실제 추론과 비슷)
+"""
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+BASE_DIR = Path(__file__).resolve().parent
+MODELS_ROOT = BASE_DIR / "models"
+
+MODEL_PATHS = {
+    "bandgap": MODELS_ROOT / "bandgap" / "temp(band gap)",
+    "formation_energy": MODELS_ROOT / "formation energy" / "temp(formation energy)",
+    "permittivity": MODELS_ROOT / "permittivity" / "temp(permittivity)",
+}
+PROP_NAMES = tuple(MODEL_PATHS)
+
+ENSEMBLE_ROOT = Path(os.environ.get("ALIGNN_ENSEMBLE_ROOT", MODELS_ROOT / "ensemble"))
+
+PREDICTOR_BACKEND = os.environ.get("PREDICTOR_BACKEND", "alignn").lower()
+
+log = logging.getLogger("pretcad.predictors")
+
+
+class Predictor:
+    name = "base"
+
+    def signature(self) -> str:
+        return self.name
+
+    def load(self) -> None:
+        pass
+
+    def predict(self, atoms) -> Dict[str, float]:
+        raise NotImplementedError
+
+    def predict_batch(self, atoms_list) -> List[Dict[str, float]]:
+        return [self.predict(a) for a in atoms_list]
+
+    def supports_members(self) -> bool:
+        """predict_members 가 서로 다른 멤버 값을 낼 수 있는지 (False 면 앙상블을 아예 돌리지 않는다)"""
+        return False
+
+    def predict_members(self, atoms_list, members: Sequence[int]) -> List[List[Dict[str, float]]]:
+        # 멤버를 뽑을 수 없는 예측기: 모든 멤버가 같은 값 → 불확실성 0
+        return [[dict(p) for _ in members] for p in self.predict_batch(atoms_list)]
+
+    def extensive(self, prop: str) -> bool:
+        return False
+
+    def set_num_threads(self, n: int) -> None:
+        pass
+
+    def models(self) -> List[str]:
+        return []
+
+
+# ---------- ALIGNN ----------
+_MC = threading.local()   # MC-dropout 중인 스레드 표시 (dropout hook 이 확인)
+
+
+class AlignnPredictor(Predictor):
+    """
+    ALIGNN 모델 3종. torch / dgl / alignn 은 처음 load() 할 때 import 한다
+    (surrogate 로 돌릴 때는 설치돼 있지 않아도 된다).
+    """
+    name = "alignn"
+
+    def __init__(self, model_paths=None, batch_size: int = None):
+        self.model_paths = dict(model_paths or MODEL_PATHS)
+        self.batch_size = batch_size or int(os.environ.get("ALIGNN_BATCH_SIZE", 32))
+        self._calcs = {}
+        self._lock = threading.Lock()
+        self._ensembles = {}                  # 물성 → 앙상블 가중치 폴더 목록
+        self._member_calcs = {}               # (물성, 폴더 번호) → 계산기
+        self._mc_lock = threading.Lock()      # MC-dropout 은 전역 RNG 시드를 쓰므로 한 번에 하나씩
+        self._mc_hooked = set()               # dropout hook 을 건 모델 id
+        self._mc_warned = set()
+
+    def signature(self) -> str:
+        """
+        캐시 namespace 용 모델 식별자.
+        가중치 파일(best_model.pt)의 크기/수정시각이 바뀌면 예전 캐시 항목은 자동으로 무시된다.
+        """
+        parts = []
+        for name, model_dir in sorted(self.model_paths.items()):
+            ckpt = Path(model_dir) / "best_model.pt"
+            try:
+                st = ckpt.stat()
+                parts.append(f"{name}:{st.st_size}:{int(st.st_mtime)}")
+            except OSError:
+                parts.append(f"{name}:missing")
+        return "alignn|" + "|".join(parts)
+
+    def _get_calc(self, name: str):
+        calc = self._calcs.get(name)
+        if calc is not None:
+            return calc
+
+        # 워밍업 스레드와 첫 요청이 동시에 같은 모델을 두 번 올리지 않도록
+        with self._lock:
+            if name in self._calcs:
+                return self._calcs[name]
+            from alignn.ff.ff import AlignnAtomwiseCalculator
+            calc = AlignnAtomwiseCalculator(path=str(self.model_paths[name]))
+            self._calcs[name] = calc
+        return calc
+
+    def load(self) -> None:
+        for name in self.model_paths:
+            self._get_calc(name)
+
+    def models(self) -> List[str]:
+        return sorted(self._calcs)
+
+    def extensive(self, prop: str) -> bool:
+        # _forward 에서 원자 수를 곱하는 모델
+        return bool(getattr(self._get_calc(prop), "intensive", False))
+
+    def set_num_threads(self, n: int) -> None:
+        import torch
+        torch.set_num_threads(max(1, n))
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # 이미 병렬 작업이 돌았으면 바꿀 수 없음 (무시)
+            pass
+
+    # ----- 그래프 1회 생성 + 모델별 forward -----
+    @staticmethod
+    def _graph_params(calc):
+        """그래프 생성에 쓰이는 설정값. 같으면 그래프(g, lg)를 모델끼리 공유할 수 있다."""
+        c = calc.config
+        return (
+            c["neighbor_strategy"], c["cutoff"], c["max_neighbors"],
+            c["atom_features"], c["use_canonize"],
+        )
+
+    @staticmethod
+    def _build_graph(atoms, params):
+        from alignn.ff.calculators import ase_to_atoms
+        from alignn.graphs import Graph
+        neighbor_strategy, cutoff, max_neighbors, atom_features, use_canonize = params
+        return Graph.atom_dgl_multigraph(
+            ase_to_atoms(atoms),
+            neighbor_strategy=neighbor_strategy,
+            cutoff=cutoff,
+            max_neighbors=max_neighbors,
+            atom_features=atom_features,
+            use_canonize=use_canonize,
+        )
+
+    @staticmethod
+    def _forward(calc, g, lg, atoms) -> float:
+        """
+        AlignnAtomwiseCalculator.calculate() 의 energy 와 같은 값을, 미리 만든 그래프로 계산.
+        - local_var(): 모델이 g/lg 피처를 덮어써도 다음 모델에 새지 않도록
+        - 힘(grad)을 학습한 모델이 아니면 autograd 를 끄고 돈다
+        """
+        import torch
+        cfg = calc.config["model"]
+        device = calc.device
+        g_dev = g.to(device).local_var()
+        lat = torch.tensor(atoms.cell).type(torch.get_default_dtype()).to(device)
+
+        needs_grad = bool(getattr(calc.model.config, "calculate_gradient", False))
+        with torch.set_grad_enabled(needs_grad):
+            if cfg["alignn_layers"] > 0:
+                out = calc.model((g_dev, lg.to(device).local_var(), lat))
+            else:
+                out = calc.model((g_dev, lat))
+
+        if "atomwise" in cfg["name"]:
+            out = out["out"]
+        energy = out.detach().cpu().numpy().reshape(-1)[0]
+        if calc.intensive:
+            energy = energy * len(atoms)
+        return float(energy)
+
+    @staticmethod
+    def _forward_batch(calc, graphs, line_graphs, atoms_list):
+        """_forward 의 배치 버전: 여러 구조를 dgl.batch 로 묶어 모델 1회 호출 → 구조별 값 리스트"""
+        import dgl
+        import torch
+        cfg = calc.config["model"]
+        device = calc.device
+        g = dgl.batch(graphs).to(device)
+        lat = torch.stack([
+            torch.tensor(a.cell).type(torch.get_default_dtype()) for a in atoms_list
+        ]).to(device)
+
+        needs_grad = bool(getattr(calc.model.config, "calculate_gradient", False))
+        with torch.set_grad_enabled(needs_grad):
+            if cfg["alignn_layers"] > 0:
+                out = calc.model((g, dgl.batch(line_graphs).to(device), lat))
+            else:
+                out = calc.model((g, lat))
+
+        if "atomwise" in cfg["name"]:
+            out = out["out"]
+        energies = out.detach().cpu().numpy().reshape(-1)
+        values = []
+        for e, atoms in zip(energies, atoms_list):
+            if calc.intensive:
+                e = e * len(atoms)
+            values.append(float(e))
+        return values
+
+    # ----- 앙상블 멤버 (deep ensemble 또는 MC-dropout) -----
+    def _ensemble_dirs(self, name: str) -> List[Path]:
+        dirs = self._ensembles.get(name)
+        if dirs is None:
+            root = ENSEMBLE_ROOT / name
+            dirs = sorted(p for p in root.iterdir() if (p / "best_model.pt").exists()) if root.is_dir() else []
+            self._ensembles[name] = dirs
+        return dirs
+
+    def _member_calc(self, name: str, member: int):
+        """(계산기, MC-dropout 여부). 앙상블 가중치가 있으면 멤버 번호를 폴더 수로 돌려 쓴다"""
+        dirs = self._ensemble_dirs(name)
+        if not dirs:
+            return self._get_calc(name), True
+        key = (name, member % len(dirs))
+        calc = self._member_calcs.get(key)
+        if calc is None:
+            with self._lock:
+                calc = self._member_calcs.get(key)
+                if calc is None:
+                    from alignn.ff.ff import AlignnAtomwiseCalculator
+                    calc = AlignnAtomwiseCalculator(path=str(dirs[key[1]]))
+                    self._member_calcs[key] = calc
+        return calc, False
+
+    def _has_dropout(self, calc) -> bool:
+        import torch
+        return any(isinstance(m, torch.nn.Dropout) and m.p > 0 for m in calc.model.modules())
+
+    def _member_mode(self, name: str) -> str:
+        """물성별 멤버 방식: "ensemble" (가중치 폴더) / "dropout" (MC-dropout) / "fixed" (멤버를 뽑을 수 없음)"""
+        if self._ensemble_dirs(name):
+            return "ensemble"
+        if self._has_dropout(self._get_calc(name)):
+            return "dropout"
+        if name not in self._mc_warned:
+            self._mc_warned.add(name)
+            log.warning("%s: no dropout layers and no ensemble weights under %s → no ensemble members",
+                        name, ENSEMBLE_ROOT / name)
+        return "fixed"
+
+    def supports_members(self) -> bool:
+        # 기본 ALIGNN 체크포인트에는 Dropout 이 없으므로, 앙상블 가중치가 없으면 보통 False
+        return any(self._member_mode(name) != "fixed" for name in self.model_paths)
+
+    def _mc_hook(self, calc, name: str) -> bool:
+        """
+        모델의 Dropout 층에 forward hook 을 건다 (한 번만). hook 은 _MC.active 인 스레드에서만 dropout 을 적용하므로
+        모델을 train() 으로 바꾸지 않아도 되고, 같은 모델로 도는 다른 요청의 일반 추론에는 영향이 없다.
+        dropout 층이 없으면 False (멤버가 모두 같은 값 → 불확실성 0)
+        """
+        import torch
+        import torch.nn.functional as F
+        if id(calc.model) in self._mc_hooked:
+            return True
+        drops = [m for m in calc.model.modules() if isinstance(m, torch.nn.Dropout) and m.p > 0]
+        if not drops:
+            return False
+
+        def hook(module, inputs, output):
+            if getattr(_MC, "active", False):
+                return F.dropout(inputs[0], module.p, training=True)
+            return None
+
+        for m in drops:
+            m.register_forward_hook(hook)
+        self._mc_hooked.add(id(calc.model))
+        return True
+
+    def _mc_forward_batch(self, calc, name: str, graphs, line_graphs, atoms_list, member: int):
+        import torch
+        with self._mc_lock:
+            if not self._mc_hook(calc, name):
+                return self._forward_batch(calc, graphs, line_graphs, atoms_list)
+            with torch.random.fork_rng(devices=[]):
+                torch.manual_seed(1000 + member)
+                _MC.active = True
+                try:
+                    return self._forward_batch(calc, graphs, line_graphs, atoms_list)
+                finally:
+                    _MC.active = False
+
+    def predict_members(self, atoms_list, members: Sequence[int]) -> List[List[Dict[str, float]]]:
+        """
+        predict_batch 와 같은 미니배치/그래프 공유, 모델 대신 멤버(앙상블 가중치 또는 dropout 마스크)별로 forward.
+        - 멤버를 뽑을 수 없는 물성("fixed")은 기본 모델로 한 번만 돌리고 그 값을 모든 멤버에 쓴다
+        """
+        from telemetry import span
+        members = list(members)
+        results = [[{} for _ in members] for _ in atoms_list]
+        modes = {name: self._member_mode(name) for name in self.model_paths}
+        for start in range(0, len(atoms_list), self.batch_size):
+            chunk = atoms_list[start:start + self.batch_size]
+            graphs = {}
+            for prop_name in self.model_paths:
+                if modes[prop_name] == "fixed":
+                    calc = self._get_calc(prop_name)
+                    params = self._graph_params(calc)
+                    if params not in graphs:
+                        with span("graph_build"):
+                            graphs[params] = [self._build_graph(a, params) for a in chunk]
+                    gs = graphs[params]
+                    with span(f"alignn_{prop_name}"):
+                        values = self._forward_batch(calc, [g for g, _ in gs], [lg for _, lg in gs], chunk)
+                    for i, v in enumerate(values):
+                        for j in range(len(members)):
+                            results[start + i][j][prop_name] = v
+                    continue
+                for j, member in enumerate(members):
+                    calc, mc = self._member_calc(prop_name, member)
+                    params = self._graph_params(calc)
+                    if params not in graphs:
+                        with span("graph_build"):
+                            graphs[params] = [self._build_graph(a, params) for a in chunk]
+                    gs = graphs[params]
+                    g, lg = [g for g, _ in gs], [lg for _, lg in gs]
+                    with span(f"alignn_{prop_name}_member"):
+                        if mc:
+                            values = self._mc_forward_batch(calc, prop_name, g, lg, chunk, member)
+                        else:
+                            values = self._forward_batch(calc, g, lg, chunk)
+                    for i, v in enumerate(values):
+                        results[start + i][j][prop_name] = v
+        return results
+
+    def predict(self, atoms) -> Dict[str, float]:
+        """세 모델을 돌리되, 크리스탈 그래프/라인 그래프는 설정이 같은 모델끼리 한 번만 만든다."""
+        from telemetry import span
+        graphs = {}
+        results = {}
+
+        # 각 모델별 계산 처리
+        for prop_name in self.model_paths:
+            calc = self._get_calc(prop_name)
+            params = self._graph_params(calc)
+            if params not in graphs:
+                with span("graph_build"):
+                    graphs[params] = self._build_graph(atoms, params)
+            g, lg = graphs[params]
+            with span(f"alignn_{prop_name}"):
+                results[prop_name] = self._forward(calc, g, lg, atoms)
+
+        return results
+
+    def predict_batch(self, atoms_list) -> List[Dict[str, float]]:
+        """predict 의 배치 버전 (batch_size 단위 미니배치)"""
+        from telemetry import span
+        results = [{} for _ in atoms_list]
+        for start in range(0, len(atoms_list), self.batch_size):
+            chunk = atoms_list[start:start + self.batch_size]
+            graphs = {}
+            for prop_name in self.model_paths:
+                calc = self._get_calc(prop_name)
+                params = self._graph_params(calc)
+                if params not in graphs:
+                    with span("graph_build"):
+                        graphs[params] = [self._build_graph(a, params) for a in chunk]
+                gs = graphs[params]
+                with span(f"alignn_{prop_name}"):
+                    values = self._forward_batch(calc, [g for g, _ in gs], [lg for _, lg in gs], chunk)
+                for i, v in enumerate(values):
+                    results[start + i][prop_name] = v
+        return results
+
+
+# ---------- 조성 기반 대역 ----------
+# Pauling 전기음성도 (원자번호 1~94, 값이 없는 비활성 기체는 None)
+_PAULING = (
+    None,
+    2.20, None, 0.98, 1.57, 2.04, 2.55, 3.04, 3.44, 3.98, None,
+    0.93, 1.31, 1.61, 1.90, 2.19, 2.58, 3.16, None, 0.82, 1.00,
+    1.36, 1.54, 1.63, 1.66, 1.55, 1.83, 1.88, 1.91, 1.90, 1.65,
+    1.81, 2.01, 2.18, 2.55, 2.96, 3.00, 0.82, 0.95, 1.22, 1.33,
+    1.60, 2.16, 1.90, 2.20, 2.28, 2.20, 1.93, 1.69, 1.78, 1.96,
+    2.05, 2.10, 2.66, 2.60, 0.79, 0.89, 1.10, 1.12, 1.13, 1.14,
+    1.13, 1.17, 1.20, 1.20, 1.10, 1.22, 1.23, 1.24, 1.25, 1.10,
+    1.27, 1.30, 1.50, 2.36, 1.90, 2.20, 2.20, 2.28, 2.54, 2.00,
+    1.62, 2.33, 2.02, 2.00, 2.20, 2.20, 0.70, 0.90, 1.10, 1.30,
+    1.50, 1.38, 1.36, 1.28,
+)
+_EN_DEFAULT = 1.8
+
+
+def electronegativity(z: int) -> float:
+    """Pauling 전기음성도 (값이 없는 원소는 _EN_DEFAULT)"""
+    en = _PAULING[z] if 0 < z < len(_PAULING) else None
+    return _EN_DEFAULT if en is None else en
+
+
+def composition_features(counts: Dict[int, float]) -> Dict[str, float]:
+    """조성 {원자번호: 개수} → 원자 수로 가중한 전기음성도 평균/분산 (구조 정보 없이 계산 가능)"""
+    total = float(sum(counts.values()))
+    if total <= 0:
+        return {"en_mean": _EN_DEFAULT, "en_var": 0.0}
+    mean = sum(n * electronegativity(z) for z, n in counts.items()) / total
+    var = sum(n * (electronegativity(z) - mean) ** 2 for z, n in counts.items()) / total
+    return {"en_mean": mean, "en_var": var}
+
+
+class SurrogatePredictor(Predictor):
+    """
+    조성 특징으로 만든 고정 계수 회귀식 (학습 없음, 항상 같은 입력 → 같은 값).
+      특징: 전기음성도 평균 χ̄, 분산 σ²(χ), 원자당 부피 v
+      bandgap          = max(0, 2.4·(χ̄ − 1.5) + 3.4·σ(χ))               [eV]
+      formation_energy = −1.92 · σ²(χ)    (Pauling 결합 에너지 근사)     [eV/atom]
+      permittivity     = 1 + (ħω / (Eg + 2.5))² · (12 / v)^(1/3), ħω=10 eV  (Penn 모델 꼴)
+    지연시간은 SURROGATE_* 환경변수로 흉내 낸다.
+    앙상블 멤버는 조성 + 멤버 번호로 시드를 고정한 정규 섭동 (σ = 절대 + 상대 × |값|, MEMBER_SIGMA).
+    """
+    name = "surrogate"
+    VERSION = 1
+    MEMBER_SIGMA = {"bandgap": (0.15, 0.10), "permittivity": (0.5, 0.10), "formation_energy": (0.05, 0.05)}
+
+    def __init__(self, latency_ms: float = None, per_atom_ms: float = None,
+                 batch_overhead_ms: float = None, jitter: float = None, mode: str = None,
+                 seed: int = 0):
+        env = os.environ.get
+        self.latency_ms = float(env("SURROGATE_LATENCY_MS", 0) if latency_ms is None else latency_ms)
+        self.per_atom_ms = float(env("SURROGATE_LATENCY_PER_ATOM_MS", 0) if per_atom_ms is None else per_atom_ms)
+        self.batch_overhead_ms = float(env("SURROGATE_BATCH_OVERHEAD_MS", 0)
+                                       if batch_overhead_ms is None else batch_overhead_ms)
+        self.jitter = float(env("SURROGATE_JITTER", 0) if jitter is None else jitter)
+        self.mode = (mode or env("SURROGATE_LATENCY_MODE", "sleep")).lower()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def signature(self) -> str:
+        # 지연 설정은 값에 영향이 없으므로 namespace 에 넣지 않는다
+        return f"surrogate|v{self.VERSION}"
+
+    def models(self) -> List[str]:
+        return list(PROP_NAMES)
+
+    def _wait(self, ms: float) -> None:
+        if ms <= 0:
+            return
+        if self.jitter:
+            with self._rng_lock:
+                ms *= 1.0 + self.jitter * (2.0 * self._rng.random() - 1.0)
+        if self.mode == "spin":
+            end = time.perf_counter() + ms / 1e3
+            while time.perf_counter() < end:
+                pass
+        else:
+            time.sleep(ms / 1e3)
+
+    @staticmethod
+    def features(atoms) -> Dict[str, float]:
+        z = atoms.get_atomic_numbers()
+        counts = {}
+        for k in z:
+            counts[int(k)] = counts.get(int(k), 0) + 1
+        return {
+            **composition_features(counts),
+            "vol_per_atom": abs(float(atoms.get_volume())) / max(len(z), 1),
+        }
+
+    def _values(self, atoms) -> Dict[str, float]:
+        f = self.features(atoms)
+        en_std = f["en_var"] ** 0.5
+        eg = max(0.0, 2.4 * (f["en_mean"] - 1.5) + 3.4 * en_std)
+        ef = 0.0 - 1.92 * f["en_var"]   # 0.0 - : 단원소에서 -0.0 이 나오지 않게
+        eps = 1.0 + (10.0 / (eg + 2.5)) ** 2 * (12.0 / max(f["vol_per_atom"], 1.0)) ** (1.0 / 3.0)
+        return {"bandgap": eg, "formation_energy": ef, "permittivity": eps}
+
+    def predict(self, atoms) -> Dict[str, float]:
+        self._wait(self.latency_ms + self.per_atom_ms * len(atoms))
+        return self._values(atoms)
+
+    def predict_batch(self, atoms_list) -> List[Dict[str, float]]:
+        self._wait(self.batch_overhead_ms
+                   + sum(self.latency_ms + self.per_atom_ms * len(a) for a in atoms_list))
+        return [self._values(a) for a in atoms_list]
+
+    def _member_values(self, atoms, member: int) -> Dict[str, float]:
+        import numpy as np
+        base = self._values(atoms)
+        z = np.sort(np.asarray(atoms.get_atomic_numbers(), dtype=np.int64))
+        rng = np.random.default_rng([zlib.crc32(z.tobytes()), int(member), self.VERSION])
+        out = {}
+        for k, v in base.items():
+            a, r = self.MEMBER_SIGMA[k]
+            out[k] = v + float(rng.standard_normal()) * (a + r * abs(v))
+        out["bandgap"] = max(out["bandgap"], 0.0)
+        out["permittivity"] = max(out["permittivity"], 1.0)
+        return out
+
+    def supports_members(self) -> bool:
+        return True
+
+    def predict_members(self, atoms_list, members: Sequence[int]) -> List[List[Dict[str, float]]]:
+        members = list(members)
+        self._wait(self.batch_overhead_ms + len(members)
+                   * sum(self.latency_ms + self.per_atom_ms * len(a) for a in atoms_list))
+        return [[self._member_values(a, m) for m in members] for a in atoms_list]
+
+
+BACKENDS = {"alignn": AlignnPredictor, "surrogate": SurrogatePredictor}
+
+
+def get_predictor(backend: str = None) -> Predictor:
+    """PREDICTOR_BACKEND (또는 인자) 로 예측기 생성"""
+    name = (backend or PREDICTOR_BACKEND).lower()
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"unknown PREDICTOR_BACKEND: {name} (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,291 @@
+"""
+조성 기반 사전 필터 (ALIGNN 추론 전 1단계)
+
+대량 라이브러리의 후보 대부분은 뻔히 부적합하다 (Eg≈0 금속 → Vov 가 안 열려 Ion/gm/fT 가 0,
+형성에너지가 크게 양수 → Stab 점수 바닥). 이런 구조까지 GNN 3종을 돌리지 않도록,
+조성(원소 + 개수)만으로 물성 구간을 추정하고 그 구간 안에서 가능한 최고 점수가
+사용자 기준(min_score)에 못 미치면 추론 전에 걸러낸다.
+
+  1) 조성 추정치 (estimate)
+       전기음성도 평균/분산으로 만든 회귀식 (predictors.SurrogatePredictor 와 같은 특징)
+       + 비금속/준금속 원소가 하나도 없으면 금속·합금으로 보고 Eg = 0
+  2) 보정된 구간 (Calibration)
+       ALIGNN 값 − 추정치 잔차의 분위수 (분할 conformal: 보정 집합 n개에서 ⌈(n+1)·q⌉ 번째)
+       → coverage 확률로 참값이 [추정치 + lo, 추정치 + hi] 안에 든다
+       보정 파일이 없으면 아주 넓은 기본 구간 (거의 걸러지지 않음)
+  3) 점수 상한 (score_upper_bounds)
+       Ef 는 Stab 에만 들어가고 작을수록 점수가 높으므로 Ef = 구간 하한으로 고정,
+       (Eg, eps_r) 구간은 PREFILTER_GRID² 격자에서 screen_mosfet 과 같은 배열 엔진으로 점수를 계산해
+       최대값 + (이웃 격자점 사이 점수 차 최대값) 을 상한으로 쓴다 (격자 사이 봉우리 여유분)
+  4) ScoreGate(min_score, conditions)
+       상한 < min_score 인 구조는 Prefiltered 로 표시 → alignn_adapter.predict_materials_batch 가 추론 생략
+
+보정 파일 만들기 (현재 PREDICTOR_BACKEND 로 예측해서 잔차 분위수 저장):
+    python prefilter.py calibrate cifs/ -o prefilter_calibration.json --coverage 0.95
+
+환경변수:
+  PREFILTER_CALIBRATION  보정 파일 경로 (JSON). 없으면 DEFAULT_OFFSETS
+  PREFILTER_GRID         (Eg, eps_r) 격자 한 변의 점 수 (기본 9)
+"""
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import screener_core as M
+import screener_adapter as SA
+from predictors import composition_features
+from telemetry import PREFILTER_DECISIONS, span
+
+PROPS = ("bandgap", "permittivity", "formation_energy")
+
+# 보정 전 기본 구간 (추정치 기준 [lo, hi]) — 조성 추정이 많이 틀려도 걸러내지 않을 만큼 넓게
+DEFAULT_OFFSETS = {
+    "bandgap": (-2.0, 3.0),
+    "permittivity": (-10.0, 20.0),
+    "formation_energy": (-2.0, 1.5),
+}
+# 물리적으로 불가능한 값은 잘라낸다
+_FLOORS = {"bandgap": 0.0, "permittivity": 1.0}
+
+GRID = int(os.environ.get("PREFILTER_GRID", 9))
+CHUNK = 4096   # 한 번에 격자 계산하는 후보 수 (CHUNK × GRID² 점)
+
+# 비금속/준금속 (하나라도 있으면 띠간격이 있을 수 있음). 비활성 기체 포함
+_NONMETALS = {1, 2, 5, 6, 7, 8, 9, 10, 14, 15, 16, 17, 18, 32, 33, 34, 35, 36,
+              51, 52, 53, 54, 85, 86}
+
+
+class Prefiltered(Exception):
+    """사전 필터에서 걸러진 구조 (예외처럼 예측 목록에 들어가지만 오류는 아님)"""
+
+    def __init__(self, upper: float, min_score: float):
+        super().__init__(f"prefiltered: score upper bound {upper:.1f} < min_score {min_score:g}")
+        self.upper = float(upper)
+        self.min_score = float(min_score)
+
+
+# ---------- 조성 → 추정치 ----------
+def composition_counts(x) -> Dict[int, float]:
+    """Atoms / {원소기호 또는 원자번호: 개수} / 화학식 문자열 → {원자번호: 개수}"""
+    from ase.data import atomic_numbers
+    if hasattr(x, "get_atomic_numbers"):
+        counts: Dict[int, float] = {}
+        for z in x.get_atomic_numbers():
+            counts[int(z)] = counts.get(int(z), 0) + 1
+        return counts
+    if isinstance(x, str):
+        from ase.formula import Formula
+        try:
+            x = Formula(x).count()
+        except ValueError as e:
+            raise ValueError(f"화학식을 읽을 수 없습니다: {x} ({e})")
+    out = {}
+    for k, n in dict(x).items():
+        z = atomic_numbers.get(k) if isinstance(k, str) else int(k)
+        if z is None:
+            raise ValueError(f"알 수 없는 원소: {k}")
+        out[z] = out.get(z, 0) + float(n)
+    return out
+
+
+def estimate(x) -> Dict[str, float]:
+    """조성만으로 추정한 {bandgap, permittivity, formation_energy}"""
+    counts = composition_counts(x)
+    f = composition_features(counts)
+    if not any(z in _NONMETALS for z in counts):
+        eg = 0.0
+    else:
+        eg = max(0.0, 2.4 * (f["en_mean"] - 1.5) + 3.4 * f["en_var"] ** 0.5)
+    return {
+        "bandgap": eg,
+        "permittivity": 1.0 + (10.0 / (eg + 2.5)) ** 2,
+        "formation_energy": 0.0 - 1.92 * f["en_var"],
+    }
+
+
+# ---------- 보정 ----------
+class Calibration:
+    """물성별 잔차 구간 {prop: (lo, hi)} (+ 보정에 쓴 coverage, 표본 수)"""
+
+    def __init__(self, offsets: Dict[str, tuple] = None, coverage: float = None, n: int = 0):
+        self.offsets = {k: tuple(map(float, v)) for k, v in (offsets or DEFAULT_OFFSETS).items()}
+        self.coverage = coverage
+        self.n = n
+
+    @property
+    def calibrated(self) -> bool:
+        return self.n > 0
+
+    @classmethod
+    def fit(cls, samples, coverage: float = 0.95) -> "Calibration":
+        """
+        samples: [(조성, {bandgap, permittivity, formation_energy}), ...]  (조성은 composition_counts 입력 형식)
+        양쪽 꼬리에 (1 − coverage)/2 씩 → 물성별로 [lo, hi] 가 coverage 확률로 잔차를 포함
+        """
+        if not 0.0 < coverage < 1.0:
+            raise ValueError("coverage 는 0 과 1 사이")
+        resid = {k: [] for k in PROPS}
+        for comp, props in samples:
+            est = estimate(comp)
+            for k in PROPS:
+                resid[k].append(float(props[k]) - est[k])
+        n = len(samples)
+        if n == 0:
+            raise ValueError("보정 표본이 없습니다")
+
+        tail = (1.0 - coverage) / 2.0
+        # 분할 conformal 순위: 표본이 적으면 끝값(또는 무한대)으로 보수적으로
+        k_hi = math.ceil((n + 1) * (1.0 - tail))
+        k_lo = math.floor((n + 1) * tail)
+        offsets = {}
+        for k, r in resid.items():
+            r = np.sort(np.asarray(r, dtype=float))
+            hi = r[k_hi - 1] if k_hi <= n else math.inf
+            lo = r[k_lo - 1] if k_lo >= 1 else -math.inf
+            offsets[k] = (float(lo), float(hi))
+        return cls(offsets, coverage, n)
+
+    def interval(self, est: Dict[str, float]) -> Dict[str, tuple]:
+        out = {}
+        for k in PROPS:
+            lo, hi = self.offsets[k]
+            floor = _FLOORS.get(k, -math.inf)
+            out[k] = (max(est[k] + lo, floor), max(est[k] + hi, floor))
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": 1, "coverage": self.coverage, "n": self.n,
+                "offsets": {k: list(v) for k, v in self.offsets.items()}}
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Calibration":
+        with open(path, encoding="utf-8") as f:
+            d = json.load(f)
+        offsets = dict(DEFAULT_OFFSETS)
+        offsets.update({k: tuple(v) for k, v in d.get("offsets", {}).items() if k in PROPS})
+        return cls(offsets, d.get("coverage"), int(d.get("n", 0)))
+
+    @classmethod
+    def from_env(cls) -> "Calibration":
+        path = os.environ.get("PREFILTER_CALIBRATION")
+        if path and os.path.exists(path):
+            return cls.load(path)
+        return cls()
+
+
+CALIBRATION = Calibration.from_env()
+
+
+# ---------- 점수 상한 ----------
+def score_upper_bounds(lo: Dict[str, np.ndarray], hi: Dict[str, np.ndarray],
+                       conditions: Dict[str, Any] | None = None,
+                       weights: Dict[str, float] | None = None, grid: int = None) -> np.ndarray:
+    """
+    물성 구간 [lo, hi] (물성별 (N,) 배열) → 구조별 screen_mosfet 점수 상한 (N,)
+    공정조건은 /screen_alignn/batch 와 같이 alignn_inputs(…, conditions) + vdd 만 반영.
+    """
+    g = max(2, int(grid or GRID))
+    w = SA.normalize_weights(weights) if weights else None
+    props, _, vdd = SA.alignn_inputs(
+        {"bandgap": 0.0, "permittivity": 1.0, "formation_energy": 0.0}, conditions)
+    s = SA._slider_params(props, 300.0, vdd)
+    params = {f: getattr(s, f) for f in SA.SLIDER_FIELDS}
+
+    eg_lo, eg_hi = (np.asarray(a["bandgap"], dtype=float) for a in (lo, hi))
+    er_lo, er_hi = (np.asarray(a["permittivity"], dtype=float) for a in (lo, hi))
+    ef_lo = np.asarray(lo["formation_energy"], dtype=float)
+    t = np.linspace(0.0, 1.0, g)
+
+    out = np.empty(eg_lo.shape[0])
+    for a in range(0, out.size, CHUNK):
+        b = min(a + CHUNK, out.size)
+        eg = eg_lo[a:b, None, None] + (eg_hi - eg_lo)[a:b, None, None] * t[None, :, None]
+        er = er_lo[a:b, None, None] + (er_hi - er_lo)[a:b, None, None] * t[None, None, :]
+        ef = ef_lo[a:b, None, None]
+        arr = M.compute_metrics_arrays(eg, er, ef, **params)
+        score = np.asarray(SA._score(M.compute_percentiles_arrays(arr), w), dtype=float)
+        score = np.broadcast_to(score, (b - a, g, g))
+        # 격자점 사이에 숨은 봉우리 여유분: 축 방향 이웃 격자점 점수 차의 최대값
+        slack = np.maximum(np.abs(np.diff(score, axis=1)).max(axis=(1, 2)),
+                           np.abs(np.diff(score, axis=2)).max(axis=(1, 2)))
+        out[a:b] = score.max(axis=(1, 2)) + slack
+    return out
+
+
+class ScoreGate:
+    """
+    predict_materials_batch(…, gate=) 에 넘기는 사전 필터.
+    gate(atoms_list) → 구조별 None(추론 진행) 또는 Prefiltered
+    (워커 프로세스로 넘어가도록 피클 가능한 값만 가진다)
+    """
+
+    def __init__(self, min_score: float, conditions: Dict[str, Any] | None = None,
+                 weights: Dict[str, float] | None = None, calibration: Calibration = None):
+        self.min_score = float(min_score)
+        self.conditions = conditions
+        self.weights = weights
+        self.calibration = calibration or CALIBRATION
+
+    def upper_bounds(self, compositions) -> np.ndarray:
+        ivs = [self.calibration.interval(estimate(c)) for c in compositions]
+        lo = {k: np.array([iv[k][0] for iv in ivs]) for k in PROPS}
+        hi = {k: np.array([iv[k][1] for iv in ivs]) for k in PROPS}
+        return score_upper_bounds(lo, hi, self.conditions, self.weights)
+
+    def __call__(self, compositions) -> List[Optional[Prefiltered]]:
+        if not compositions:
+            return []
+        with span("prefilter"):
+            ub = self.upper_bounds(compositions)
+        out = [Prefiltered(u, self.min_score) if u < self.min_score else None for u in ub]
+        rejected = sum(1 for v in out if v is not None)
+        PREFILTER_DECISIONS.inc(rejected, result="rejected")
+        PREFILTER_DECISIONS.inc(len(out) - rejected, result="passed")
+        return out
+
+
+# ---------- 보정 CLI ----------
+def main(argv=None) -> int:
+    import argparse
+    from pathlib import Path
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    cal = sub.add_parser("calibrate", help="CIF 폴더 → 잔차 분위수 보정 파일")
+    cal.add_argument("input", type=Path, help="CIF 폴더 (하위 폴더 포함)")
+    cal.add_argument("-o", "--output", default="prefilter_calibration.json")
+    cal.add_argument("--coverage", type=float, default=0.95, help="구간 포함 확률 (기본 0.95)")
+    args = ap.parse_args(argv)
+
+    import alignn_adapter
+    from cif_ingest import parse_cifs
+    texts = [p.read_text(errors="replace") for p in sorted(args.input.rglob("*"))
+             if p.is_file() and p.suffix.lower() == ".cif"]
+    samples = []
+    for start in range(0, len(texts), 256):
+        chunk = texts[start:start + 256]
+        preds = alignn_adapter.predict_materials_batch(chunk)
+        for atoms, p in zip(parse_cifs(chunk), preds):
+            if not isinstance(p, Exception) and not isinstance(atoms, Exception):
+                samples.append((atoms, p[1]))
+
+    calib = Calibration.fit(samples, args.coverage)
+    calib.save(args.output)
+    print(f"[calibrate] {calib.n} structures, coverage {args.coverage:.0%} → {args.output}")
+    for k, (lo, hi) in calib.offsets.items():
+        print(f"  {k:18s} [{lo:+.3f}, {hi:+.3f}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+스크리닝 결과 저장소 + Top-K 순위 조회
+
+- SQLite 테이블 하나 (재료 × 공정조건 당 1행, 다시 스크리닝하면 덮어씀)
+- 인덱스: (cond_key, score) 와 (cond_key, 각 퍼센트 열)
+    → 기본 점수나 퍼센트 하나로 정렬하는 top-K 는 인덱스를 따라 LIMIT 만큼만 읽는다
+- 임의 가중치 top-K 는 공정조건별 퍼센트 행렬(열 배열)을 메모리에 올려두고
+  행렬-벡터 곱 + np.argpartition (전체 정렬 없이 K개만 고름)
+- cond_key 는 screener_adapter.condition_key (공정 파라미터를 양자화한 문자열)
+- (선택) 열 저장소(columnar_store): 입력/지표 9종/퍼센트 9종/점수를 열 파일에 이어 쓴다.
+  켜져 있으면 가중치 순위용 퍼센트 행렬을 SQLite 대신 memmap 열에서 바로 만든다.
+  열 append 는 (열 파일 ~30개 flock + fsync 라) 비싸므로 모아서 쓴다:
+  쌓인 행이 RESULTS_COLUMNS_FLUSH_ROWS 개를 넘거나, 가장 오래된 행이 RESULTS_COLUMNS_FLUSH_S 초를 넘기면
+  다음 add_many 에서, 그리고 이 프로세스에서 열을 읽기 직전/종료 시(flush) 기록한다.
+  (프로세스가 죽으면 아직 안 쓴 행은 열 저장소에서만 빠진다. SQLite 에는 이미 있음)
+
+환경변수:
+  RESULTS_DB       SQLite 경로 (기본: 비움 → 프로세스 메모리에만 유지. gunicorn 워커가 여럿이면 필수)
+  RESULTS_COLUMNS  열 저장소 폴더 (기본: 비움 → 끔, RESULTS_DB 와 함께 써야 함)
+  RESULTS_COLUMNS_FLUSH_ROWS  열 저장소에 모아 쓸 행 수 (기본 256)
+  RESULTS_COLUMNS_FLUSH_S     열 저장소에 쓰지 않고 버틸 최대 시간 [s] (기본 5)
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from columnar_store import ColumnarStore
+from screener_adapter import DECISION_LABELS, PERCENT_KEYS, normalize_weights, rescore
+
+INPUT_KEYS = ["Eg_eV", "eps_r", "Ef_eV_atom"]
+_COLUMNS = ["material_id", "name", "cond_key", *INPUT_KEYS, *PERCENT_KEYS,
+            "score", "decision", "model_version", "created"]
+
+RESULTS_COLUMNS_FLUSH_ROWS = int(os.environ.get("RESULTS_COLUMNS_FLUSH_ROWS", 256))
+RESULTS_COLUMNS_FLUSH_S    = float(os.environ.get("RESULTS_COLUMNS_FLUSH_S", 5))
+
+
+class ResultsStore:
+    """
+    스레드 안전한 결과 저장소.
+    add_many 로 쌓고, top_k 로 조회한다.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, columns_dir: Optional[str] = None):
+        self.db_path = db_path or ":memory:"
+        if columns_dir and self.db_path == ":memory:":
+            # 열 저장소의 id 는 SQLite 행 id → 재시작하면 어긋나므로 디스크 DB 가 필요
+            raise ValueError("RESULTS_COLUMNS 는 RESULTS_DB 와 함께 써야 합니다")
+        self._lock = threading.Lock()
+        self.columns: Optional[ColumnarStore] = ColumnarStore(columns_dir) if columns_dir else None
+        # cond_key -> (ids, 퍼센트 행렬 n×9) : 가중치 순위용 열 캐시 (삽입 시 해당 조건만 무효화)
+        self._matrix: Dict[str, tuple] = {}
+        # 열 저장소에 아직 안 쓴 행 (id 포함) 과 그중 가장 오래된 행의 시각
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_since = 0.0
+        if self.columns is not None:
+            atexit.register(self.flush)
+
+        # 연결은 프로세스마다 따로 (gunicorn preload 로 import 후 fork 되는 경우, _db 참고).
+        # 디스크 DB 면 스키마만 지금 만들고 닫는다. ":memory:" 는 프로세스마다 별개의 DB 가 된다
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._inherited: list = []
+        if self.db_path != ":memory:":
+            self._connect().close()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """이 프로세스의 연결. fork 로 물려받은 연결은 쓰지 않고 (닫지도 않고) 새로 연다"""
+        if self._conn_pid != os.getpid():
+            if self._conn is not None:
+                self._inherited.append(self._conn)
+            self._conn = self._connect()
+            self._conn_pid = os.getpid()
+            self._matrix.clear()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.db_path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        cols = ", ".join(
+            [f"{k} REAL" for k in INPUT_KEYS + PERCENT_KEYS]
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id INTEGER PRIMARY KEY,"
+            " material_id TEXT NOT NULL,"
+            " name TEXT,"
+            " cond_key TEXT NOT NULL,"
+            f" {cols},"
+            " score REAL NOT NULL,"
+            " decision TEXT,"
+            " model_version TEXT,"
+            " created REAL NOT NULL,"
+            " UNIQUE(material_id, cond_key))"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS ix_results_score ON results (cond_key, score DESC)")
+        for k in PERCENT_KEYS:
+            db.execute(f"CREATE INDEX IF NOT EXISTS ix_results_{k} ON results (cond_key, {k} DESC)")
+        db.commit()
+        return db
+
+    @classmethod
+    def from_env(cls) -> "ResultsStore":
+        return cls(os.environ.get("RESULTS_DB") or None,
+                   os.environ.get("RESULTS_COLUMNS") or None)
+
+    # ----- 쓰기 -----
+    def add_many(self, records: List[Dict[str, Any]]) -> int:
+        """
+        records: {material_id, name, cond_key, inputs{Eg_eV,..}, metrics{..}, percentiles{..},
+                  score, decision, model_version}
+        같은 (material_id, cond_key) 는 최신 값으로 덮어쓴다.
+        열 저장소는 append 전용이라 같은 키가 여러 번 쌓이고, 읽을 때 id 별 마지막 행만 쓴다.
+        """
+        if not records:
+            return 0
+        now = time.time()
+        rows = []
+        for r in records:
+            inputs, perc = r.get("inputs") or {}, r["percentiles"]
+            rows.append(
+                [r["material_id"], r.get("name"), r["cond_key"]]
+                + [_f(inputs.get(k)) for k in INPUT_KEYS]
+                + [_f(perc.get(k)) for k in PERCENT_KEYS]
+                + [float(r["score"]), r.get("decision"), r.get("model_version"), now]
+            )
+        # 같은 키면 값만 갱신 (id 유지, 이름이 없으면 예전 이름 유지)
+        updates = ", ".join(
+            "name = COALESCE(excluded.name, results.name)" if c == "name" else f"{c} = excluded.{c}"
+            for c in _COLUMNS if c not in ("material_id", "cond_key")
+        )
+        sql = (
+            f"INSERT INTO results ({', '.join(_COLUMNS)})"
+            f" VALUES ({', '.join('?' * len(_COLUMNS))})"
+            f" ON CONFLICT(material_id, cond_key) DO UPDATE SET {updates}"
+        )
+        with self._lock:
+            self._db.executemany(sql, rows)
+            self._db.commit()
+            for r in records:
+                self._matrix.pop(r["cond_key"], None)
+            if self.columns is not None:
+                ids = self._ids_for(records)
+                if not self._pending:
+                    self._pending_since = now
+                self._pending.extend(dict(r, id=i) for r, i in zip(records, ids))
+                if (len(self._pending) >= RESULTS_COLUMNS_FLUSH_ROWS
+                        or now - self._pending_since >= RESULTS_COLUMNS_FLUSH_S):
+                    self._flush_columns()
+        return len(rows)
+
+    def flush(self) -> None:
+        """모아둔 행을 열 저장소에 기록 (열 저장소가 꺼져 있거나 쌓인 행이 없으면 아무것도 안 함)"""
+        if self.columns is None:
+            return
+        with self._lock:
+            self._flush_columns()
+
+    def _flush_columns(self) -> None:
+        # lock 안에서 호출. fork 로 물려받은 버퍼는 부모 몫이라 버린다
+        if self._conn_pid != os.getpid():
+            self._pending = []
+            return
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self.columns.append(pending)
+
+    # ----- 읽기 -----
+    def conditions(self) -> List[Dict[str, Any]]:
+        """저장된 공정조건 목록과 건수"""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT cond_key, COUNT(*) FROM results GROUP BY cond_key ORDER BY COUNT(*) DESC"
+            )
+            return [{"cond_key": k, "count": n} for k, n in cur.fetchall()]
+
+    def count(self, cond_key: Optional[str] = None) -> int:
+        with self._lock:
+            if cond_key is None:
+                return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return self._db.execute(
+                "SELECT COUNT(*) FROM results WHERE cond_key = ?", (cond_key,)
+            ).fetchone()[0]
+
+    def top_k(self, cond_key: str, k: int = 20,
+              weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        공정조건 cond_key 에서 상위 k개.
+        - weights 없음        : 저장된 score 순 (인덱스)
+        - 퍼센트 하나만 가중치 : 그 열 순 (인덱스)
+        - 그 외               : Σ w·퍼센트 / Σ w 를 numpy 로 계산해 argpartition
+        반환 행의 score 는 요청한 가중치 기준 점수.
+        """
+        k = max(1, int(k))
+        w = _weight_vector(weights)
+        if w is None:
+            return self._top_by_column(cond_key, "score", k)
+        nz = np.flatnonzero(w)
+        if len(nz) == 1:
+            rows = self._top_by_column(cond_key, PERCENT_KEYS[nz[0]], k)
+            for r in rows:
+                r["score"] = r["percentiles"][PERCENT_KEYS[nz[0]]]
+            return rows
+
+        ids, mat = self._percent_matrix(cond_key)
+        if len(ids) == 0:
+            return []
+        return self._top_from_scores(ids, mat @ w, k)
+
+    def rescore(self, cond_key: str, weights: Optional[Dict[str, float]] = None,
+                thresholds: Optional[Dict[str, float]] = None, k: int = 20) -> Dict[str, Any]:
+        """
+        저장된 퍼센트에 새 가중치/판정 기준을 적용 (물리 계산·ALIGNN 없음).
+        반환: {total, counts{suitable, unsure, unsuitable}, rows(top-k, 새 score/decision)}
+        """
+        ids, mat = self._percent_matrix(cond_key)
+        counts = {"suitable": 0, "unsure": 0, "unsuitable": 0}
+        if len(ids) == 0:
+            return {"total": 0, "counts": counts, "rows": []}
+        scores, codes = rescore(
+            {key: mat[:, j] for j, key in enumerate(PERCENT_KEYS)}, weights, thresholds
+        )
+        counts.update(zip(DECISION_LABELS, np.bincount(codes, minlength=3).tolist()))
+
+        rows = self._top_from_scores(ids, scores, max(1, int(k)), codes)
+        return {"total": int(len(ids)), "counts": counts, "rows": rows}
+
+    def _top_from_scores(self, ids: np.ndarray, scores: np.ndarray, k: int,
+                         codes: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """점수 배열에서 상위 k개 (argpartition 으로 k개만 고른 뒤 그 안에서만 정렬)"""
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+        if k < len(scores):
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(len(scores))
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+
+        by_id = {r["id"]: r for r in self._rows_by_id(ids[idx].tolist())}
+        out = []
+        for i in idx:
+            r = by_id[int(ids[i])]
+            r["score"] = float(scores[i])
+            if codes is not None:
+                r["decision"] = DECISION_LABELS[codes[i]]
+            out.append(r)
+        return out
+
+    # ----- 내부 -----
+    def _top_by_column(self, cond_key: str, column: str, k: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._db.execute(
+                f"SELECT id, {', '.join(_COLUMNS)} FROM results"
+                f" WHERE cond_key = ? AND {column} IS NOT NULL ORDER BY {column} DESC LIMIT ?",
+                (cond_key, k),
+            )
+            return [_row_dict(row) for row in cur.fetchall()]
+
+    def _rows_by_id(self, ids: List[int]) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._db.execute(
+                f"SELECT id, {', '.join(_COLUMNS)} FROM results"
+                f" WHERE id IN ({', '.join('?' * len(ids))})",
+                ids,
+            )
+            return [_row_dict(row) for row in cur.fetchall()]
+
+    def _ids_for(self, records: List[Dict[str, Any]]) -> List[int]:
+        # lock 안에서 호출: (material_id, cond_key) → SQLite 행 id (공정조건별로 묶어서 조회)
+        by_cond: Dict[str, List[str]] = {}
+        for r in records:
+            by_cond.setdefault(r["cond_key"], []).append(r["material_id"])
+        found = {}
+        for cond_key, mids in by_cond.items():
+            mids = list(dict.fromkeys(mids))
+            for k in range(0, len(mids), 500):
+                part = mids[k:k + 500]
+                cur = self._db.execute(
+                    f"SELECT material_id, id FROM results WHERE cond_key = ?"
+                    f" AND material_id IN ({', '.join('?' * len(part))})",
+                    [cond_key, *part],
+                )
+                found.update(((cond_key, m), i) for m, i in cur.fetchall())
+        return [found[(r["cond_key"], r["material_id"])] for r in records]
+
+    def _percent_matrix(self, cond_key: str):
+        if self.columns is not None:
+            return self._percent_matrix_columns(cond_key)
+        with self._lock:
+            cached = self._matrix.get(cond_key)
+            if cached is not None:
+                return cached
+            cur = self._db.execute(
+                f"SELECT id, {', '.join(PERCENT_KEYS)} FROM results WHERE cond_key = ?",
+                (cond_key,),
+            )
+            data = np.array(cur.fetchall(), dtype=float).reshape(-1, 1 + len(PERCENT_KEYS))
+            cached = (data[:, 0].astype(np.int64), np.ascontiguousarray(data[:, 1:]))
+            self._matrix[cond_key] = cached
+            return cached
+
+    def _percent_matrix_columns(self, cond_key: str):
+        """
+        memmap 열에서 퍼센트 행렬 생성 (SQLite 행 파싱 없음).
+        다른 프로세스(CLI)가 이어 쓴 행도 보이도록 캐시는 열 저장소 행 수로 검증한다.
+        """
+        cols = self.columns
+        with self._lock:
+            self._flush_columns()   # 이 프로세스가 모아둔 행도 보이도록
+            n_rows = len(cols)
+            cached = self._matrix.get(cond_key)
+            if cached is not None and cached[0] == n_rows:
+                return cached[1:]
+            code = cols.code_of("cond_key", cond_key)
+            if code is None:
+                sel = np.empty(0, dtype=np.int64)
+            else:
+                sel = np.flatnonzero(cols.column("cond_key")[:n_rows] == code)
+            # 같은 id 가 여러 번 쌓였으면 마지막(최신) 행만
+            ids = np.asarray(cols.column("id")[:n_rows][sel])
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(len(ids) - 1 - last)
+            sel, ids = sel[keep], ids[keep]
+            mat = np.empty((len(sel), len(PERCENT_KEYS)))
+            for j, key in enumerate(PERCENT_KEYS):
+                mat[:, j] = cols.column(key)[:n_rows][sel]
+            self._matrix[cond_key] = (n_rows, ids, mat)
+            return ids, mat
+
+
+def _f(v) -> Optional[float]:
+    return None if v is None else float(v)
+
+
+def _weight_vector(weights: Optional[Dict[str, float]]) -> Optional[np.ndarray]:
+    """{퍼센트 키: 가중치} → 합이 1인 벡터 (없으면 None = 저장된 score)"""
+    if not weights:
+        return None
+    w = normalize_weights(weights)
+    return np.array([w.get(k, 0.0) for k in PERCENT_KEYS])
+
+
+def _row_dict(row) -> Dict[str, Any]:
+    d = dict(zip(["id", *_COLUMNS], row))
+    return {
+        "id": d["id"],
+        "material_id": d["material_id"],
+        "name": d["name"],
+        "cond_key": d["cond_key"],
+        "inputs": {k: d[k] for k in INPUT_KEYS},
+        "percentiles": {k: d[k] for k in PERCENT_KEYS},
+        "score": d["score"],
+        "decision": d["decision"],
+        "model_version": d["model_version"],
+        "created": d["created"],
+    }
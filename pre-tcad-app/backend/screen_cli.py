@@ -0,0 +1,322 @@
+"""
+오프라인 대량 스크리닝 CLI (HTTP 없이 ALIGNN 예측 + screen_mosfet)
+
+    python screen_cli.py cifs/ -o results.csv
+    python screen_cli.py library.tar.gz -o results/ --format parquet --workers 16 --vdd 0.7 --process L_nm=20
+
+- 입력: CIF 폴더(하위 폴더 포함) 또는 tar(.tar / .tar.gz / .tgz …) 아카이브
+- ALIGNN 예측은 프로세스 풀에서 (워커마다 모델 1회 로드, torch 스레드 고정 — jobs.py 워커와 동일)
+  워커 수 기본값 = CPU 코어 수 / --torch-threads
+- 결과는 묶음(--chunk)이 끝날 때마다 바로 기록
+    · csv     : 파일 하나에 행 추가
+    · parquet : 출력 폴더에 part-00000.parquet … (pyarrow 필요)
+- 체크포인트(<출력>.ckpt, JSON lines): 묶음 결과가 디스크에 완전히 써진 뒤에 완료 이름 목록을 남긴다.
+  다시 실행하면 끝난 구조는 건너뛰고, 마지막 체크포인트 이후에 쓰다 만 결과는 잘라내고 이어서 한다.
+  (--no-resume 이면 처음부터)
+- --min-score: 조성만으로 구한 점수 상한이 이보다 낮은 구조는 ALIGNN 추론 없이 decision=prefiltered 로 기록
+  (prefilter.py, 보정 파일은 PREFILTER_CALIBRATION)
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tarfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import multiprocessing as mp
+
+import screener_core as M
+from jobs import _worker_init, _worker_predict
+from prefilter import ScoreGate
+from results_store import ResultsStore
+from screener_adapter import (MODEL_VERSION, PERCENT_KEYS, PROCESS_DEFAULTS, alignn_inputs, condition_key,
+                               screen_mosfet_batch)
+
+COLUMNS = (
+    ["name", "material_id", "cond_key", "score", "decision", "Eg_eV", "eps_r", "Ef_eV_atom"]
+    + PERCENT_KEYS + list(M.METRIC_KEYS) + ["error"]
+)
+
+
+# ---------- 입력 ----------
+def iter_cifs(src: Path) -> Iterator[Tuple[str, str]]:
+    """(이름, CIF 텍스트)를 하나씩. 폴더는 상대경로, tar 는 멤버 경로가 이름 (재시작 시 같은 순서/이름)"""
+    if src.is_dir():
+        for path in sorted(src.rglob("*")):
+            if path.is_file() and path.suffix.lower() == ".cif":
+                yield path.relative_to(src).as_posix(), path.read_text(errors="replace")
+        return
+
+    if tarfile.is_tarfile(src):
+        with tarfile.open(src, "r:*") as tf:
+            for member in tf:   # 스트리밍으로 읽음 (전체 목록을 먼저 만들지 않음)
+                if not member.isfile() or not member.name.lower().endswith(".cif"):
+                    continue
+                f = tf.extractfile(member)
+                if f is not None:
+                    yield member.name, f.read().decode("utf-8", errors="replace")
+        return
+
+    raise SystemExit(f"입력은 CIF 폴더 또는 tar 아카이브여야 합니다: {src}")
+
+
+def iter_chunks(items: Iterator[Tuple[str, str]], size: int, skip) -> Iterator[List[Tuple[str, str]]]:
+    chunk = []
+    for name, text in items:
+        if name in skip:
+            continue
+        chunk.append((name, text))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------- 출력 ----------
+class CsvSink:
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = open(path, "a", newline="", encoding="utf-8")
+        self._w = csv.DictWriter(self._f, fieldnames=COLUMNS)
+
+    def truncate(self, state: Dict) -> None:
+        """체크포인트 이후에 써진 행 제거 (체크포인트가 없으면 헤더부터 새로)"""
+        offset = state.get("offset", 0)
+        if offset < self.path.stat().st_size:
+            self._f.truncate(offset)
+        if offset == 0:
+            self._w.writeheader()
+            self._sync()
+
+    def write(self, rows: List[Dict]) -> Dict:
+        self._w.writerows(rows)
+        self._sync()
+        return {"offset": self._f.tell()}
+
+    def _sync(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class ParquetSink:
+    def __init__(self, path: Path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("--format parquet 에는 pyarrow 가 필요합니다 (pip install pyarrow)")
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        self.part = 0
+
+    def truncate(self, state: Dict) -> None:
+        """체크포인트에 없는 part 파일 제거, 다음 번호부터 이어 쓰기"""
+        self.part = state.get("part", -1) + 1
+        for p in self.path.glob("part-*.parquet"):
+            if int(p.stem.split("-")[1]) >= self.part:
+                p.unlink()
+
+    def write(self, rows: List[Dict]) -> Dict:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist(rows, schema=_arrow_schema())
+        final = self.path / f"part-{self.part:05d}.parquet"
+        tmp = final.with_suffix(".tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, final)   # 다 써진 파일만 part-*.parquet 이름을 갖는다
+        state = {"part": self.part}
+        self.part += 1
+        return state
+
+    def close(self) -> None:
+        pass
+
+
+def _arrow_schema():
+    import pyarrow as pa
+    text = {"name", "material_id", "cond_key", "decision", "error"}
+    return pa.schema([(c, pa.string() if c in text else pa.float64()) for c in COLUMNS])
+
+
+# ---------- 체크포인트 ----------
+def load_checkpoint(path: Path) -> Tuple[set, Dict]:
+    """(완료된 이름 집합, 마지막 출력 상태)"""
+    done, state = set(), {}
+    if not path.exists():
+        return done, state
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                break   # 쓰다 만 마지막 줄
+            done.update(rec["names"])
+            state = rec["sink"]
+    return done, state
+
+
+def append_checkpoint(f, names: List[str], sink_state: Dict) -> None:
+    f.write(json.dumps({"names": names, "sink": sink_state, "time": time.time()}) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+# ---------- 스크리닝 ----------
+def screen_chunk(names: List[str], preds: List, conditions: Dict) -> List[Dict]:
+    """워커 예측 결과 → 출력 행 (/screen_alignn/batch 와 같은 입력 변환)"""
+    rows, ok = [], []
+    for name, p in zip(names, preds):
+        if p[0] == "error":
+            rows.append({"name": name, "error": p[1]})
+        elif p[0] == "prefiltered":
+            rows.append({"name": name, "decision": "prefiltered"})
+        else:
+            ok.append((name, p[0], alignn_inputs(p[1], conditions)))
+
+    if ok:
+        vdd = ok[0][2][2]
+        results = screen_mosfet_batch([inp[0] for _, _, inp in ok], vdd=vdd)
+        for (name, material_id, (props, _, _)), res in zip(ok, results):
+            row = {
+                "name": name, "material_id": material_id,
+                "cond_key": condition_key(props, vdd=vdd),
+                "score": res["score"], "decision": res["decision"],
+                "Eg_eV": props["Eg_eV"], "eps_r": props["eps_r"], "Ef_eV_atom": props["Ef_eV_atom"],
+            }
+            row.update({k: res["percentiles"][k] for k in PERCENT_KEYS})
+            row.update({k: res["metrics"][k] for k in M.METRIC_KEYS})
+            rows.append(row)
+    return rows
+
+
+def _store_record(row: Dict) -> Dict:
+    return {
+        "material_id": row["material_id"], "name": row["name"], "cond_key": row["cond_key"],
+        "inputs": {k: row[k] for k in ("Eg_eV", "eps_r", "Ef_eV_atom")},
+        "metrics": {k: row[k] for k in M.METRIC_KEYS},
+        "percentiles": {k: row[k] for k in PERCENT_KEYS},
+        "score": row["score"], "decision": row["decision"],
+        "model_version": MODEL_VERSION,
+    }
+
+
+# --process 로 받는 키: alignn_inputs 가 읽는 공정값 + vdd (--vdd 와 같음)
+PROCESS_KEYS = [*PROCESS_DEFAULTS, "vdd"]
+
+
+def _parse_process(items: List[str]) -> Dict[str, float]:
+    out = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--process 는 KEY=VALUE 형식: {item}")
+        key = key.strip()
+        if key not in PROCESS_KEYS:
+            raise SystemExit(f"--process: 알 수 없는 키 {key!r}. 가능한 키: {', '.join(PROCESS_KEYS)}")
+        try:
+            out[key] = float(value)
+        except ValueError:
+            raise SystemExit(f"--process {key}: 숫자가 아닙니다: {value!r}")
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", type=Path, help="CIF 폴더 또는 tar 아카이브")
+    ap.add_argument("-o", "--output", type=Path, required=True, help="csv 파일 또는 parquet 폴더")
+    ap.add_argument("--format", choices=["csv", "parquet"], default=None,
+                    help="기본: 출력 이름이 .csv 면 csv, 아니면 parquet")
+    ap.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: 코어 수 / torch 스레드)")
+    ap.add_argument("--torch-threads", type=int, default=1, help="워커별 torch 스레드 수 (기본 1)")
+    ap.add_argument("--chunk", type=int, default=32, help="워커 작업/체크포인트 단위 구조 수 (기본 32)")
+    ap.add_argument("--vdd", type=float, default=0.9)
+    ap.add_argument("--process", action="append", metavar="KEY=VALUE",
+                    help=f"공정값 덮어쓰기 ({', '.join(PROCESS_KEYS)})")
+    ap.add_argument("--min-score", type=float, default=None,
+                    help="조성 사전 필터: 점수 상한이 이보다 낮으면 ALIGNN 추론 생략")
+    ap.add_argument("--checkpoint", type=Path, default=None, help="기본: <출력>.ckpt")
+    ap.add_argument("--no-resume", action="store_true", help="체크포인트/기존 출력 무시하고 처음부터")
+    ap.add_argument("--results-db", default=os.environ.get("RESULTS_DB") or None,
+                    help="결과 저장소(SQLite)에도 기록 → 서버 /rank 로 조회 (기본: RESULTS_DB)")
+    ap.add_argument("--results-columns", default=os.environ.get("RESULTS_COLUMNS") or None,
+                    help="결과 열 저장소(memmap) 폴더, --results-db 와 함께 사용 (기본: RESULTS_COLUMNS)")
+    ap.add_argument("--start-method", default=os.environ.get("JOB_START_METHOD", "spawn"))
+    args = ap.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output.suffix.lower() == ".csv" else "parquet")
+    ckpt_path = args.checkpoint or args.output.with_name(args.output.name.rstrip("/") + ".ckpt")
+    workers = args.workers or max(1, (os.cpu_count() or 1) // max(1, args.torch_threads))
+    # 온도는 /screen_alignn 과 같이 300 K 고정 (조성 사전 필터의 점수 상한도 300 K 기준)
+    process = _parse_process(args.process)
+    conditions = {"vdd": process.pop("vdd", args.vdd), "process": process}
+    gate = ScoreGate(args.min_score, conditions) if args.min_score is not None else None
+
+    if args.no_resume:
+        ckpt_path.unlink(missing_ok=True)
+        if fmt == "csv":
+            args.output.unlink(missing_ok=True)
+    done, state = load_checkpoint(ckpt_path)
+
+    if args.results_columns and not args.results_db:
+        raise SystemExit("--results-columns 는 --results-db 와 함께 써야 합니다")
+    store = ResultsStore(args.results_db, args.results_columns) if args.results_db else None
+    sink = CsvSink(args.output) if fmt == "csv" else ParquetSink(args.output)
+    sink.truncate(state)
+    if done:
+        print(f"[resume] 체크포인트에서 {len(done)}개 완료 확인, 이어서 진행", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    n_done = n_err = n_skip = 0
+    chunks = iter_chunks(iter_cifs(args.input), args.chunk, done)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context(args.start_method),
+        initializer=_worker_init,
+        initargs=(args.torch_threads,),
+    )
+    try:
+        with open(ckpt_path, "a", encoding="utf-8") as ckpt:
+            inflight = {}
+            exhausted = False
+            while True:
+                # 대기 작업은 워커 수의 2배까지만 (입력을 한꺼번에 메모리에 올리지 않음)
+                while not exhausted and len(inflight) < 2 * workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    names = [n for n, _ in chunk]
+                    inflight[pool.submit(_worker_predict, [t for _, t in chunk], gate)] = names
+                if not inflight:
+                    break
+
+                finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    names = inflight.pop(fut)
+                    rows = screen_chunk(names, fut.result(), conditions)
+                    state = sink.write(rows)
+                    if store is not None:
+                        store.add_many([_store_record(r) for r in rows if r.get("material_id")])
+                        store.flush()   # 체크포인트보다 먼저 열 저장소까지 (재개 시 빠지는 행이 없도록)
+                    append_checkpoint(ckpt, names, state)
+                    n_err += sum(1 for r in rows if r.get("error"))
+                    n_skip += sum(1 for r in rows if r.get("decision") == "prefiltered")
+                    n_done += len(rows)
+                    rate = n_done / max(time.perf_counter() - t0, 1e-9)
+                    print(f"\r{n_done} screened ({n_err} errors, {n_skip} prefiltered), {rate:.1f}/s",
+                          end="", file=sys.stderr)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        sink.close()
+    print(file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
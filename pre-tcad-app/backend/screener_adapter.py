@@ -1,14 +1,30 @@
-from typing import Dict, Any
-import m_screener as M 
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from typing import Dict, Any, List
+import numpy as np
+import screener_core as M
+from telemetry import CACHE_LOOKUPS, span
 
-def screen_mosfet(props: Dict[str, float], *, temp: float = 300.0, vdd: float = 0.9) -> Dict[str, Any]:
-    """
-    props 예시 키:
-      Eg_eV, eps_r, Ef_eV_atom, mu_cm2_Vs, tox_nm, eps_ox, NA_cm3, L_nm, W_um
-    """
+SLIDER_FIELDS = [f.name for f in fields(M.SliderParams)]
+MODEL_VERSION = "colab_screener_v1"
+
+# 베이스라인 12종 물성 (열 배열)
+_B_NAMES = [name for name, *_ in M.BASELINE]
+_B_EG    = np.array([b[1] for b in M.BASELINE])
+_B_EPS   = np.array([b[2] for b in M.BASELINE])
+_B_EF    = np.array([b[3] for b in M.BASELINE])
+
+# 공정조건별 베이스라인 퍼센트 LRU (후보와 무관하므로 재사용 가능)
+BASELINE_CACHE_SIZE = int(os.environ.get("BASELINE_CACHE_SIZE", 256))
+_BASELINE_CACHE: "OrderedDict[tuple, Dict[str, Dict[str, float]]]" = OrderedDict()
+_BASELINE_LOCK = threading.Lock()
+
+def _material_inputs(props: Dict[str, float]) -> "M.MaterialInputs":
     # 1) 재료 물성
     try:
-        m = M.MaterialInputs(
+        return M.MaterialInputs(
             Eg_eV=float(props["Eg_eV"]),
             eps_r=float(props["eps_r"]),
             Ef_eV_atom=float(props["Ef_eV_atom"]),
@@ -16,8 +32,9 @@ def screen_mosfet(props: Dict[str, float], *, temp: float = 300.0, vdd: float =
     except KeyError as e:
         raise KeyError(f"필수 키 누락: {e}. 필요한 키: Eg_eV, eps_r, Ef_eV_atom")
 
+def _slider_params(props: Dict[str, float], temp: float, vdd: float) -> "M.SliderParams":
     # 2) 공정/설계 파라미터
-    s = M.SliderParams(
+    return M.SliderParams(
         tox_nm=float(props.get("tox_nm", M.SliderParams.tox_nm)),
         eps_ox=float(props.get("eps_ox", M.SliderParams.eps_ox)),
         NA_cm3=float(props.get("NA_cm3", M.SliderParams.NA_cm3)),
@@ -28,30 +45,188 @@ def screen_mosfet(props: Dict[str, float], *, temp: float = 300.0, vdd: float =
         mu_cm2_Vs=float(props.get("mu_cm2_Vs", M.SliderParams.mu_cm2_Vs)),
     )
 
-    # 3) 지표 계산 및 백분위(후보 재료)
-    metrics = M.compute_metrics(m, s)
-    perc    = M.compute_percentiles(metrics)
+def _params_key(s: "M.SliderParams") -> tuple:
+    """SliderParams → 유효숫자 6자리로 양자화한 캐시 키 (슬라이더 step 보다 훨씬 촘촘함)"""
+    return tuple(float(f"{float(getattr(s, f)):.6g}") for f in SLIDER_FIELDS)
+
+def condition_key(props: Dict[str, float], *, temp: float = 300.0, vdd: float = 0.9) -> str:
+    """공정조건 식별 문자열 (결과 저장소/순위 조회용). _params_key 와 같은 양자화"""
+    return ",".join(f"{v:.6g}" for v in _params_key(_slider_params(props, temp, vdd)))
 
+def _compute_baseline(key: tuple) -> Dict[str, Dict[str, float]]:
+    """양자화된 공정조건에서 베이스라인 12종을 한 번의 배열 연산으로 계산"""
+    params = dict(zip(SLIDER_FIELDS, key))
+    arr  = M.compute_metrics_arrays(_B_EG, _B_EPS, _B_EF, **params)
+    parr = M.compute_percentiles_arrays(arr)
+    return {
+        name: {k: float(v[i]) for k, v in parr.items()}
+        for i, name in enumerate(_B_NAMES)
+    }
+
+def _baseline_percentiles(s: "M.SliderParams") -> Dict[str, Dict[str, float]]:
     # 3-1) 베이스라인 재료들의 퍼센트도 같이 계산 (점/범례용)
-    baseline_percentiles: Dict[str, Dict[str, float]] = {}
-    try:
-        for name, Eg, eps_r_b, Ef in M.BASELINE:
-            bm = M.MaterialInputs(Eg_eV=Eg, eps_r=eps_r_b, Ef_eV_atom=Ef)
-            bm_metrics = M.compute_metrics(bm, s)
-            bm_perc    = M.compute_percentiles(bm_metrics)
-            baseline_percentiles[name] = bm_perc
-    except Exception:
-        # 문제가 생겨도 메인 로직은 돌아가도록
-        baseline_percentiles = {}
-
-    # 4) 종합 점수/판단 (간단 가중합 예시)
-    score = float(
-        0.25 * perc.get("Ion_percent", 0.0)
-        + 0.25 * perc.get("gm_percent", 0.0)
-        + 0.25 * perc.get("fT_percent", 0.0)
-        + 0.25 * perc.get("Vth_score_percent", 0.0)
-    )
-    decision = "suitable" if score >= 70 else ("unsure" if score >= 50 else "unsuitable")
+    #      결과는 공정조건에만 의존 → 양자화 키로 LRU 메모이즈
+    key = _params_key(s)
+    with _BASELINE_LOCK:
+        cached = _BASELINE_CACHE.get(key)
+        if cached is not None:
+            _BASELINE_CACHE.move_to_end(key)
+    CACHE_LOOKUPS.inc(cache="baseline", result="miss" if cached is None else "hit")
+    if cached is None:
+        try:
+            cached = _compute_baseline(key)
+        except Exception:
+            # 문제가 생겨도 메인 로직은 돌아가도록
+            return {}
+        with _BASELINE_LOCK:
+            _BASELINE_CACHE[key] = cached
+            while len(_BASELINE_CACHE) > BASELINE_CACHE_SIZE:
+                _BASELINE_CACHE.popitem(last=False)
+    return {name: dict(p) for name, p in cached.items()}
+
+# 종합 점수 가중치 (퍼센트 키 → 가중치) 와 판정 기준
+DEFAULT_WEIGHTS = {
+    "Ion_percent": 0.25,
+    "gm_percent": 0.25,
+    "fT_percent": 0.25,
+    "Vth_score_percent": 0.25,
+}
+DEFAULT_THRESHOLDS = {"suitable": 70.0, "unsure": 50.0}
+DECISION_LABELS = ("unsuitable", "unsure", "suitable")
+PERCENT_KEYS = [
+    "SS_percent", "Vth_score_percent", "Ion_percent", "Ioff_percent",
+    "gm_percent", "fT_percent", "r0_percent", "DIBL_percent", "Stab_percent",
+]
+
+def normalize_weights(weights: Dict[str, float] | None) -> Dict[str, float]:
+    """사용자 가중치 → 합이 1인 가중치 (None/빈 dict 이면 DEFAULT_WEIGHTS)"""
+    if not weights:
+        return dict(DEFAULT_WEIGHTS)
+    unknown = set(weights) - set(PERCENT_KEYS)
+    if unknown:
+        raise ValueError(f"알 수 없는 가중치 키: {', '.join(sorted(unknown))}. 가능한 키: {', '.join(PERCENT_KEYS)}")
+    w = {k: float(v) for k, v in weights.items() if float(v) != 0.0}
+    total = sum(w.values())
+    if any(v < 0 or not np.isfinite(v) for v in w.values()) or total <= 0:
+        raise ValueError("가중치는 0 이상이고 합이 0보다 커야 합니다")
+    return {k: v / total for k, v in w.items()}
+
+def normalize_thresholds(thresholds: Dict[str, float] | None) -> Dict[str, float]:
+    """{"suitable": 점수, "unsure": 점수} (빠진 값은 기본값). unsure ≤ suitable 이어야 함"""
+    t = dict(DEFAULT_THRESHOLDS)
+    for k, v in (thresholds or {}).items():
+        if k not in t:
+            raise ValueError(f"알 수 없는 기준 키: {k}. 가능한 키: suitable, unsure")
+        t[k] = float(v)
+    if t["unsure"] > t["suitable"]:
+        raise ValueError("unsure 기준은 suitable 기준보다 클 수 없습니다")
+    return t
+
+def _score(perc, weights: Dict[str, float] | None = None):
+    """종합 점수 = Σ 가중치 × 퍼센트. 값이 float 이든 배열이든 같은 식으로 계산"""
+    w = DEFAULT_WEIGHTS if weights is None else weights
+    score = 0.0
+    for k, wk in w.items():
+        score = score + wk * perc.get(k, 0.0)
+    return score
+
+def decision_for(score: float, thresholds: Dict[str, float] | None = None) -> str:
+    t = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+    return "suitable" if score >= t["suitable"] else ("unsure" if score >= t["unsure"] else "unsuitable")
+
+def rescore(percentiles: Dict[str, np.ndarray], weights: Dict[str, float] | None = None,
+            thresholds: Dict[str, float] | None = None):
+    """
+    저장된 퍼센트 열 배열 → (점수 배열, 판정 코드 배열). 물리 계산/ALIGNN 없이 가중치·기준만 다시 적용.
+    percentiles: {퍼센트 키: ndarray}  (가중치에 쓰이는 키만 있으면 됨)
+    판정 코드는 DECISION_LABELS 의 인덱스 (0 unsuitable, 1 unsure, 2 suitable) — 문자열 배열보다 훨씬 가볍다
+    """
+    w = normalize_weights(weights)
+    t = normalize_thresholds(thresholds)
+    scores = np.asarray(_score({k: np.asarray(v, dtype=float) for k, v in percentiles.items()}, w),
+                        dtype=float)
+    codes = (scores >= t["unsure"]).astype(np.int8) + (scores >= t["suitable"])
+    return scores, codes
+
+# ---------- 불확실성 (물성 표본 → 점수 표본) ----------
+# 구간 = 점수 ± UNCERTAINTY_Z × 표준편차 × (표본이 적을 때 Student t 보정)
+UNCERTAINTY_Z = float(os.environ.get("UNCERTAINTY_Z", 2.0))
+SAMPLE_KEYS = ("Eg_eV", "eps_r", "Ef_eV_atom")
+# 양측 95% t 분위수 (자유도 1~10). 그 이상은 Cornish-Fisher 근사
+_T975 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228)
+
+def _t_inflation(df: int) -> float:
+    """t(df) / z 분위수 비율 (df→∞ 에서 1)"""
+    z = 1.959964
+    if df <= len(_T975):
+        return _T975[df - 1] / z
+    return 1.0 + (z**2 + 1.0) / (4.0 * df) + (5 * z**4 + 16 * z**2 + 3.0) / (96.0 * df**2)
+
+def alignn_samples(member_props: List[Dict[str, float]]) -> Dict[str, np.ndarray]:
+    """ALIGNN 앙상블 멤버 예측값 목록 → 스크리너 입력 키의 표본 배열 (alignn_inputs 와 같은 변환)"""
+    return {
+        "Eg_eV":      np.array([float(p["bandgap"]) for p in member_props]),
+        "eps_r":      np.array([float(p["permittivity"]) for p in member_props]),
+        "Ef_eV_atom": np.array([float(p["formation_energy"]) for p in member_props]),
+    }
+
+def score_samples(props_list: List[Dict[str, float]], samples_list: List[Dict[str, np.ndarray]], *,
+                  temp: float = 300.0, vdd: float = 0.9,
+                  weights: Dict[str, float] | None = None) -> List[tuple]:
+    """
+    후보별 재료 물성 표본 {Eg_eV, eps_r, Ef_eV_atom: (K,)} → [(점수 표본 (K,), 퍼센트 표본 {키: (K,)})]
+    - 공정값은 후보 props 그대로, 재료 물성만 표본으로 바꿔 compute_metrics → 퍼센트 → 점수
+    - 모든 후보의 표본을 한 줄로 이어 붙여 배열 연산 1회로 계산
+    weights 는 normalize_weights 를 거친 값 (None 이면 DEFAULT_WEIGHTS)
+    """
+    if not props_list:
+        return []
+    sizes = [len(s["Eg_eV"]) for s in samples_list]
+    mat = {k: np.concatenate([np.asarray(s[k], dtype=float) for s in samples_list]) for k in SAMPLE_KEYS}
+    ss = [_slider_params(p, temp, vdd) for p in props_list]
+    proc = {f: np.repeat(np.array([getattr(s, f) for s in ss], dtype=float), sizes) for f in SLIDER_FIELDS}
+
+    arr  = M.compute_metrics_arrays(mat["Eg_eV"], mat["eps_r"], mat["Ef_eV_atom"], **proc)
+    parr = M.compute_percentiles_arrays(arr)
+    scores = np.asarray(_score(parr, weights), dtype=float)
+
+    cuts = np.cumsum(sizes)[:-1]
+    parts = {k: np.split(np.asarray(v), cuts) for k, v in parr.items()}
+    return [
+        (sc, {k: parts[k][i] for k in parr})
+        for i, sc in enumerate(np.split(scores, cuts))
+    ]
+
+def uncertainty_stats(score: float, scores: np.ndarray,
+                      thresholds: Dict[str, float] | None = None) -> Dict[str, Any]:
+    """
+    점 추정 점수 + 앙상블 점수 표본 → {uncertainty, score_interval, ensemble_members, decision_stable}
+    decision_stable: 구간 양 끝의 판정이 같음 (구간이 판정 기준을 걸치지 않음)
+    """
+    k = len(scores)
+    sd = float(np.std(scores, ddof=1)) if k > 1 else 0.0
+    half = UNCERTAINTY_Z * sd * (_t_inflation(k - 1) if k > 1 else 1.0)
+    lo, hi = score - half, score + half
+    return {
+        "uncertainty": sd,
+        "score_interval": [lo, hi],
+        "ensemble_members": k,
+        "decision_stable": decision_for(lo, thresholds) == decision_for(hi, thresholds),
+    }
+
+def _attach_uncertainty(result: Dict[str, Any], scores: np.ndarray, pct_samples: Dict[str, np.ndarray],
+                        thresholds: Dict[str, float] | None) -> None:
+    result.update(uncertainty_stats(result["score"], scores, thresholds))
+    ddof = 1 if len(scores) > 1 else 0
+    result["percentiles_std"] = {k: float(np.std(v, ddof=ddof)) for k, v in pct_samples.items()}
+
+def _assemble_result(metrics: Dict[str, float], perc: Dict[str, float],
+                     baseline_percentiles: Dict[str, Dict[str, float]],
+                     weights: Dict[str, float] | None = None,
+                     thresholds: Dict[str, float] | None = None) -> Dict[str, Any]:
+    # 4) 종합 점수/판단 (weights/thresholds 는 normalize_* 를 거친 값)
+    score = float(_score(perc, weights))
+    decision = decision_for(score, thresholds)
 
     result = {
         "metrics": {
@@ -66,12 +241,195 @@ def screen_mosfet(props: Dict[str, float], *, temp: float = 300.0, vdd: float =
             "Ioff_proxy":    metrics.get("Ioff_proxy"),
         },
         "percentiles": perc,
-        "baseline_percentiles": baseline_percentiles, 
+        "baseline_percentiles": baseline_percentiles,
         "score": score,
         "decision": decision,
         "uncertainty": 0.0,
         "explain": [],
-        "model_version": "colab_screener_v1",
+        "model_version": MODEL_VERSION,
+    }
+    return result
+
+# ALIGNN 흐름의 기본 공정값 (conditions["process"] 로 덮어쓸 수 있는 키)
+PROCESS_DEFAULTS = {
+    "mu_cm2_Vs": 450.0,
+    "tox_nm": 2.0,
+    "eps_ox": 3.9,
+    "NA_cm3": 1e17,
+    "L_nm": 45.0,
+    "W_um": 1.0,
+}
+
+def alignn_inputs(raw_props: Dict[str, float], conditions: Dict[str, Any] | None):
+    """ALIGNN 예측값 + 슬라이더 공정값 → (screen_mosfet 입력 props, temp, vdd)"""
+    # 2) MOSFET 스크리너 입력용 키로 변환
+    props = {
+        "Eg_eV":      float(raw_props.get("bandgap")),
+        "eps_r":      float(raw_props.get("permittivity")),
+        "Ef_eV_atom": float(raw_props.get("formation_energy")),
     }
+
+    # 3) 기본 공정값
+    for k, v in PROCESS_DEFAULTS.items():
+        props.setdefault(k, v)
+
+    # 4) 슬라이더 공정값 병합
+    cond = conditions or {}
+    process = cond.get("process", {}) if isinstance(cond, dict) else {}
+    if isinstance(process, dict):
+        for k in PROCESS_DEFAULTS:
+            if k in process and process[k] is not None:
+                props[k] = float(process[k])
+
+    temp = float(cond.get("temp", 300.0))
+    vdd  = float(cond.get("vdd", 0.9))
+    return props, temp, vdd
+
+def screen_mosfet(props: Dict[str, float], *, temp: float = 300.0, vdd: float = 0.9,
+                  weights: Dict[str, float] | None = None,
+                  thresholds: Dict[str, float] | None = None,
+                  samples: Dict[str, np.ndarray] | None = None) -> Dict[str, Any]:
+    """
+    props 예시 키:
+      Eg_eV, eps_r, Ef_eV_atom, mu_cm2_Vs, tox_nm, eps_ox, NA_cm3, L_nm, W_um
+    weights / thresholds: 종합 점수 가중치, 판정 기준 (None 이면 DEFAULT_WEIGHTS / DEFAULT_THRESHOLDS)
+    samples: 재료 물성 표본 {Eg_eV, eps_r, Ef_eV_atom: (K,)} (앙상블 멤버 예측).
+             있으면 uncertainty(점수 표준편차), score_interval, percentiles_std 를 채운다 (없으면 uncertainty 0)
+    """
+    w = normalize_weights(weights) if weights else None
+    t = normalize_thresholds(thresholds) if thresholds else None
+    m = _material_inputs(props)
+    s = _slider_params(props, temp, vdd)
+
+    # 3) 지표 계산 및 백분위(후보 재료)
+    with span("compute_metrics"):
+        metrics = M.compute_metrics(m, s)
+        perc    = M.compute_percentiles(metrics)
+    with span("baseline"):
+        bp = _baseline_percentiles(s)
+
+    result = _assemble_result(metrics, perc, bp, w, t)
+    if samples is not None:
+        with span("uncertainty"):
+            (scores, pct), = score_samples([props], [samples], temp=temp, vdd=vdd, weights=w)
+            _attach_uncertainty(result, scores, pct, t)
     return result
 
+def screen_mosfet_batch(props_list: List[Dict[str, float]], *, temp: float = 300.0,
+                        vdd: float = 0.9, include_baseline: bool = False,
+                        weights: Dict[str, float] | None = None,
+                        thresholds: Dict[str, float] | None = None,
+                        samples_list: List[Dict[str, np.ndarray] | None] | None = None) -> List[Dict[str, Any]]:
+    """
+    여러 후보를 한 번에 스크리닝.
+    - 후보 전체를 열(column) 배열로 모아 M.compute_metrics_arrays 로 한 번에 계산
+    - 베이스라인은 공정조건별 LRU 캐시에서 가져온다
+    - include_baseline=False 면 baseline_percentiles 는 비워서 돌려준다 (순위표 용도)
+    - samples_list: 후보별 물성 표본 또는 None (screen_mosfet 의 samples 와 같음, 표본 전체를 배열 연산 1회로)
+    """
+    if not props_list:
+        return []
+    w = normalize_weights(weights) if weights else None
+    t = normalize_thresholds(thresholds) if thresholds else None
+    ms = [_material_inputs(p) for p in props_list]
+    ss = [_slider_params(p, temp, vdd) for p in props_list]
+
+    with span("compute_metrics"):
+        arr = M.compute_metrics_arrays(
+            np.array([m.Eg_eV for m in ms]),
+            np.array([m.eps_r for m in ms]),
+            np.array([m.Ef_eV_atom for m in ms]),
+            **{f: np.array([getattr(s, f) for s in ss]) for f in SLIDER_FIELDS},
+        )
+        parr = M.compute_percentiles_arrays(arr)
+
+    results: List[Dict[str, Any]] = []
+    for i, s in enumerate(ss):
+        metrics = {k: float(v[i]) for k, v in arr.items()}
+        perc    = {k: float(v[i]) for k, v in parr.items()}
+        if include_baseline:
+            with span("baseline"):
+                bp = _baseline_percentiles(s)
+        else:
+            bp = {}
+        results.append(_assemble_result(metrics, perc, bp, w, t))
+
+    if samples_list is not None:
+        idx = [i for i, smp in enumerate(samples_list) if smp is not None]
+        with span("uncertainty"):
+            scored = score_samples([props_list[i] for i in idx], [samples_list[i] for i in idx],
+                                   temp=temp, vdd=vdd, weights=w)
+        for i, (scores, pct) in zip(idx, scored):
+            _attach_uncertainty(results[i], scores, pct, t)
+    return results
+
+# ---------- 공정 파라미터 스윕 ----------
+# 격자 점 수 상한 (점 하나당 지표/퍼센트 ~20개 float64 → 50만 점이면 약 80 MB)
+SWEEP_MAX_POINTS = int(os.environ.get("SWEEP_MAX_POINTS", 500_000))
+SWEEP_MAX_AXIS   = int(os.environ.get("SWEEP_MAX_AXIS", 1000))
+
+def _sweep_axis(name: str, spec) -> np.ndarray:
+    """
+    축 하나 → 1차원 값 배열
+      - 리스트: 값을 그대로 사용
+      - dict  : {"start", "stop", "num", "log": False}  (log=True 면 로그 간격, NA_cm3 등)
+    """
+    if name not in SLIDER_FIELDS:
+        raise ValueError(f"스윕할 수 없는 필드: {name}. 가능한 필드: {', '.join(SLIDER_FIELDS)}")
+    if isinstance(spec, dict):
+        try:
+            start, stop = float(spec["start"]), float(spec["stop"])
+            num = int(spec.get("num", 50))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{name}: 범위는 start, stop, num 으로 지정")
+        if not 1 <= num <= SWEEP_MAX_AXIS:
+            raise ValueError(f"{name}: num 은 1 ~ {SWEEP_MAX_AXIS}")
+        if spec.get("log"):
+            if start <= 0 or stop <= 0:
+                raise ValueError(f"{name}: 로그 간격은 양수 범위만 가능")
+            return np.geomspace(start, stop, num)
+        return np.linspace(start, stop, num)
+
+    values = np.asarray(spec, dtype=float).ravel()
+    if not 1 <= values.size <= SWEEP_MAX_AXIS:
+        raise ValueError(f"{name}: 값은 1 ~ {SWEEP_MAX_AXIS}개")
+    return values
+
+def sweep_mosfet(props: Dict[str, float], axes: Dict[str, Any], *, temp: float = 300.0,
+                 vdd: float = 0.9, weights: Dict[str, float] | None = None) -> Dict[str, Any]:
+    """
+    재료 1개에 대해 SliderParams 필드 일부를 격자로 훑는다 (전체 데카르트 곱을 배열 연산 1회로 계산).
+    - axes: {필드명: [값...] 또는 {"start", "stop", "num", "log"}} — 지정 순서가 결과 배열의 축 순서
+    - 지정하지 않은 필드는 props / temp / vdd 값으로 고정 (screen_mosfet 과 같은 규칙)
+    반환: {"fields", "axes", "shape", "metrics", "percentiles", "score"}  (값은 shape 모양의 ndarray)
+    """
+    if not axes:
+        raise ValueError("axes 가 비어 있습니다")
+    m = _material_inputs(props)
+    s = _slider_params(props, temp, vdd)
+
+    names = list(axes)
+    grids = [_sweep_axis(n, axes[n]) for n in names]
+    shape = tuple(g.size for g in grids)
+    npoints = int(np.prod(shape))
+    if npoints > SWEEP_MAX_POINTS:
+        raise ValueError(f"격자 점이 너무 많습니다: {npoints} > {SWEEP_MAX_POINTS}")
+
+    # 축마다 자기 차원만 길이를 갖도록 reshape → 브로드캐스트로 격자 전체 계산 (meshgrid 불필요)
+    params = {f: getattr(s, f) for f in SLIDER_FIELDS}
+    for d, (n, g) in enumerate(zip(names, grids)):
+        params[n] = g.reshape([-1 if i == d else 1 for i in range(len(names))])
+
+    arr  = M.compute_metrics_arrays(m.Eg_eV, m.eps_r, m.Ef_eV_atom, **params)
+    arr  = {k: np.broadcast_to(v, shape) for k, v in arr.items()}
+    parr = M.compute_percentiles_arrays(arr)
+    parr = {k: np.broadcast_to(v, shape) for k, v in parr.items()}
+
+    return {
+        "fields": names,
+        "axes": dict(zip(names, grids)),
+        "shape": list(shape),
+        "metrics": arr,
+        "percentiles": parr,
+        "score": np.broadcast_to(_score(parr, normalize_weights(weights) if weights else None), shape),
+    }
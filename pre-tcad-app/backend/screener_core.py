@@ -0,0 +1,623 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-TCAD material screener — 계산 코어 (헤드리스)
+
+m_screener.py(코랩 노트북 export)에서 물리식/백분위 계산만 떼어낸 모듈.
+- math / NumPy 만 import 한다 (pandas, matplotlib, ipywidgets, IPython 없음)
+  → 서버 워커가 부팅할 때 위젯 생성/그래프 렌더링 비용을 내지 않는다.
+- 노트북 슬라이더 UI 는 m_screener.launch_ui() 에 남아 있고, 같은 함수들을 그대로 쓴다.
+"""
+# -------------------------------- Imports --------------------------------
+from dataclasses import dataclass
+from typing import Dict, List
+import math
+import numpy as np
+
+
+# -------------------------------- Constants --------------------------------
+EPS0 = 8.854e-12  # [F/m] 진공 유전율 ε0
+Q    = 1.602e-19  # [C]   전자 기본 전하 q
+
+
+# 게이트 금속-반도체 일함수 차 φ_ms (nMOS 가정)
+#   - 음수면 Vth를 낮추는 효과(낮은 일함수 금속 채택처럼 작동)
+#   - 0.0으로 두면 순수 산화막/도핑/재료만으로 결정
+PHI_MS_V = -0.25   # [V] 0 ~ -0.4 정도에서 조정 가능
+
+# -------------------------------- Input Data classes --------------------------------
+@dataclass
+class MaterialInputs:
+   """
+    채널 재료가 가진 기본 물성.
+    - Eg_eV: 밴드갭 [eV]
+      · 전자가 가전자대→전도대로 이동하기 위한 최소 에너지차.
+      · Eg↑ → 전류 누설 감소(Ioff↓), 문턱전압(Vth) 상승, OFF 특성 개선.
+
+    - eps_r: 반도체 상대 유전율
+      · 내부 전기장에 대한 분극 정도 (εs = εr * ε0).
+      · SS, Vth 계산 시 공핍층 커패시턴스(Cd)에 직접 영향.
+      · εr↑ → 전하 제어 약화, SS 악화 가능.
+
+    - Ef_eV_atom:  형성에너지 [eV/atom], 더 작을수록 안정하다고 본다.
+      · 재료가 원소 상태에서 형성될 때의 안정성 지표 (음수일수록 안정).
+      · 전기적 계산에는 직접 쓰이지 않지만, 안정성 점수(stability_score) 계산에 사용.
+    """
+   Eg_eV: float
+   eps_r: float
+   Ef_eV_atom: float
+
+
+@dataclass
+class SliderParams:
+    """
+    공정/설계 변수(슬라이더):
+      - tox_nm: 산화막 두께 [nm]          → 얇을수록 Cox↑ → SS 개선, Vth↓, Ion/gm/fT↑
+      - eps_ox: 산화막 상대유전율         → 클수록 Cox↑ → 동일 효과
+      - NA_cm3: 채널/바디 도핑(p형 도핑 농도) [cm^-3]    → 클수록 φF↑ → Vth↑, SS 악화 가능
+      - L_nm:   채널 길이 [nm]            → 짧을수록 W/L↑로 Ion/gm↑, fT↑. DIBL 악화
+      - VDD_V:  동작 전압 [V]             → 클수록 Vov↑ → Ion/gm/fT↑
+      - T_K:    절대온도 [K]                  → 높을수록 ni↑ → φF↓ → Vth↓ (누설↑ 가능)
+      - W_um:   채널 폭 [μm]              → per-μm 출력을 위해 내부 계산용
+      - mu_cm2_Vs: 이동도 [cm^2/Vs]       → 클수록 Ion/gm↑
+    """
+    tox_nm: float = 8.0
+    eps_ox: float = 20.0
+    NA_cm3: float = 1e15
+    L_nm: float   = 40.0
+    VDD_V: float  = 0.9
+    T_K: float    = 330.0
+    W_um: float   = 1.0
+    mu_cm2_Vs: float = 300.0
+
+# -------------------------------- Unit helpers --------------------------------
+def cm2_to_m2(x): return float(x) * 1e-4        # [cm^2] → [m^2]
+
+def cm3_to_m3(x): return float(x) * 1e6         # [cm^-3] → [m^-3]
+
+def nm_to_m(x):   return float(x) * 1e-9        # [nm] → [m]
+
+def um_to_m(x):   return float(x) * 1e-6        # [μm] → [m]
+
+# -------------------------------- Semiconductor formulas --------------------------------
+def kT_over_q(T_K: float):
+    """열전압 V_T = kT/q [V] : 실온(300K)에서 약 0.02585 V"""
+    return 8.617333262145e-5 * float(T_K)
+
+def Cox_Fperm2(eps_ox, tox_nm):
+    """산화막 커패시턴스 밀도 C_ox [F/m^2] = ε_ox ε0 / t_ox"""
+    return (float(eps_ox) * EPS0) / nm_to_m(tox_nm)
+
+def eps_sem_Fperm(eps_r):
+    """반도체 유전율 ε_s [F/m] = ε_r ε0"""
+    return float(eps_r) * EPS0
+
+def ni_from_Eg(Eg_eV: float, T_K: float):
+    """
+    진성 캐리어 농도 ni를 Eg에서 대략적으로 추정.
+    - 기준: Si 300K에서 ni ≈ 1e10 cm^-3
+    - Eg가 커지면 ni는 지수로 감소
+    - 정확한 값은 재료 DB를 써야 하지만, 여기서는 입력을 단순화하기 위해 이렇게 둔다.
+    """
+    Vt = kT_over_q(T_K)
+    # Eg가 1.12eV보다 크면 exp(음수) → ni 작아짐
+    ni = 1e10 * math.exp((1.12 - float(Eg_eV)) / (2.0 * Vt))
+    # 너무 비현실적으로 작아지는 것 방지
+    return max(ni, 1.0)
+
+def phi_F(Eg_eV: float, NA_cm3: float, T_K: float):
+    """
+    페르미 전위 φF = V_T * ln(NA / ni)
+    - NA는 도핑, ni는 위에서 Eg 기반으로 계산.
+    - φF가 너무 0에 가까우면 뒤 계산에서 폭주하므로 0.02 V 하한을 둔다.
+    - ni는 Si(300K)≈1e10 cm^-3을 기준으로 Eg 차이에 대해 지수 보정(단순 근사)
+    - Eg↑ → ni↓ → φF↑ (보수적 경향)
+    """
+    Vt = kT_over_q(T_K)
+    # Eg 차이에 따른 ni 보정 (Nc,Nv 동일 가정의 간단 근사)
+    ni_cm3 = 1e10 * math.exp((1.12 - float(Eg_eV)) / (2.0 * Vt))
+    # 가드
+    ni_cm3 = max(ni_cm3, 1.0)
+    NA_cm3 = max(float(NA_cm3), 1.0)
+    phi = Vt * math.log(NA_cm3 / ni_cm3)
+    return max(phi, 0.02)  # 지나치게 작은 φF 방지용 하한
+
+def Cd_Fperm2(eps_r: float, NA_cm3: float, Eg_eV: float, T_K: float):
+    """
+    공핍 커패시턴스 밀도 C_d [F/m^2] ~ sqrt( q ε_s NA / (2 φF) )
+    - 도핑↑, ε_s↑, φF↓ → C_d↑ → SS 악화
+    """
+    epss = eps_sem_Fperm(eps_r)
+    phi  = phi_F(Eg_eV, NA_cm3, T_K)
+    return math.sqrt((Q * epss * cm3_to_m3(NA_cm3)) / (2.0 * phi))
+
+# -------------------------------- Core metrics --------------------------------
+def SS_mVdec(m: MaterialInputs, s: SliderParams):
+    """
+    서브스레숄드 스윙
+    SS [mV/dec] = ln(10) V_T (1 + C_d/C_ox)
+    - C_d/C_ox가 작을수록 SS가 이상적(60~70 mV/dec @ 300K 근처)
+    """
+    Vt  = kT_over_q(s.T_K)
+    cd  = Cd_Fperm2(m.eps_r, s.NA_cm3, m.Eg_eV, s.T_K)
+    cox = Cox_Fperm2(s.eps_ox, s.tox_nm)
+    return math.log(10.0) * Vt * (1.0 + cd/cox) * 1e3
+
+def Vth_V(m: MaterialInputs, s: SliderParams):
+    """
+    MOSFET 기본 문턱전압식
+    Vth = φ_ms + 2φF + ( √(2 ε_s q N_A · 2φF) ) / C_ox
+    - φ_ms = PHI_MS_V: 금속-반도체 일함수 차이 (상단 상수로 조정)
+    - 2φF: 반전을 만들기 위한 전위
+    - 마지막 항: 공핍전하를 산화막 커패시턴스로 나눈 항
+    - 도핑↑, ε_s↑ → 루트항↑ → Vth↑
+    - C_ox↑(= tox↓, ε_ox↑) → 루트항/Cox↓ → Vth↓
+    """
+    epss = eps_sem_Fperm(m.eps_r)
+    phi  = phi_F(m.Eg_eV, s.NA_cm3, s.T_K)
+    cox  = Cox_Fperm2(s.eps_ox, s.tox_nm)
+    return PHI_MS_V + 2.0*phi + math.sqrt(2.0 * epss * Q * cm3_to_m3(s.NA_cm3) * (2.0*phi)) / cox
+
+def Ioff_proxy(m: MaterialInputs, s: SliderParams):
+    """
+    OFF 전류를 단순 대용치 (절대값X, 경향성만)
+    - 실제: Ioff = I0 * exp(-(Vth)/(n Vt))
+    - ~exp(-Eg / V_T) : Eg가 클수록 누설↓ (지수로 감소)
+    """
+    Vt = kT_over_q(s.T_K)
+    val = math.exp(-m.Eg_eV / max(Vt, 1e-6))
+    return max(val, 1e-300)  # 언더플로우 방지
+
+def mu_SI(mu_cm2_Vs: float):
+    """이동도 단위 변환 [cm^2/Vs] → [m^2/Vs]"""
+    return cm2_to_m2(mu_cm2_Vs)
+
+def Id_on_A_per_um(m: MaterialInputs, s: SliderParams):
+    """
+    포화 영역 근사식
+    Id ≈ (1/2) * μ * C_ox * (W/L) * V_ov^2 (단, V_ov = VDD - Vth)
+    - per μm 단위로 보기 위 마지막에 W_um으로 나눠 [A/μm] 출력
+    """
+    Vov = s.VDD_V - Vth_V(m, s)
+    if Vov <= 0.0:
+        return 0.0
+    mu  = mu_SI(s.mu_cm2_Vs)
+    cox = Cox_Fperm2(s.eps_ox, s.tox_nm)
+    W = um_to_m(s.W_um); L = nm_to_m(s.L_nm)
+    return (0.5 * mu * cox * (W/L) * (Vov**2)) / s.W_um
+
+def gm_S_per_um(m: MaterialInputs, s: SliderParams):
+    """
+    트랜스컨덕턴스 근사
+    gm ≈ μ C_ox (W/L) V_ov  (포화 근사)
+    - per μm 기준 [S/μm]
+    """
+    Vov = s.VDD_V - Vth_V(m, s)
+    if Vov <= 0.0:
+        return 0.0
+    mu  = mu_SI(s.mu_cm2_Vs)
+    cox = Cox_Fperm2(s.eps_ox, s.tox_nm)
+    W = um_to_m(s.W_um); L = nm_to_m(s.L_nm)
+    return (mu * cox * (W/L) * Vov) / s.W_um
+
+def ft_Hz(m: MaterialInputs, s: SliderParams):
+    """
+    전이 주파수 근사
+    - fT ≈ gm / (2π Cgg)
+    - 단, 여기서는 Cgg = C_ox * W * L으로 단순화
+    """
+    gm_tot = gm_S_per_um(m, s) * s.W_um   # per-μm → 전체 gm
+    cox    = Cox_Fperm2(s.eps_ox, s.tox_nm)
+    Cgg    = cox * um_to_m(s.W_um) * nm_to_m(s.L_nm)
+    if gm_tot <= 0.0 or Cgg <= 0.0:
+        return 0.0
+    return gm_tot / (2.0 * math.pi * Cgg)
+
+def r0_ohm_per_um(m: MaterialInputs, s: SliderParams):
+    """
+    출력저항 근사
+    - r0 ≈ 1 / (λ Id) (채널 길이 변조 λ ~ 1/L 가정)
+    - OFF 상태에서 Id≈0일 때 r0가 무한대로 가는 걸 막기 위해,
+      Vov<=0이면 r0=0.0 처리 (순위 왜곡 방지)
+    """
+    Vov = s.VDD_V - Vth_V(m, s)
+    if Vov <= 0.0:
+        return 0.0
+    # 기준 길이 50 nm에서 λ≈0.02 라고 가정한 간단 모델
+    L0_nm, lambda0 = 50.0, 0.02
+    lam = lambda0 * (L0_nm / max(s.L_nm, 1e-9))
+    Id  = max(Id_on_A_per_um(m, s), 1e-15)
+    return 1.0 / (lam * Id)
+
+def dibl_proxy_mV_per_V(m: MaterialInputs, s: SliderParams):
+    """
+    DIBL을 아주 단순하게 본 버전.
+    (실제 DIBL은 2D 전기장 문제라 정확식이 없고,
+    여기서는 tox/L 비율이 커질수록, 채널 유전율이 작을수록 DIBL이 커진다고 본다.)
+    - DIBL 대용치 ~ 100 * (tox/L) * (1/εr)
+    - L이 짧고, 산화막 두껍고, 반도체 εr 낮을수록 악화
+    - 절대치X, '경향성' 지표
+    """
+    return 100.0 * (s.tox_nm / max(s.L_nm, 1e-9)) * (1.0 / max(m.eps_r, 1e-6))
+
+def stability_score(m: MaterialInputs):
+    """
+    형성에너지 기반 안정성 점수. sigmoid(Ef)
+    - Ef가 더 낮을수록(안정할수록) 점수↑ (0~1 스케일)
+    - -1.5 eV/atom 정도면 거의 1에 가깝게,
+    0 eV/atom에 가까우면 0에 가깝게 떨어지도록 시그모이드 사.
+    """
+    return 1.0 / (1.0 + math.exp(m.Ef_eV_atom + 0.5))
+
+METRIC_KEYS = [
+    "SS_mVdec", "Vth_V", "Ion_A_per_um", "Ioff_proxy", "gm_S_per_um", "ft_Hz",
+    "r0_ohm_per_um", "DIBL_mV_per_V", "Stab_score",
+]
+
+# -------------------------------- Vectorized engine (NumPy) --------------------------------
+def _exp(x):
+    # 0-d(스칼라)는 math 를 써서 예전 스칼라 구현과 비트 단위로 같게,
+    # 배열은 np.exp (SIMD 구현이라 libm 과 최대 1 ulp 차이)
+    return np.asarray(math.exp(x)) if x.ndim == 0 else np.exp(x)
+
+def _log(x):
+    return np.asarray(math.log(x)) if x.ndim == 0 else np.log(x)
+
+def compute_metrics_arrays(
+    Eg_eV, eps_r, Ef_eV_atom,
+    tox_nm=SliderParams.tox_nm, eps_ox=SliderParams.eps_ox, NA_cm3=SliderParams.NA_cm3,
+    L_nm=SliderParams.L_nm, VDD_V=SliderParams.VDD_V, T_K=SliderParams.T_K,
+    W_um=SliderParams.W_um, mu_cm2_Vs=SliderParams.mu_cm2_Vs,
+) -> Dict[str, np.ndarray]:
+    """
+    위 스칼라 함수들(SS_mVdec ~ stability_score)의 배열 버전.
+    - MaterialInputs / SliderParams 각 필드를 NumPy 배열(또는 스칼라)로 받아 브로드캐스트
+    - φF, Cox, Vth, Vov 같은 공통 중간값은 한 번만 계산
+    - Vov≤0(OFF)이면 Ion/gm/fT/r0 = 0 (스칼라 버전과 동일)
+    - 연산 순서를 스칼라 식과 똑같이 맞췄다 (스칼라 입력이면 compute_metrics 와 비트 단위로 동일)
+    """
+    f = lambda x: np.asarray(x, dtype=float)
+    Eg, er, Ef = f(Eg_eV), f(eps_r), f(Ef_eV_atom)
+    tox, eox, NA, L, VDD, T, W_um_, mu_ = (
+        f(tox_nm), f(eps_ox), f(NA_cm3), f(L_nm), f(VDD_V), f(T_K), f(W_um), f(mu_cm2_Vs)
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # 공통 중간값
+        Vt   = 8.617333262145e-5 * T                         # kT_over_q
+        cox  = (eox * EPS0) / (tox * 1e-9)                   # Cox_Fperm2
+        epss = er * EPS0                                     # eps_sem_Fperm
+        ni   = np.maximum(1e10 * _exp((1.12 - Eg) / (2.0 * Vt)), 1.0)
+        phi  = np.maximum(Vt * _log(np.maximum(NA, 1.0) / ni), 0.02)   # phi_F
+        NA_m3 = NA * 1e6
+
+        cd  = np.sqrt((Q * epss * NA_m3) / (2.0 * phi))      # Cd_Fperm2
+        ss  = math.log(10.0) * Vt * (1.0 + cd / cox) * 1e3
+        vth = PHI_MS_V + 2.0 * phi + np.sqrt(2.0 * epss * Q * NA_m3 * (2.0 * phi)) / cox
+        ioff = np.maximum(_exp(-Eg / np.maximum(Vt, 1e-6)), 1e-300)
+
+        # ON 영역 (Vov>0) 에서만 의미 있는 지표
+        Vov = VDD - vth
+        on  = Vov > 0.0
+        mu  = mu_ * 1e-4
+        W   = W_um_ * 1e-6
+        Lm  = L * 1e-9
+        ion = np.where(on, (0.5 * mu * cox * (W / Lm) * (Vov ** 2)) / W_um_, 0.0)
+        gm  = np.where(on, (mu * cox * (W / Lm) * Vov) / W_um_, 0.0)
+
+        gm_tot = gm * W_um_
+        Cgg = cox * W * Lm
+        ft  = np.where((gm_tot > 0.0) & (Cgg > 0.0), gm_tot / (2.0 * math.pi * Cgg), 0.0)
+
+        lam = 0.02 * (50.0 / np.maximum(L, 1e-9))
+        r0  = np.where(on, 1.0 / (lam * np.maximum(ion, 1e-15)), 0.0)
+
+        dibl = 100.0 * (tox / np.maximum(L, 1e-9)) * (1.0 / np.maximum(er, 1e-6))
+        stab = 1.0 / (1.0 + _exp(Ef + 0.5))
+
+    shape = np.broadcast_shapes(*(a.shape for a in (Eg, er, Ef, tox, eox, NA, L, VDD, T, W_um_, mu_)))
+    out = {
+        "SS_mVdec": ss, "Vth_V": vth, "Ion_A_per_um": ion, "Ioff_proxy": ioff,
+        "gm_S_per_um": gm, "ft_Hz": ft, "r0_ohm_per_um": r0,
+        "DIBL_mV_per_V": dibl, "Stab_score": stab,
+    }
+    return {k: np.broadcast_to(v, shape) for k, v in out.items()}
+
+
+def _metrics_scalar(Eg, er, Ef, tox, eox, NA, L, VDD, T, W_um_, mu_) -> Dict[str, float]:
+    """
+    compute_metrics_arrays 와 같은 식/연산 순서를 float + math 로 (재료 1개용 빠른 경로).
+    배열 엔진을 0-d 로 돌리는 것보다 몇 배 빠르고 결과는 비트 단위로 같다.
+    0 으로 나누기/overflow 같은 예외 경우는 호출 쪽에서 배열 엔진으로 넘긴다.
+    """
+    Vt   = 8.617333262145e-5 * T
+    cox  = (eox * EPS0) / (tox * 1e-9)
+    epss = er * EPS0
+    ni   = max(1e10 * math.exp((1.12 - Eg) / (2.0 * Vt)), 1.0)
+    phi  = max(Vt * math.log(max(NA, 1.0) / ni), 0.02)
+    NA_m3 = NA * 1e6
+
+    cd  = math.sqrt((Q * epss * NA_m3) / (2.0 * phi))
+    ss  = math.log(10.0) * Vt * (1.0 + cd / cox) * 1e3
+    vth = PHI_MS_V + 2.0 * phi + math.sqrt(2.0 * epss * Q * NA_m3 * (2.0 * phi)) / cox
+    ioff = max(math.exp(-Eg / max(Vt, 1e-6)), 1e-300)
+
+    Vov = VDD - vth
+    on  = Vov > 0.0
+    mu  = mu_ * 1e-4
+    W   = W_um_ * 1e-6
+    Lm  = L * 1e-9
+    ion = (0.5 * mu * cox * (W / Lm) * (Vov ** 2)) / W_um_ if on else 0.0
+    gm  = (mu * cox * (W / Lm) * Vov) / W_um_ if on else 0.0
+
+    gm_tot = gm * W_um_
+    Cgg = cox * W * Lm
+    ft  = gm_tot / (2.0 * math.pi * Cgg) if (gm_tot > 0.0 and Cgg > 0.0) else 0.0
+
+    lam = 0.02 * (50.0 / max(L, 1e-9))
+    r0  = 1.0 / (lam * max(ion, 1e-15)) if on else 0.0
+
+    dibl = 100.0 * (tox / max(L, 1e-9)) * (1.0 / max(er, 1e-6))
+    stab = 1.0 / (1.0 + math.exp(Ef + 0.5))
+    return {
+        "SS_mVdec": ss, "Vth_V": vth, "Ion_A_per_um": ion, "Ioff_proxy": ioff,
+        "gm_S_per_um": gm, "ft_Hz": ft, "r0_ohm_per_um": r0,
+        "DIBL_mV_per_V": dibl, "Stab_score": stab,
+    }
+
+
+def compute_metrics(m: MaterialInputs, s: SliderParams):
+    args = (m.Eg_eV, m.eps_r, m.Ef_eV_atom,
+            s.tox_nm, s.eps_ox, s.NA_cm3, s.L_nm, s.VDD_V, s.T_K, s.W_um, s.mu_cm2_Vs)
+    try:
+        return _metrics_scalar(*(float(x) for x in args))
+    except (ZeroDivisionError, OverflowError, ValueError):
+        # 0 나누기, 음수 sqrt/log 등: 배열 엔진의 inf/nan 규칙을 그대로 따른다
+        arr = compute_metrics_arrays(*args)
+        return {k: float(arr[k]) for k in METRIC_KEYS}
+
+# -------------------------------- Baseline materials --------------------------------
+BASELINE = [
+    ("Si",    1.12, 11.7, -1.0),
+    ("Ge",    0.66, 16.0, -0.8),
+    ("GaAs",  1.42, 12.9, -1.2),
+    ("InP",   1.34, 12.4, -1.1),
+    ("InGaAs",0.75, 13.9, -1.0),
+    ("SiC",   3.26,  9.7, -1.5),
+    ("GaN",   3.40,  9.5, -1.3),
+    ("Ga2O3", 4.80, 10.0, -1.6),
+    ("ZnO",   3.30,  9.0, -1.2),
+    ("IGZO",  3.00, 10.0, -1.0),
+    ("MoS2",  1.80,  8.0, -1.1),
+    ("WS2",   1.90,  7.2, -1.1),
+]
+
+def build_distributions(s: SliderParams) -> Dict[str, List[float]]:
+    """
+    동일 공정조건 s에서 베이스라인 재료 각각의 메트릭을 계산해 지표별 리스트를 만든다.
+    (그래프에 점으로 표시할 때 사용)
+    """
+    keys = ["SS_mVdec","Vth_V","Ion_A_per_um","Ioff_proxy","gm_S_per_um","ft_Hz",
+            "r0_ohm_per_um","DIBL_mV_per_V","Stab_score"]
+
+    """
+    같은 공정 슬라이더(s)를 모든 기준 재료에 적용해서
+    각 지표가 어떤 분포를 가지는지 만듦.
+    이 분포와 현재 재료를 비교해서 백분위를 구할 수 있음.
+    """
+    dist = {k: [] for k in keys}
+    for name, Eg, epsr, Ef in BASELINE:
+        m = MaterialInputs(Eg, epsr, Ef)
+        met = compute_metrics(m, s)
+        for k in keys:
+            dist[k].append(met[k])
+    return dist
+
+# -------------------------------- Percentiles (physical ranges) --------------------------------
+# 지표별로 넓힌 물리 범위
+PHYS_RANGES = {
+    "SS_mVdec":        (40.0, 200.0),   # mV/dec
+    "Vth_V":           (0.0,  1.5),     # V
+    "Ion_A_per_um":    (1e-9,  1e-1),   # A/μm  (상한↑)
+    "Ioff_proxy":      (1e-30, 1e-3),   # proxy (상한 완화)
+    "gm_S_per_um":     (1e-7,  1e-1),   # S/μm  (범위↑)
+    "ft_Hz":           (1e8,   1e14),   # Hz    (범위↑)
+    "r0_ohm_per_um":   (1e2,   1e9),    # Ω·μm  (상한↑)
+    "DIBL_mV_per_V":   (0.0,   200.0),  # mV/V
+    "Stab_score":      (0.0,   1.0),    # 0~1
+}
+# 로그 스케일로 다루는 지표들
+LOG_KEYS = {"Ion_A_per_um","Ioff_proxy","gm_S_per_um","ft_Hz","r0_ohm_per_um"}
+
+def percentile_physical(value: float, key: str, smaller_is_better: bool = False):
+    """
+    dataset을 통해 value가 몇 % 위치에 있는지 계산.
+    - 각 지표(key)에 대해 물리적으로 가능한 최소/최대 범위를 지정하고,
+    - 그 범위 안에서 0~100%로 선형 매핑한다.(dataset 대신 물리적 기준으로 비교)
+    - 성능이 클수록 좋은 지표면 그대로
+    - 작을수록 좋은 지표면 (100 - rank)
+    - 범위에 20% 버퍼를 추가한 뒤 0.5~99.5%로 소프트 클리핑.
+    """
+    # 1) 넓힌 물리 범위
+    vmin, vmax = PHYS_RANGES.get(key, (0.0, 1.0))
+    val = float(value)
+
+    # 2) 로그 스케일로 다루는 지표들
+    if key in LOG_KEYS:
+        val  = math.log10(max(val, 1e-300))
+        vmin = math.log10(vmin)
+        vmax = math.log10(vmax)
+
+    # 3) 20% 버퍼로 범위 확장 (소프트 클리핑 효과)
+    span = vmax - vmin
+    vmin_b = vmin - 0.2 * span
+    vmax_b = vmax + 0.2 * span
+
+    # 4) 퍼센트 변환
+    pct = (val - vmin_b) / (vmax_b - vmin_b) * 100.0
+
+    # 5) 끝단에서 0/100 딱 붙지 않도록 소프트 클램프
+    pct = max(0.5, min(99.5, pct))
+
+    # 6) 작은 게 좋은 지표는 뒤집기
+    return 100.0 - pct if smaller_is_better else pct
+
+
+def compute_percentiles(metrics: Dict[str, float]):
+    """
+    물리 범위 + 소프트 클리핑 기반 퍼센트.
+    Vth는 기본 목표 0.45 V, spread=0.2에서 가우시안형 점수(끝단 0% 방지).
+    """
+    p: Dict[str, float] = {}
+
+    # 작은 게 좋은 지표
+    p["SS_percent"]   = percentile_physical(metrics["SS_mVdec"],      "SS_mVdec",      True)
+    p["DIBL_percent"] = percentile_physical(metrics["DIBL_mV_per_V"], "DIBL_mV_per_V", True)
+
+    # Vth: 선형 대신 완만한 가우시안형 (끝단 0% 방지)
+    target_vth, sigma = 0.45, 0.20   # sigma≈spread
+    err = (metrics["Vth_V"] - target_vth) / max(sigma, 1e-9)
+    vth_score = 100.0 * math.exp(-(err**2))
+    # 소프트 클램프
+    p["Vth_score_percent"] = max(0.5, min(99.5, vth_score))
+
+    # 큰 게 좋은 지표
+    p["Ion_percent"]  = percentile_physical(metrics["Ion_A_per_um"],  "Ion_A_per_um",  False)
+    p["Ioff_percent"] = percentile_physical(metrics["Ioff_proxy"],    "Ioff_proxy",    True)   # 작을수록 좋음
+    p["gm_percent"]   = percentile_physical(metrics["gm_S_per_um"],   "gm_S_per_um",   False)
+    p["fT_percent"]   = percentile_physical(metrics["ft_Hz"],         "ft_Hz",         False)
+    p["r0_percent"]   = percentile_physical(metrics["r0_ohm_per_um"], "r0_ohm_per_um", False)
+    p["Stab_percent"] = percentile_physical(metrics["Stab_score"],    "Stab_score",    False)
+
+    return p
+
+
+# 퍼센트 키 → (원본 지표 키, 작을수록 좋은지). Vth 는 별도(가우시안형) 처리
+PERCENTILE_SPEC = {
+    "SS_percent":   ("SS_mVdec",      True),
+    "DIBL_percent": ("DIBL_mV_per_V", True),
+    "Ion_percent":  ("Ion_A_per_um",  False),
+    "Ioff_percent": ("Ioff_proxy",    True),
+    "gm_percent":   ("gm_S_per_um",   False),
+    "fT_percent":   ("ft_Hz",         False),
+    "r0_percent":   ("r0_ohm_per_um", False),
+    "Stab_percent": ("Stab_score",    False),
+}
+
+def percentile_physical_array(values, key: str, smaller_is_better: bool = False) -> np.ndarray:
+    """percentile_physical 의 배열 버전 (NaN 처리까지 스칼라의 max/min 과 같게 fmax/fmin 사용)"""
+    vmin, vmax = PHYS_RANGES.get(key, (0.0, 1.0))
+    val = np.asarray(values, dtype=float)
+    if key in LOG_KEYS:
+        val  = np.log10(np.maximum(val, 1e-300))
+        vmin = math.log10(vmin)
+        vmax = math.log10(vmax)
+
+    span = vmax - vmin
+    vmin_b = vmin - 0.2 * span
+    vmax_b = vmax + 0.2 * span
+    pct = (val - vmin_b) / (vmax_b - vmin_b) * 100.0
+    pct = np.fmax(0.5, np.fmin(99.5, pct))
+    return 100.0 - pct if smaller_is_better else pct
+
+def compute_percentiles_arrays(metrics: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """compute_percentiles 의 배열 버전: compute_metrics_arrays 결과 → 퍼센트 배열 9종"""
+    p: Dict[str, np.ndarray] = {}
+    for pkey, (mkey, smaller) in PERCENTILE_SPEC.items():
+        p[pkey] = percentile_physical_array(metrics[mkey], mkey, smaller)
+
+    target_vth, sigma = 0.45, 0.20
+    err = (np.asarray(metrics["Vth_V"], dtype=float) - target_vth) / max(sigma, 1e-9)
+    p["Vth_score_percent"] = np.fmax(0.5, np.fmin(99.5, 100.0 * np.exp(-(err**2))))
+
+    order = ["SS_percent", "DIBL_percent", "Vth_score_percent", "Ion_percent", "Ioff_percent",
+             "gm_percent", "fT_percent", "r0_percent", "Stab_percent"]
+    return {k: p[k] for k in order}
+
+# -------------------------------- Percentiles (baseline distribution) --------------------------------
+# --- ① 분포 기반 퍼센트(패딩 포함) : 교체본 ---
+def compute_percentiles_from_dist(metrics, dist, pad):
+    """
+    모든 퍼센트 지표를 '분포 + pad'로 계산.
+    - pad: 분포 끝을 양쪽으로 확장(0.0~1.5 권장), 끝단 0/100은 0.5~99.5로 소프트 클램프
+    - Vth: 베이스라인 분포(패딩 적용) 대비 타깃(0.45V) 근접도 점수
+    """
+    def _percent_from_dist(val, dataset, smaller_is_better=False, pad=0.50):
+        ds = [float(x) for x in dataset if math.isfinite(x)]
+        if not ds:
+            return float('nan')
+        vmin0, vmax0 = min(ds), max(ds)
+        if vmax0 == vmin0:
+            return 50.0
+        span = vmax0 - vmin0
+        vmin = vmin0 - pad * span
+        vmax = vmax0 + pad * span
+        p = 100.0 * (float(val) - vmin) / (vmax - vmin)
+        if smaller_is_better:
+            p = 100.0 - p
+        return max(0.5, min(99.5, p))  # 0/100 고정 방지
+
+    def _vth_score_from_dist(vth, dataset, pad, target=0.45):
+        """베이스라인 분포(패딩 포함) 대비 타깃 근접도 점수(0.5~99.5%)."""
+        ds = [float(x) for x in dataset if math.isfinite(x)]
+        if not ds:
+            return float('nan')
+        vmin0, vmax0 = min(ds), max(ds)
+        if vmax0 == vmin0:
+            return 50.0
+        span0 = vmax0 - vmin0
+        vmin = vmin0 - pad * span0
+        vmax = vmax0 + pad * span0
+        tgt = min(max(target, vmin), vmax)     # 타깃을 분포 범위로 클램프
+        half = max(1e-12, 0.5 * (vmax - vmin))
+        d = abs(float(vth) - tgt) / half       # 0(완전일치) → 1(끝단)
+        score = (1.0 - d) * 100.0
+        return max(0.5, min(99.5, score))
+
+    p = {}
+    # 작은 게 좋은 것들
+    p["SS_percent"]   = _percent_from_dist(metrics["SS_mVdec"],       dist["SS_mVdec"],       True,  pad)
+    p["DIBL_percent"] = _percent_from_dist(metrics["DIBL_mV_per_V"],  dist["DIBL_mV_per_V"],  True,  pad)
+
+    # Vth: 분포-기반 근접도
+    p["Vth_score_percent"] = _vth_score_from_dist(metrics["Vth_V"], dist["Vth_V"], pad, target=0.45)
+
+    # 큰 게 좋은 것들
+    p["Ion_percent"]  = _percent_from_dist(metrics["Ion_A_per_um"],   dist["Ion_A_per_um"],   False, pad)
+    p["gm_percent"]   = _percent_from_dist(metrics["gm_S_per_um"],    dist["gm_S_per_um"],    False, pad)
+    p["fT_percent"]   = _percent_from_dist(metrics["ft_Hz"],          dist["ft_Hz"],          False, pad)
+    p["r0_percent"]   = _percent_from_dist(metrics["r0_ohm_per_um"],  dist["r0_ohm_per_um"],  False, pad)
+    p["Stab_percent"] = _percent_from_dist(metrics["Stab_score"],     dist["Stab_score"],     False, pad)
+
+    # Ioff: 작을수록 좋음 → 역수 분포로 비교
+    inv_val  = 1.0 / max(metrics["Ioff_proxy"], 1e-300)
+    inv_dist = [1.0 / max(x, 1e-300) for x in dist["Ioff_proxy"]]
+    p["Ioff_percent"] = _percent_from_dist(inv_val, inv_dist, False, pad)
+
+    return p
+
+# --- ② 베이스라인 점/범례 퍼센트 계산 헬퍼 : 함수 아래에 추가 ---
+_SMALL_BETTER = {"SS_mVdec", "DIBL_mV_per_V"}
+
+def _baseline_pct_for_key(raw_key, value, dist, pad):
+    """분포+pad 규칙으로 baseline 값을 0.5~99.5%로 변환 (범례/산점용)."""
+    def _percent_from_dist(val, dataset, smaller_is_better=False, pad=0.50):
+        ds = [float(x) for x in dataset if math.isfinite(x)]
+        if not ds:
+            return float('nan')
+        vmin0, vmax0 = min(ds), max(ds)
+        if vmax0 == vmin0:
+            return 50.0
+        span = vmax0 - vmin0
+        vmin = vmin0 - pad * span
+        vmax = vmax0 + pad * span
+        p = 100.0 * (float(val) - vmin) / (vmax - vmin)
+        if smaller_is_better:
+            p = 100.0 - p
+        return max(0.5, min(99.5, p))
+
+    if raw_key == "Ioff_proxy":
+        inv_val  = 1.0 / max(value, 1e-300)
+        inv_dist = [1.0 / max(x, 1e-300) for x in dist["Ioff_proxy"]]
+        return _percent_from_dist(inv_val, inv_dist, False, pad)
+
+    return _percent_from_dist(value, dist[raw_key], (raw_key in _SMALL_BETTER), pad)
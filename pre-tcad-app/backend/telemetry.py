@@ -0,0 +1,212 @@
+"""
+처리 단계별 소요 시간 측정 + Prometheus 텍스트 포맷 (/metrics)
+
+- span("stage") : with 블록 시간을 pretcad_stage_seconds{stage=...} 히스토그램에 기록
+    · 요청 안에서 열린 span 은 요청별 목록에도 쌓여서, 요청이 끝날 때 한 줄 JSON 로그로 남는다
+      (logger "pretcad.request", DEBUG)
+- Counter / Histogram : 외부 라이브러리 없이 쓰는 최소 구현 (스레드 안전)
+- register_collector(fn) : 캐시 적중 수, 큐 깊이처럼 다른 모듈이 이미 세고 있는 값은
+  /metrics 를 읽을 때 fn() 으로 가져온다
+- 값은 프로세스별. gunicorn 워커가 여럿이면 워커마다 따로 센다.
+
+환경변수:
+  LOG_LEVEL  "pretcad" 로거 레벨 (기본 INFO, 단계별 요청 로그는 DEBUG)
+"""
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger("pretcad")
+
+# 지연시간 버킷 [s]: 0.5 ms ~ 30 s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def configure_logging() -> None:
+    """pretcad 로거 레벨 설정 + (다른 설정이 없으면) stderr 핸들러"""
+    log.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    if not log.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        log.addHandler(handler)
+
+
+# ---------- 지표 ----------
+_METRICS: List["_Metric"] = []
+_COLLECTORS: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _METRICS.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 -> [버킷별 개수(누적 아님) + 초과분, 합계, 개수]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            v = self._values.get(key)
+            if v is None:
+                v = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            v[0][i] += 1
+            v[1] += value
+            v[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        for key, (counts, total, n) in items:
+            acc = 0
+            for le, c in zip(self.buckets, counts):
+                acc += c
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + (_num(le),))} {acc}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + ('+Inf',))} {n}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+def register_collector(fn) -> None:
+    """
+    fn() → [(이름, 종류 counter|gauge, 설명, [({라벨}, 값), ...]), ...]
+    /metrics 를 읽을 때마다 호출된다 (예외가 나면 그 collector 만 건너뜀).
+    """
+    _COLLECTORS.append(fn)
+
+
+def render() -> str:
+    """Prometheus text exposition format (0.0.4)"""
+    out = []
+    for m in _METRICS:
+        out.append(f"# HELP {m.name} {m.help}")
+        out.append(f"# TYPE {m.name} {m.kind}")
+        out.extend(m.render())
+    for fn in _COLLECTORS:
+        try:
+            families = list(fn())
+        except Exception as e:
+            log.warning("metrics collector failed: %s", e)
+            continue
+        for name, kind, help, samples in families:
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                names = tuple(labels)
+                out.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_num(value)}")
+    return "\n".join(out) + "\n"
+
+
+def _labels(names: Tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, esc)) + "}"
+
+
+def _num(v: float) -> str:
+    v = float(v)
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(int(v)) if v.is_integer() and abs(v) < 1e15 else repr(v)
+
+
+STAGE_SECONDS = Histogram(
+    "pretcad_stage_seconds", "처리 단계별 소요 시간 [s]", ("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "pretcad_request_seconds", "HTTP 요청 처리 시간 [s] (스트리밍은 헤더까지)", ("route", "method", "status")
+)
+CACHE_LOOKUPS = Counter(
+    "pretcad_cache_lookups_total", "메모리 캐시 조회 수", ("cache", "result")
+)
+PREFILTER_DECISIONS = Counter(
+    "pretcad_prefilter_total", "조성 사전 필터 판정 수 (rejected = ALIGNN 추론 생략)", ("result",)
+)
+ENSEMBLE_EXITS = Counter(
+    "pretcad_ensemble_structures_total", "앙상블 불확실성 추정을 끝낸 구조 수 (early = 판정이 확실해서 조기 종료)",
+    ("exit",)
+)
+
+
+# ---------- span ----------
+_SPANS: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("pretcad_spans", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    """with span("graph_build"): ... → 히스토그램 + 현재 요청의 단계 목록에 기록"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=stage)
+        spans = _SPANS.get()
+        if spans is not None:
+            spans.append((stage, dt))
+
+
+def begin_request():
+    """요청 시작: 단계 목록을 새로 만든다 (반환값은 end_request 에 넘김)"""
+    return _SPANS.set([])
+
+
+def end_request(token, route: str, method: str, status: int, seconds: float) -> None:
+    spans = _SPANS.get() or []
+    _SPANS.reset(token)
+    REQUEST_SECONDS.observe(seconds, route=route, method=method, status=str(status))
+    if log.isEnabledFor(logging.DEBUG):
+        stages: Dict[str, float] = {}
+        for stage, dt in spans:
+            stages[stage] = stages.get(stage, 0.0) + dt
+        logging.getLogger("pretcad.request").debug(json.dumps({
+            "route": route, "method": method, "status": status,
+            "ms": round(seconds * 1e3, 3),
+            "stages_ms": {k: round(v * 1e3, 3) for k, v in stages.items()},
+        }))
@@ -0,0 +1,25 @@
+"""
+backend 모듈은 패키지가 아니라 backend 폴더에서 바로 import 하는 스크립트 모음이므로 경로를 잡아준다.
+ALIGNN/torch 가 없는 환경에서도 돌도록 기본 예측기는 surrogate.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("PREDICTOR_BACKEND", "surrogate")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def to_cif():
+    """ASE Atoms → CIF 텍스트"""
+    from io import BytesIO
+    from ase.io import write
+
+    def convert(atoms) -> str:
+        buf = BytesIO()
+        write(buf, atoms, format="cif")
+        return buf.getvalue().decode("utf-8")
+    return convert
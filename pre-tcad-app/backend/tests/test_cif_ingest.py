@@ -0,0 +1,81 @@
+"""CifIngest: 파싱 캐시 적중 경로, 예산 거부 캐시, LRU 축출"""
+import pytest
+from ase.build import bulk
+
+import cif_ingest
+from cif_ingest import CifIngest, CifRejected
+
+
+@pytest.fixture
+def cu_cif(to_cif):
+    return to_cif(bulk("Cu", "fcc", a=3.61))
+
+
+def test_parse_hits_cache_and_returns_copies(cu_cif):
+    ingest = CifIngest(workers=1)
+    first = ingest.parse(cu_cif)
+    first.positions += 1.0            # 돌려받은 Atoms 를 고쳐도 캐시는 그대로
+    second = ingest.parse(cu_cif)
+    assert ingest.stats()["hits"] == 1 and ingest.stats()["misses"] == 1
+    assert second is not first
+    assert second.positions.tolist() == [[0.0, 0.0, 0.0]]
+
+
+def test_comment_and_blank_lines_share_cache_entry(cu_cif):
+    ingest = CifIngest(workers=1)
+    ingest.parse(cu_cif)
+    ingest.parse("# 주석\n\n" + cu_cif.replace("\n", "  \n"))
+    stats = ingest.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_parse_many_keeps_order_and_parses_duplicates_once(cu_cif, to_cif):
+    ingest = CifIngest(workers=1)
+    si_cif = to_cif(bulk("Si", "diamond", a=5.43))
+    out = ingest.parse_many([cu_cif, si_cif, cu_cif, "not a cif"])
+    assert [a.get_chemical_formula() for a in out[:3]] == ["Cu", "Si2", "Cu"]
+    assert isinstance(out[3], ValueError)
+    assert ingest.stats()["entries"] == 3
+
+    again = ingest.parse_many([si_cif, cu_cif])
+    assert [a.get_chemical_formula() for a in again] == ["Si2", "Cu"]
+    assert ingest.stats()["hits"] == 2
+    assert again[1] is not out[0]
+
+
+def test_rejection_is_cached(monkeypatch, cu_cif):
+    monkeypatch.setattr(cif_ingest, "CIF_MAX_BYTES", 10)
+    ingest = CifIngest(workers=1)
+    for _ in range(2):
+        with pytest.raises(CifRejected):
+            ingest.parse(cu_cif)
+    assert ingest.stats()["rejected"] == 1
+    assert ingest.stats()["hits"] == 1
+
+
+def test_lru_evicts_oldest(to_cif):
+    ingest = CifIngest(max_entries=2, workers=1)
+    cifs = [to_cif(bulk(el, "fcc", a=4.0)) for el in ("Cu", "Ag", "Au")]
+    ingest.parse(cifs[0])
+    ingest.parse(cifs[1])
+    ingest.parse(cifs[0])             # Cu 최근 사용 → Ag 가 축출 대상
+    ingest.parse(cifs[2])
+    assert ingest.stats()["entries"] == 2
+    misses = ingest.stats()["misses"]
+    ingest.parse(cifs[0])
+    assert ingest.stats()["misses"] == misses
+    ingest.parse(cifs[1])
+    assert ingest.stats()["misses"] == misses + 1
+
+
+def test_parallel_parse_matches_serial(to_cif):
+    cifs = [to_cif(bulk(el, "fcc", a=4.0)) for el in ("Cu", "Ag", "Au", "Ni")] + ["not a cif"]
+    ingest = CifIngest(workers=2, parallel_min=2)
+    try:
+        out = ingest.parse_many(cifs)
+        assert ingest._pool is not None   # 미스가 parallel_min 이상이라 프로세스 풀에서 파싱
+    finally:
+        ingest.shutdown()
+    assert [a.get_chemical_formula() for a in out[:4]] == ["Cu", "Ag", "Au", "Ni"]
+    assert isinstance(out[4], ValueError)
+    assert ingest.stats()["misses"] == 5
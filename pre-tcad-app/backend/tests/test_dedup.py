@@ -0,0 +1,97 @@
+"""중복 구조 묶기: structure_key(후보) + same_structure(확인), 배치 예측에서 그룹당 1회 추론"""
+import numpy as np
+import pytest
+from ase.build import bulk
+
+import alignn_adapter
+from prediction_cache import PredictionCache, same_structure, structure_key
+
+A_CU = 3.61
+A_ZNS = 5.41
+
+
+def _fcc():
+    return bulk("Cu", "fcc", a=A_CU)
+
+
+def _hcp():
+    # 최근접 거리가 fcc 와 같은 이상적 hcp (c/a = √(8/3))
+    a = A_CU / 2 ** 0.5
+    return bulk("Cu", "hcp", a=a, c=a * (8 / 3) ** 0.5)
+
+
+def _rocksalt_permuted():
+    nacl = bulk("NaCl", "rocksalt", a=5.64, cubic=True)
+    return nacl, nacl[np.random.default_rng(0).permutation(len(nacl))]
+
+
+def _rotated_shifted(atoms):
+    out = atoms.copy()
+    out.rotate(30, "z", rotate_cell=True)
+    out.translate([0.3, 0.1, 0.2])
+    out.wrap()
+    return out
+
+
+@pytest.mark.parametrize("a, b", [
+    (_fcc(), _fcc().repeat((2, 2, 1))),                      # 초격자
+    (_fcc(), bulk("Cu", "fcc", a=A_CU, cubic=True)),         # 원시 셀 vs 관용 셀
+    _rocksalt_permuted(),                                     # 원자 순서만 다름
+    (_fcc(), _rotated_shifted(_fcc())),                       # 회전 + 원점 이동
+], ids=["supercell", "conventional", "permuted", "rotated"])
+def test_equivalent_structures_match(a, b):
+    assert structure_key(a) == structure_key(b)
+    assert same_structure(a, b)
+    assert same_structure(b, a)
+
+
+@pytest.mark.parametrize("a, b", [
+    (_fcc(), _hcp()),
+    (bulk("ZnS", "zincblende", a=A_ZNS),
+     bulk("ZnS", "wurtzite", a=A_ZNS / 2 ** 0.5, c=A_ZNS / 2 ** 0.5 * (8 / 3) ** 0.5)),
+], ids=["fcc-hcp", "zincblende-wurtzite"])
+def test_polytypes_share_key_but_not_structure(a, b):
+    # 이웃 껍질만 보는 structure_key 는 같지만 실제로는 다른 구조
+    assert structure_key(a) == structure_key(b)
+    assert not same_structure(a, b)
+
+
+def test_different_species_do_not_match():
+    assert not same_structure(_fcc(), bulk("Ag", "fcc", a=A_CU))
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """새 예측 캐시 + 추론에 넘어간 구조 기록"""
+    monkeypatch.setattr(alignn_adapter, "_CACHE", PredictionCache())
+    monkeypatch.setattr(alignn_adapter, "DEDUP", True)
+    calls = []
+    real = alignn_adapter._predict_atoms_batch
+
+    def predict(atoms_list):
+        calls.append([len(a) for a in atoms_list])
+        return real(atoms_list)
+    monkeypatch.setattr(alignn_adapter, "_predict_atoms_batch", predict)
+    return calls
+
+
+def test_batch_infers_once_per_structure(counted, to_cif):
+    nacl, nacl_perm = _rocksalt_permuted()
+    structures = [_fcc(), _fcc().repeat((2, 2, 1)), nacl, nacl_perm, _hcp()]
+    out = alignn_adapter.predict_materials_batch([to_cif(a) for a in structures])
+
+    # fcc(원시 셀 대표) / NaCl / hcp 세 그룹만 추론
+    assert len(counted) == 1
+    assert sorted(counted[0]) == [1, 2, 8]
+
+    fcc, sup, rs, rs_perm, hcp = (props for _, props in out)
+    assert sup == alignn_adapter._scale_props(fcc, 4)
+    assert rs_perm == rs
+    # material_id 는 CIF 텍스트 기준이라 구조가 같아도 입력마다 다르다
+    assert len({mid for mid, _ in out}) == len(structures)
+
+
+def test_batch_without_dedup_infers_each_structure(counted, monkeypatch, to_cif):
+    monkeypatch.setattr(alignn_adapter, "DEDUP", False)
+    alignn_adapter.predict_materials_batch([to_cif(_fcc()), to_cif(_fcc().repeat((2, 2, 1)))])
+    assert sorted(counted[0]) == [1, 4]
@@ -0,0 +1,102 @@
+"""PredictionCache: 메모리 LRU 축출(엔트리 수/바이트)과 SQLite 계층의 프로세스 간 유지"""
+import json
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from prediction_cache import PredictionCache
+
+BACKEND = Path(__file__).resolve().parent.parent
+PROPS = {"bandgap": 1.1, "formation_energy": -0.5, "permittivity": 11.7}
+
+
+def test_lru_evicts_by_entry_count():
+    cache = PredictionCache(max_entries=3)
+    for k in "abc":
+        cache.put(k, PROPS)
+    assert cache.get("a") == PROPS   # a 를 최근 사용으로 → 다음 축출 대상은 b
+    cache.put("d", PROPS)
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert all(cache.get(k) == PROPS for k in "acd")
+
+
+def test_lru_evicts_by_bytes():
+    probe = PredictionCache()
+    probe.put("k0", PROPS)
+    size = probe.nbytes
+
+    cache = PredictionCache(max_entries=100, max_bytes=3 * size)
+    for i in range(5):
+        cache.put(f"k{i}", PROPS)
+    assert len(cache) == 3
+    assert cache.nbytes == 3 * size
+    assert cache.get("k0") is None and cache.get("k1") is None
+    assert cache.get("k4") == PROPS
+
+    # 같은 키를 다시 넣으면 바이트를 두 번 세지 않는다
+    cache.put("k4", PROPS)
+    assert cache.nbytes == 3 * size
+
+
+def test_get_returns_copy():
+    cache = PredictionCache()
+    cache.put("k", PROPS)
+    cache.get("k")["bandgap"] = 0.0
+    assert cache.get("k") == PROPS
+
+
+def test_disk_layer_survives_memory_eviction(tmp_path):
+    cache = PredictionCache(max_entries=1, db_path=str(tmp_path / "cache.db"))
+    cache.put("a", PROPS)
+    cache.put("b", PROPS)              # a 는 메모리에서만 축출
+    assert cache.get("a") == PROPS
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_reload_in_new_process(tmp_path):
+    db = tmp_path / "cache.db"
+    PredictionCache(db_path=str(db)).put("material", PROPS)
+
+    code = (
+        "import json, sys\n"
+        "from prediction_cache import PredictionCache\n"
+        f"c = PredictionCache(db_path={str(db)!r})\n"
+        "print(json.dumps([c.get('material'), c.stats()['disk_hits']]))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True,
+                         text=True, check=True).stdout
+    got, disk_hits = json.loads(out)
+    assert got == PROPS
+    assert disk_hits == 1
+
+
+def _child_roundtrip(cache, queue):
+    # fork 로 물려받은 캐시: 메모리 계층은 복사본, SQLite 연결은 자식이 새로 연다
+    cache.clear()
+    got = cache.get("parent")
+    cache.put("child", PROPS)
+    queue.put((got, cache._conn_pid == os.getpid() and len(cache._inherited) == 1))
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="fork 없음")
+def test_forked_child_uses_own_connection(tmp_path):
+    cache = PredictionCache(db_path=str(tmp_path / "cache.db"))
+    cache.put("parent", PROPS)   # 부모도 연결을 연 상태에서 fork
+    ctx = mp.get_context("fork")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child_roundtrip, args=(cache, queue))
+    proc.start()
+    got, own_conn = queue.get(timeout=30)
+    proc.join(timeout=30)
+    assert proc.exitcode == 0
+    assert got == PROPS
+    assert own_conn
+
+    # 자식이 쓴 값이 부모 연결로도 보인다
+    cache.clear()
+    assert cache.get("child") == PROPS
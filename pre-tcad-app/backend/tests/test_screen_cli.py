@@ -0,0 +1,77 @@
+"""screen_cli: 체크포인트 재개 시 중복/누락 행이 없는지, --process 키 검증"""
+import csv
+import multiprocessing as mp
+
+import pytest
+from ase.build import bulk
+
+import screen_cli
+from results_store import ResultsStore
+
+START_METHOD = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+ELEMENTS = ["Cu", "Ag", "Au", "Ni", "Pd", "Pt", "Al"]
+
+
+@pytest.fixture
+def library(tmp_path, to_cif):
+    src = tmp_path / "cifs"
+    src.mkdir()
+    for i, el in enumerate(ELEMENTS):
+        (src / f"{i:02d}_{el}.cif").write_text(to_cif(bulk(el, "fcc", a=4.0)))
+    return src
+
+
+def _run(src, out, *extra):
+    return screen_cli.main([str(src), "-o", str(out), "--workers", "1", "--chunk", "2",
+                            "--start-method", START_METHOD, *extra])
+
+
+def _names(out):
+    with open(out, newline="", encoding="utf-8") as f:
+        return [row["name"] for row in csv.DictReader(f)]
+
+
+def test_resume_after_crash_has_no_duplicate_rows(library, tmp_path, monkeypatch):
+    out, db = tmp_path / "results.csv", tmp_path / "results.db"
+    expected = sorted(p.name for p in library.iterdir())
+
+    # 두 번째 묶음은 CSV 에 쓴 뒤 체크포인트를 남기기 전에 죽는다
+    real = screen_cli.append_checkpoint
+    calls = []
+
+    def crash(f, names, state):
+        calls.append(names)
+        if len(calls) == 2:
+            raise RuntimeError("crash")
+        real(f, names, state)
+    monkeypatch.setattr(screen_cli, "append_checkpoint", crash)
+    with pytest.raises(RuntimeError):
+        _run(library, out, "--results-db", str(db))
+    assert len(_names(out)) == 4          # 체크포인트 이후에 쓴 행까지 남아 있는 상태
+
+    monkeypatch.setattr(screen_cli, "append_checkpoint", real)
+    assert _run(library, out, "--results-db", str(db)) == 0
+    names = _names(out)
+    assert sorted(names) == expected      # 잘라낸 뒤 이어 써서 중복도 누락도 없음
+
+    # 다 끝난 뒤 다시 돌려도 그대로
+    assert _run(library, out, "--results-db", str(db)) == 0
+    assert _names(out) == names
+    assert ResultsStore(str(db)).count() == len(expected)
+
+
+def test_no_resume_starts_over(library, tmp_path):
+    out = tmp_path / "results.csv"
+    _run(library, out)
+    _run(library, out, "--no-resume")
+    assert sorted(_names(out)) == sorted(p.name for p in library.iterdir())
+
+
+@pytest.mark.parametrize("item", ["T_K=350", "toxnm=1.5", "tox_nm=thin", "tox_nm"])
+def test_process_rejects_bad_items(item):
+    with pytest.raises(SystemExit):
+        screen_cli._parse_process([item])
+
+
+def test_process_accepts_alignn_keys():
+    assert screen_cli._parse_process(["tox_nm=1.5", "vdd=0.7"]) == {"tox_nm": 1.5, "vdd": 0.7}
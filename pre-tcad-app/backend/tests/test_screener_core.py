@@ -0,0 +1,100 @@
+"""
+compute_metrics (float 빠른 경로) / compute_metrics_arrays (배열 엔진) 가
+원래 지표 함수(SS_mVdec ~ stability_score)와 비트 단위로 같은지 확인
+"""
+import math
+
+import numpy as np
+import pytest
+
+import screener_core as M
+
+FIELDS = ["tox_nm", "eps_ox", "NA_cm3", "L_nm", "VDD_V", "T_K", "W_um", "mu_cm2_Vs"]
+
+
+def _baseline(m, s):
+    """분리 전 m_screener.compute_metrics 와 같은 식 (지표 함수 하나씩 호출)"""
+    return {
+        "SS_mVdec":      M.SS_mVdec(m, s),
+        "Vth_V":         M.Vth_V(m, s),
+        "Ion_A_per_um":  M.Id_on_A_per_um(m, s),
+        "Ioff_proxy":    M.Ioff_proxy(m, s),
+        "gm_S_per_um":   M.gm_S_per_um(m, s),
+        "ft_Hz":         M.ft_Hz(m, s),
+        "r0_ohm_per_um": M.r0_ohm_per_um(m, s),
+        "DIBL_mV_per_V": M.dibl_proxy_mV_per_V(m, s),
+        "Stab_score":    M.stability_score(m),
+    }
+
+
+def _arrays(m, s):
+    return M.compute_metrics_arrays(m.Eg_eV, m.eps_r, m.Ef_eV_atom,
+                                    **{f: getattr(s, f) for f in FIELDS})
+
+
+def _same(a, b):
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+def _random_cases(n, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        m = M.MaterialInputs(rng.uniform(0.0, 6.0), rng.uniform(1.0, 30.0), rng.uniform(-3.0, 1.0))
+        s = M.SliderParams(
+            tox_nm=rng.uniform(0.5, 20.0), eps_ox=rng.uniform(3.0, 30.0),
+            NA_cm3=10 ** rng.uniform(14, 20), L_nm=rng.uniform(5.0, 200.0),
+            VDD_V=rng.uniform(0.3, 2.0), T_K=rng.uniform(200.0, 500.0),
+            W_um=rng.uniform(0.1, 10.0), mu_cm2_Vs=rng.uniform(10.0, 2000.0),
+        )
+        yield m, s
+
+
+def test_scalar_and_0d_array_match_baseline_bitwise():
+    n_on = 0
+    for m, s in _random_cases(5000):
+        base = _baseline(m, s)
+        fast = M.compute_metrics(m, s)
+        arr = _arrays(m, s)
+        for k in M.METRIC_KEYS:
+            assert _same(fast[k], base[k]), (k, m, s)
+            assert _same(float(arr[k]), base[k]), (k, m, s)
+        n_on += base["Ion_A_per_um"] > 0.0
+    # ON/OFF 양쪽 분기가 모두 검사되었는지
+    assert 0 < n_on < 5000
+
+
+def test_vectorized_arrays_match_baseline():
+    cases = list(_random_cases(2000, seed=1))
+    arr = M.compute_metrics_arrays(
+        np.array([m.Eg_eV for m, _ in cases]), np.array([m.eps_r for m, _ in cases]),
+        np.array([m.Ef_eV_atom for m, _ in cases]),
+        **{f: np.array([getattr(s, f) for _, s in cases]) for f in FIELDS},
+    )
+    base = [_baseline(m, s) for m, s in cases]
+    for k in M.METRIC_KEYS:
+        # np.exp/np.log 는 SIMD 구현이라 libm 과 최대 몇 ulp 차이
+        np.testing.assert_allclose(arr[k], [b[k] for b in base], rtol=1e-12, atol=0.0)
+
+
+def test_defaults_match_baseline():
+    m, s = M.MaterialInputs(1.12, 11.7, -1.0), M.SliderParams()
+    assert M.compute_metrics(m, s) == _baseline(m, s)
+
+
+@pytest.mark.parametrize("m, s, error", [
+    # tox=0 → Cox 계산에서 0 나누기
+    (M.MaterialInputs(1.12, 11.7, -1.0), M.SliderParams(tox_nm=0.0), ZeroDivisionError),
+    # Vov**2 가 float 범위를 넘음
+    (M.MaterialInputs(1.12, 11.7, -1.0), M.SliderParams(VDD_V=1e200), OverflowError),
+])
+def test_fallback_follows_array_engine(m, s, error):
+    # 원래 스칼라 식은 예외, compute_metrics 는 배열 엔진(inf/nan 규칙)으로 넘어간다
+    with pytest.raises(error):
+        _baseline(m, s)
+    fast = M.compute_metrics(m, s)
+    arr = _arrays(m, s)
+    assert set(fast) == set(M.METRIC_KEYS)
+    for k in M.METRIC_KEYS:
+        assert isinstance(fast[k], float)
+        assert _same(fast[k], float(arr[k])), k
+    assert any(math.isinf(v) for v in fast.values())
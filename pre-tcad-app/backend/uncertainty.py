@@ -0,0 +1,89 @@
+"""
+앙상블 기반 불확실성 + 조기 종료 (screen_mosfet 결과의 "uncertainty")
+
+- 물성 예측을 앙상블 멤버로 여러 번 뽑는다 (predictors.predict_members)
+    · ALIGNN   : models/ensemble/<물성>/<멤버>/ 가중치가 있으면 deep ensemble, 없으면 MC-dropout
+    · surrogate: 조성 + 멤버 번호로 시드를 고정한 섭동
+- 멤버 표본마다 compute_metrics → 퍼센트 → 점수를 계산해서 (screener_adapter.score_samples)
+    uncertainty     = 멤버 점수의 표준편차
+    score_interval  = 점수 ± UNCERTAINTY_Z × 표준편차 (표본이 적으면 Student t 로 넓힘)
+- 조기 종료: 멤버를 ENSEMBLE_ROUND 개씩 늘려가며, 점수 구간이 판정 기준(unsure/suitable)을 걸치지 않는
+  (판정이 이미 확실한) 구조는 거기서 멈춘다. 경계에 걸친 구조만 ENSEMBLE_SIZE 개까지 다 돈다.
+- 멤버 예측값은 예측 캐시에 (material_id, 멤버 번호) 로 남으므로 같은 구조를 다시 스크리닝하면 추론 없음
+- 멤버 추론은 구조마다 최소 ENSEMBLE_ROUND × 3물성 만큼 forward 가 더 들어서, 요청에서
+  "uncertainty": true 로 켠 경우에만 돈다 (app.py). 예측기가 멤버를 못 뽑으면
+  (predictors.supports_members, 예: 앙상블 가중치/Dropout 없는 기본 ALIGNN) 켜도 건너뛴다
+
+환경변수:
+  ENSEMBLE_SIZE   멤버 수 상한 (기본 8, 0 이면 끔 → uncertainty 0)
+  ENSEMBLE_ROUND  한 번에 추가하는 멤버 수 (기본 2)
+  UNCERTAINTY_Z   구간 폭 배수 (기본 2.0, screener_adapter)
+"""
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import alignn_adapter as A
+import screener_adapter as SA
+from telemetry import ENSEMBLE_EXITS, span
+
+ENSEMBLE_SIZE = int(os.environ.get("ENSEMBLE_SIZE", 8))
+ENSEMBLE_ROUND = max(1, int(os.environ.get("ENSEMBLE_ROUND", 2)))
+
+
+def ensemble_samples(items: List[Tuple[str, Optional[str], Dict[str, float]]],
+                     conditions: Dict[str, Any] | None = None,
+                     thresholds: Dict[str, float] | None = None,
+                     weights: Dict[str, float] | None = None,
+                     infer: bool = True) -> List[Optional[Dict[str, np.ndarray]]]:
+    """
+    items: [(material_id, cif_text 또는 None, ALIGNN 예측값)]
+    반환: 구조별 물성 표본 {Eg_eV, eps_r, Ef_eV_atom: (k,)} (screen_mosfet(samples=) 입력) 또는 None
+    - infer=False 면 캐시에 있는 멤버만 쓴다 (작업 큐 결과처럼 메인 프로세스에서 추론하면 안 될 때)
+    - 점수/판정은 /screen_alignn 과 같이 alignn_inputs(…, conditions) 의 props 와 vdd 로 계산
+    """
+    out: List[Optional[Dict[str, np.ndarray]]] = [None] * len(items)
+    if ENSEMBLE_SIZE <= 0 or not items or not A.PREDICTOR.supports_members():
+        return out
+    t = SA.normalize_thresholds(thresholds)
+    w = SA.normalize_weights(weights) if weights else None
+
+    inputs = [SA.alignn_inputs(raw, conditions) for _, _, raw in items]
+    props = [p for p, _, _ in inputs]
+    vdd = inputs[0][2]
+    # 점 추정 점수 (표본 1개짜리 score_samples = screen_mosfet 의 점수)
+    base = [float(sc[0]) for sc, _ in SA.score_samples(
+        props, [{k: [p[k]] for k in SA.SAMPLE_KEYS} for p in props], vdd=vdd, weights=w)]
+
+    members: List[List[Dict[str, float]]] = [[] for _ in items]
+    active = list(range(len(items)))
+    with span("ensemble"):
+        for start in range(0, ENSEMBLE_SIZE, ENSEMBLE_ROUND):
+            round_members = range(start, min(start + ENSEMBLE_ROUND, ENSEMBLE_SIZE))
+            got = A.predict_members_batch([items[i][:2] for i in active], round_members, infer=infer)
+            alive = []
+            for i, g in zip(active, got):
+                if g is not None:
+                    members[i].extend(g)
+                    alive.append(i)
+            if not alive:
+                break
+
+            samples = [SA.alignn_samples(members[i]) for i in alive]
+            scored = SA.score_samples([props[i] for i in alive], samples, vdd=vdd, weights=w)
+            active = []
+            for i, (scores, _) in zip(alive, scored):
+                if len(scores) >= ENSEMBLE_SIZE:
+                    ENSEMBLE_EXITS.inc(exit="full")
+                elif len(scores) >= 2 and SA.uncertainty_stats(base[i], scores, t)["decision_stable"]:
+                    ENSEMBLE_EXITS.inc(exit="early")
+                else:
+                    active.append(i)
+            if not active:
+                break
+
+    for i, ms in enumerate(members):
+        if ms:
+            out[i] = SA.alignn_samples(ms)
+    return out
@@ -95,9 +95,15 @@ $("run_cif").onclick = async () => {
 
         // 저장
         localStorage.setItem("screener_result", JSON.stringify(data));
+        // material_id: 결과 페이지 슬라이더는 이 ID로 재스크리닝만 요청 (CIF 재전송 X)
+        // cif: ID가 서버 캐시에서 만료됐을 때 /materials 로 다시 등록하기 위한 원본
         localStorage.setItem("screener_input", JSON.stringify({
             via: "cif",
-            cif_filename: file.name
+            cif_filename: file.name,
+            cif: cifText,
+            material_id: data.material_id || null,
+            device: payload.device,
+            conditions: payload.conditions
         }));
 
         statusEl.textContent = "계산 완료! 결과 페이지로 이동합니다...";